@@ -76,7 +76,7 @@ ct = colhash /@ c;
   ]
 
 
-DecodeTimeSeries[ts_]:=ImportString[ToString[ts],{"Base64","Real64"}]/;ReadQueryBackend[]=="Mathematica"
+DecodeTimeSeries[ts_,type_:"Real64"]:=ImportString[ToString[ts],{"Base64",type}]/;ReadQueryBackend[]=="Mathematica"
 
 
 ExpandCols[cols_, colhash_] := Keys[colhash] /; cols == {"*"}
@@ -84,6 +84,7 @@ ExpandCols[cols_, colhash_] := cols
 
 
 DecodeColumn[dat_, dtype_] := DecodeTimeSeries[dat]/; dtype == "REAL_LIST"
+DecodeColumn[dat_, dtype_] := DecodeTimeSeries[dat,"Real32"]/; dtype == "REAL32_LIST"
 DecodeColumn[dat_, dtype_] := dat
 
 
@@ -106,7 +107,7 @@ rawquery[q_]:=" "
 QueryDB[filename_,query_]:=ToExpression[StringReplace[Import["!"<>shellPrefix[readVirtualEnv[]]<>" python "<>FileNameJoin[{$UserBaseDirectory,"Applications","pyquery.py " },OperatingSystem->$OperatingSystem]<>rawquery[query] <> filename<>" \"" <>query<>"\"","String"],{"["->"{","]"->"}"}]]/;ReadQueryBackend[]=="Python"
 
 
-DecodeTimeSeries[ts_]:=ts/;ReadQueryBackend[]=="Python"
+DecodeTimeSeries[ts_,type_:"Real64"]:=ts/;ReadQueryBackend[]=="Python"
 
 
 ts[dat_,FsKHz_]:=Transpose[{Range[0,Length[dat]-1]/FsKHz,polarity[dat]*dat}]
@@ -0,0 +1,81 @@
+"""
+	Measure the throughput of the besselLowpassFilter modes ('chunk', 'causal' and 'zerophase')
+	when data is filtered in chunks of the size used by metaTrajIO. The maximum difference between
+	the streaming 'zerophase' output and a single pass over the complete data set is also printed.
+	The cost of decimating the data 8-fold with the 'stride' and 'polyphase' decimation modes is measured 
+	last for the 'chunk' and 'causal' filters and for convolutionFilter low-pass FIR filters of increasing 
+	length. With 'polyphase' decimation, FIR filters that are shorter than the FFT threshold of 
+	convolutionFilter are only applied to the data points that are kept.
+
+	Usage: python bin/besselFilterBenchmark.py [number of points] [sampling frequency (Hz)] [cutoff frequency (Hz)]
+"""
+import sys
+import time
+
+import numpy as np
+import scipy.signal as sig
+
+from mosaic.filters.besselLowpassFilter import *
+from mosaic.filters.convolutionFilter import *
+
+CHUNKSIZE=10000
+DECIMATE=8
+
+def streamtime(f, dat, Fs):
+	t0=time.time()
+	streamfilter(f, dat, Fs)
+	return time.time()-t0
+
+def streamfilter(f, dat, Fs):
+	L=f.overlap(Fs)
+	out=[]
+	for i in range(0, len(dat), CHUNKSIZE):
+		j=min(i+CHUNKSIZE, len(dat))
+		pre=min(L, i)
+		post=min(L, len(dat)-j)
+		f.filterChunk(dat[i-pre:j+post], Fs, pre, post)
+		out.append(f.filteredData)
+
+	return np.hstack(out)
+
+if __name__ == '__main__':
+	try:
+		npoints=int(sys.argv[1])
+		Fs=float(sys.argv[2])
+		fc=float(sys.argv[3])
+	except IndexError:
+		npoints=5000000
+		Fs=500000.
+		fc=10000.
+
+	dat=np.random.normal(100., 5., npoints)
+
+	print "{0:>10s}  {1:>12s}  {2:>18s}".format("mode", "time (s)", "throughput (pts/s)")
+	for mode in ['chunk', 'causal', 'zerophase']:
+		f=besselLowpassFilter(filterOrder=6, filterCutoff=fc, filterMode=mode)
+
+		t0=time.time()
+		out=streamfilter(f, dat, Fs)
+		t=time.time()-t0
+
+		print "{0:>10s}  {1:>12.3f}  {2:>18.3e}".format(mode, t, npoints/t)
+
+		if mode=='zerophase':
+			f.filterData(dat, Fs)
+			print "\nMaximum difference between the streaming and single pass zero-phase filter: {0:.3e} pA".format(np.max(np.abs(out-f.filteredData)))
+
+	print "\n{0:>20s}  {1:>12s}  {2:>14s}  {3:>10s}".format("filter", "stride (s)", "polyphase (s)", "speedup")
+	filters=[
+		("bessel (chunk)", lambda **kw : besselLowpassFilter(filterOrder=6, filterCutoff=fc, filterMode='chunk', **kw)),
+		("bessel (causal)", lambda **kw : besselLowpassFilter(filterOrder=6, filterCutoff=fc, filterMode='causal', **kw))
+	]
+	for ntaps in [11, 101, 251, 1001]:
+		filters.append( 
+				("FIR ({0} taps)".format(ntaps), lambda ntaps=ntaps, **kw : convolutionFilter(filterCoeff=list(sig.firwin(ntaps, 1.0/DECIMATE)), **kw))
+			)
+
+	for (name, filt) in filters:
+		tstride=streamtime(filt(decimate=DECIMATE, decimateMode='stride'), dat, Fs)
+		tpoly=streamtime(filt(decimate=DECIMATE, decimateMode='polyphase'), dat, Fs)
+
+		print "{0:>20s}  {1:>12.3f}  {2:>14.3f}  {3:>10.2f}".format(name, tstride, tpoly, tstride/tpoly)
@@ -0,0 +1,88 @@
+"""
+	Measure the event processing throughput of eventSegment with the adept2State fit when events are
+	processed serially and in parallel with 1, 2, 4 and N worker processes, where N is the number of CPUs.
+
+	Usage: python bin/parallelBenchmark.py [number of events] [number of files]
+"""
+import sys
+import time
+import json
+import shutil
+import tempfile
+import multiprocessing
+
+import numpy as np
+
+import mosaic.settings as settings
+import mosaic.process.adept2State as adept2State
+from mosaic.partition.eventSegment import *
+from mosaic.trajio.binTrajIO import *
+
+FS=500000
+EVENTSPACING=2000
+
+def eventData(nevents):
+	# 100 pA open channel current with 40 pA blockades that are 100 to 500 data points long. The
+	# data are extended by EVENTSPACING/2 data points, so they do not end at the end of a block.
+	dat=np.random.normal(100., 5., nevents*EVENTSPACING+EVENTSPACING/2)
+	for i in range(nevents):
+		start=i*EVENTSPACING+EVENTSPACING/2
+		dat[start:start+np.random.randint(100, 500)]-=40.
+
+	return dat
+
+def eventThroughput(fnames, parallelProc, nworkers=1):
+	sett=settings.settings('.', defaultwarn=False).settingsDict
+
+	epartsettings=sett['eventSegment']
+	epartsettings['meanOpenCurr']=100.
+	epartsettings['sdOpenCurr']=5.
+	epartsettings['slopeOpenCurr']=0
+	epartsettings['parallelProc']=int(parallelProc)
+	epartsettings['reserveNCPU']=multiprocessing.cpu_count()-nworkers
+
+	b=binTrajIO(
+			fnames=list(fnames),
+			SamplingFrequency=FS,
+			ColumnTypes=[('curr_pA', 'f8')],
+			IonicCurrentColumn='curr_pA'
+		)
+
+	e=eventSegment(b, adept2State.adept2State, epartsettings, sett['adept2State'], json.dumps(sett, indent=4))
+
+	t0=time.time()
+	e.PartitionEvents()
+	t=time.time()-t0
+
+	e.Stop()
+
+	return (e.eventcount, e.eventcount/t)
+
+if __name__ == '__main__':
+	try:
+		nevents=int(sys.argv[1])
+		nfiles=int(sys.argv[2])
+	except IndexError:
+		nevents=2000
+		nfiles=4
+
+	datpath=tempfile.mkdtemp()
+	try:
+		fnames=[]
+		for i in range(nfiles):
+			fnames.append(datpath+'/bench-'+str(i)+'.bin')
+			eventData(nevents/nfiles).tofile(fnames[-1])
+
+		ncpu=multiprocessing.cpu_count()
+
+		# eventSegment prints its analysis log, so the results are printed once all runs are complete
+		results=[ ("serial",)+eventThroughput(fnames, False) ]
+		for nworkers in sorted(set([1, 2, 4, ncpu])):
+			results.append( (str(nworkers),)+eventThroughput(fnames, True, nworkers) )
+
+		print "\nNumber of CPUs: {0}\n".format(ncpu)
+		print "{0:>10s}  {1:>10s}  {2:>12s}  {3:>10s}".format("workers", "events", "events/s", "speedup")
+		for (nworkers, n, rate) in results:
+			print "{0:>10s}  {1:>10d}  {2:>12.1f}  {3:>10.2f}".format(nworkers, n, rate, rate/results[0][2])
+	finally:
+		shutil.rmtree(datpath, ignore_errors=True)
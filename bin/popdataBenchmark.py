@@ -0,0 +1,58 @@
+"""
+	Measure the throughput of metaTrajIO.popdata for different request sizes.
+
+	Usage: python bin/popdataBenchmark.py [number of files] [points per file]
+"""
+import sys
+import time
+import shutil
+import tempfile
+
+import numpy as np
+
+import mosaic.trajio.metaTrajIO as metaTrajIO
+from mosaic.trajio.binTrajIO import *
+
+def popdataThroughput(fnames, n, dcOffset=0.0):
+	b=binTrajIO(
+			fnames=list(fnames),
+			SamplingFrequency=500000,
+			ColumnTypes=[('curr_pA', 'f8')],
+			IonicCurrentColumn='curr_pA',
+			dcOffset=dcOffset
+		)
+
+	npts=0
+	t0=time.time()
+	try:
+		while(1):
+			npts+=len(b.popdata(n))
+	except metaTrajIO.EmptyDataPipeError:
+		pass
+
+	return npts/(time.time()-t0)
+
+if __name__ == '__main__':
+	try:
+		nfiles=int(sys.argv[1])
+		npoints=int(sys.argv[2])
+	except IndexError:
+		nfiles=4
+		npoints=1000000
+
+	datpath=tempfile.mkdtemp()
+	try:
+		fnames=[]
+		for i in range(nfiles):
+			fnames.append(datpath+'/bench-'+str(i)+'.bin')
+			np.random.normal(100., 5., npoints).tofile(fnames[-1])
+
+		print "{0:>10s}  {1:>12s}  {2:>12s}".format("n", "Mpts/s", "Mpts/s (dc)")
+		for n in [10, 100, 1000, 10000, 100000, 1000000]:
+			print "{0:>10d}  {1:>12.2f}  {2:>12.2f}".format(
+					n,
+					popdataThroughput(fnames, n)*1e-6,
+					popdataThroughput(fnames, n, dcOffset=1.0)*1e-6
+				)
+	finally:
+		shutil.rmtree(datpath, ignore_errors=True)
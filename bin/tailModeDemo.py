@@ -0,0 +1,76 @@
+"""
+	Simulate a live acquisition and read the data with binTrajIO in tail mode. A background
+	thread appends blocks of data to binary files in a temporary directory and starts a new
+	file periodically. The delay between writing a block and reading it is printed for each block.
+
+	Usage: python bin/tailModeDemo.py [acquisition time (s)] [points per file]
+"""
+import sys
+import time
+import shutil
+import tempfile
+import threading
+
+import numpy as np
+
+import mosaic.trajio.metaTrajIO as metaTrajIO
+from mosaic.trajio.binTrajIO import *
+
+Fs=100000
+BLOCKSIZE=10000
+
+def acquire(datpath, acqTime, npoints):
+	# Write BLOCKSIZE points every BLOCKSIZE/Fs seconds. The first point of each block holds the time it was written.
+	nblocks=int(acqTime*Fs/BLOCKSIZE)
+	for i in range(nblocks):
+		with open(datpath+'/acq-{0:04d}.bin'.format(i*BLOCKSIZE/npoints), 'ab') as f:
+			dat=np.random.normal(100., 5., BLOCKSIZE)
+			dat[0]=time.time()
+			dat.tofile(f)
+
+		time.sleep(BLOCKSIZE/float(Fs))
+
+if __name__ == '__main__':
+	try:
+		acqTime=float(sys.argv[1])
+		npoints=int(sys.argv[2])
+	except IndexError:
+		acqTime=5.0
+		npoints=100000
+
+	datpath=tempfile.mkdtemp()
+	try:
+		np.random.normal(100., 5., BLOCKSIZE).tofile(datpath+'/acq-0000.bin')
+
+		w=threading.Thread(target=acquire, args=(datpath, acqTime, npoints))
+		w.start()
+
+		b=binTrajIO(
+				dirname=datpath,
+				filter='acq-*.bin',
+				SamplingFrequency=Fs,
+				ColumnTypes=[('curr_pA', 'f8')],
+				IonicCurrentColumn='curr_pA',
+				tailMode=1,
+				tailPollSec=0.1,
+				tailTimeoutSec=2.0
+			)
+
+		# skip the block written before the acquisition started
+		b.popdata(BLOCKSIZE)
+
+		print "{0:>10s}  {1:>12s}".format("block", "latency (s)")
+		try:
+			i=0
+			while(1):
+				d=b.popdata(BLOCKSIZE)
+				if len(d) < BLOCKSIZE:
+					break
+				print "{0:>10d}  {1:>12.3f}".format(i, time.time()-d[0])
+				i+=1
+		except metaTrajIO.EmptyDataPipeError:
+			pass
+
+		w.join()
+	finally:
+		shutil.rmtree(datpath, ignore_errors=True)
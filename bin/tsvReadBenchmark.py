@@ -0,0 +1,65 @@
+"""
+	Compare the rows parsed per second by tsvTrajIO with a csv.reader based parser.
+
+	Usage: python bin/tsvReadBenchmark.py [number of rows]
+"""
+import sys
+import csv
+import time
+import shutil
+import tempfile
+
+import numpy as np
+
+from mosaic.trajio.tsvTrajIO import *
+
+def csvreader(fname, timeCol, currCol):
+	# Parse a file with csv.reader, one row at a time.
+	r1=csv.reader(open(fname,'rU'), delimiter='\t')
+	r1.next()
+
+	p1=r1.next()
+	p2=r1.next()
+	Fs=1./(float(p2[timeCol])-float(p1[timeCol]))
+
+	dat=[float(p1[currCol]), float(p2[currCol])]
+	dat.extend([ float(row[currCol]) for row in r1 ])
+
+	return np.array( dat, dtype=np.float64)
+
+def tsvreader(fname, timeCol, currCol):
+	t=tsvTrajIO(fnames=[fname], headers=True, timeCol=timeCol, currCol=currCol)
+	return t.readdata(fname)
+
+def rowsPerSec(func, fname):
+	t0=time.time()
+	dat=func(fname, 0, 1)
+
+	return dat, len(dat)/(time.time()-t0)
+
+if __name__ == '__main__':
+	try:
+		nrows=int(sys.argv[1])
+	except IndexError:
+		nrows=2000000
+
+	datpath=tempfile.mkdtemp()
+	try:
+		fname=datpath+'/bench.tsv'
+		np.savetxt(
+				fname, 
+				np.column_stack( (np.arange(nrows)*2e-6, np.random.normal(100., 5., nrows)) ), 
+				delimiter='\t', 
+				header='time\tcurrent', 
+				comments=''
+			)
+
+		(ref, csvrate)=rowsPerSec(csvreader, fname)
+		(dat, tsvrate)=rowsPerSec(tsvreader, fname)
+
+		print "{0:>12s}  {1:>12s}".format("parser", "Mrows/s")
+		print "{0:>12s}  {1:>12.3f}".format("csv.reader", csvrate*1e-6)
+		print "{0:>12s}  {1:>12.3f}".format("tsvTrajIO", tsvrate*1e-6)
+		print "max relative difference: {0:.3g}".format(np.max(np.abs(dat-ref)/np.abs(ref)))
+	finally:
+		shutil.rmtree(datpath, ignore_errors=True)
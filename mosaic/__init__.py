@@ -20,12 +20,15 @@ import mosaic.trajio.qdfTrajIO
 import mosaic.trajio.binTrajIO 
 import mosaic.trajio.abfTrajIO 
 import mosaic.trajio.tsvTrajIO 
+import mosaic.trajio.cacheTrajIO 
 
 import mosaic.filters.besselLowpassFilter
 import mosaic.filters.convolutionFilter
 import mosaic.filters.waveletDenoiseFilter
+import mosaic.filters.filterChain
 
 import mosaic.partition.eventSegment
+import mosaic.partition.vectorizedEventSegment
 
 import mosaic.process.adept
 import mosaic.process.adept2State
@@ -61,12 +64,15 @@ __all__.extend(mosaic.trajio.qdfTrajIO.__all__)
 __all__.extend(mosaic.trajio.binTrajIO.__all__)
 __all__.extend(mosaic.trajio.abfTrajIO.__all__)
 __all__.extend(mosaic.trajio.tsvTrajIO.__all__)
+__all__.extend(mosaic.trajio.cacheTrajIO.__all__)
 
 __all__.extend(mosaic.filters.besselLowpassFilter.__all__)
 __all__.extend(mosaic.filters.convolutionFilter.__all__)
 __all__.extend(mosaic.filters.waveletDenoiseFilter.__all__)
+__all__.extend(mosaic.filters.filterChain.__all__)
 
 __all__.extend(mosaic.partition.eventSegment.__all__)
+__all__.extend(mosaic.partition.vectorizedEventSegment.__all__)
 
 __all__.extend(mosaic.process.adept.__all__)
 __all__.extend(mosaic.process.adept2State.__all__)
@@ -9,6 +9,9 @@ CodeProfiling='summary'	# Either 'summary' to print a summary at the end of a ru
 LogProperties=False		# Log all class properties defined with mosaic_property.
 LogSizeBytes=int(2<<20) # 2 MB
 DocumentationURL='https://pages.nist.gov/mosaic/'
+DataPrecision='float64'	# Either 'float64' or 'float32'. In 'float32' mode, ionic current data in the data pipe, 
+						# filter outputs, event time-series and time-series saved to the database are 
+						# stored in single precision. Fits are always performed in double precision.
 
 # Options for MOSAIC Web
 WebServerPort=5000
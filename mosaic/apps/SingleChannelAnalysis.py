@@ -6,24 +6,53 @@
 	:License:	See LICENSE.TXT	
 	:ChangeLog:
 	.. line-block::
+		10/18/26	AB	Read the length of data files in a sharded analysis with metaTrajIO.filelength.
+		10/18/26	AB	Resume an interrupted analysis from the last checkpoint saved in its database.
+		10/18/26	AB	Added a sharded analysis mode that processes groups of data files in parallel.
 		3/25/17 	AB 	Allow an optional argument to pass a database name.
 		5/15/14		AB	Initial version
 """
 __docformat__ = 'restructuredtext'
 
 import mosaic.settings as settings
+import mosaic.mdio.sqlite3MDIO as sqlite3MDIO
+from mosaic.utilities.ionic_current_stats import OpenCurrentStats
+from mosaic.partition.metaEventPartition import ExcessiveDriftError, DriftRateError
+from mosaic.utilities.resource_path import format_path
 from mosaic.utilities.ga import registerStart, registerStop
+import mosaic.utilities.mosaicLogging as mlog
 import multiprocessing
+import tempfile
+import shutil
 import os
 import signal
 import json
+import datetime
+import numpy as np
 
-__all__ = ["SingleChannelAnalysis", "run_eventpartition"]
+__all__ = ["SingleChannelAnalysis", "run_eventpartition", "run_shardedeventpartition"]
 
-def run_eventpartition( dataPath, trajDataHnd, dataFilterHnd, eventPartHnd, eventProcHnd, dbFilename):
+def run_eventpartition( dataPath, trajDataHnd, dataFilterHnd, eventPartHnd, eventProcHnd, dbFilename, resume=False):
 	# Read and parse the settings file
 	settingsdict=settings.settings( dataPath )	
 
+	if dbFilename=='':
+		kwargs={}
+	else:
+		kwargs={'dbFilename': dataPath+'/'+dbFilename}
+
+	if resume:
+		if os.path.isfile(kwargs.get('dbFilename', '')):
+			# Continue the analysis with the settings saved in the database.
+			mdioDBHnd=sqlite3MDIO.sqlite3MDIO()
+			mdioDBHnd.openDB(kwargs['dbFilename'])
+			settingsdict.parseSettingsString(mdioDBHnd.readSettings())
+			mdioDBHnd.closeDB()
+
+			kwargs['resume']=True
+		else:
+			mlog.mosaicLogging().getLogger(name=__name__).warning("WARNING: The analysis database '{0}' was not found. A new analysis will be started.".format(dbFilename))
+
 	# Pull out trajectory settings to construct an IO object
 	trajSettings=settingsdict.getSettings(trajDataHnd.__name__)
 	
@@ -32,11 +61,6 @@ def run_eventpartition( dataPath, trajDataHnd, dataFilterHnd, eventPartHnd, even
 	else:
 		trajDataObj=trajDataHnd( dirname=dataPath, **trajSettings )
 
-	if dbFilename=='':
-		kwargs={}
-	else:
-		kwargs={'dbFilename': dataPath+'/'+dbFilename}
-
 	try:
 		with eventPartHnd(
 							trajDataObj, 
@@ -50,6 +74,316 @@ def run_eventpartition( dataPath, trajDataHnd, dataFilterHnd, eventPartHnd, even
 	except KeyboardInterrupt:
 		raise
 
+def run_shardedeventpartition( dataPath, trajDataHnd, dataFilterHnd, eventPartHnd, eventProcHnd, dbFilename, shardFiles):
+	"""
+		Partition and process a data set that spans multiple files in parallel. The data files are split into
+		groups (shards) of `shardFiles` files, and each shard is analyzed in a separate worker process. The
+		results are merged into a single database.
+
+		To handle events that straddle the boundary between shards, each shard (except the first) is preceded
+		by the last file of the previous shard. An event is assigned to the shard in which it starts before (or
+		after) the mid-point of this overlapping file. Each shard starts reading data on the same block boundaries
+		as a serial analysis, which ensures that events are partitioned identically. The absolute start time of
+		events (AbsEventStart) is offset by the length of the preceding data files. Open channel statistics that
+		are not set explicitly are estimated once from the start of the data set, as in a serial analysis.
+
+		When the open channel current drifts (see `driftThreshold` and `maxDriftRate`), a serial analysis stops.
+		Likewise, a shard that detects drift stops the shards that follow it, and the results of that shard and
+		the shards that precede it are merged.
+
+		The merged database and its analysis log (eventProcessing-*.log) are written by the partition algorithm
+		as in a serial analysis (see :func:`_mergeshards`).
+
+		The analysis falls back to :func:`run_eventpartition` if the data set contains a single shard, if the
+		`start` or `end` trajectory settings are used, or if a data file is shorter than two blocks.
+	"""
+	logger=mlog.mosaicLogging().getLogger(name=__name__)
+	startTime=datetime.datetime.now()
+
+	# Read and parse the settings file
+	settingsdict=settings.settings( dataPath )
+	settingsString=json.dumps(settingsdict.settingsDict, indent=4)
+
+	trajSettings=settingsdict.getSettings(trajDataHnd.__name__)
+	partSettings=dict(settingsdict.getSettings(eventPartHnd.__name__))
+	procSettings=dict(settingsdict.getSettings(eventProcHnd.__name__))
+
+	# Build the list of data files in the same order as a serial analysis
+	trajDataObj=_trajdataobj( trajDataHnd, dataFilterHnd, trajSettings, dirname=dataPath )
+	dataFiles=list(trajDataObj.dataFiles)
+	FsHz=trajDataObj.FsHz
+	nPoints=int(float(partSettings['blockSizeSec'])*FsHz)
+
+	shards=[ dataFiles[i:i+shardFiles] for i in range(0, len(dataFiles), shardFiles) ]
+
+	if len(shards) < 2 or float(trajSettings.get('start', 0)) > 0 or float(trajSettings.get('end', -1)) > 0:
+		logger.warning("WARNING: A sharded analysis is not possible with these settings. Files will be processed sequentially.")
+		run_eventpartition( dataPath, trajDataHnd, dataFilterHnd, eventPartHnd, eventProcHnd, dbFilename )
+		return
+
+	shardSettings=dict( (k, v) for (k, v) in trajSettings.iteritems() if k not in ['dirname', 'nfiles'] )
+
+	tmpdir=tempfile.mkdtemp()
+	nworkers=min( len(shards), max(1, multiprocessing.cpu_count()-int(partSettings.get('reserveNCPU', 2))) )
+
+	# Index of the first data point of the first block with drift in any shard
+	stopIndex=multiprocessing.Value('d', np.inf)
+	pool=multiprocessing.Pool(nworkers, initializer=_initshardworker, initargs=(stopIndex,))
+
+	try:
+		# Index of the first data point of each file in a serial analysis
+		dataLength=[ trajDataObj.filelength(f) for f in dataFiles ]
+		fileStart=dict( zip(dataFiles, np.cumsum([0]+dataLength[:-1])) )
+		fileLength=dict( zip(dataFiles, dataLength) )
+
+		if min(dataLength) < 2*nPoints:
+			logger.warning("WARNING: A sharded analysis requires data files that are longer than two blocks. Files will be processed sequentially.")
+			pool.close()
+			run_eventpartition( dataPath, trajDataHnd, dataFilterHnd, eventPartHnd, eventProcHnd, dbFilename )
+			return
+
+		if any( [ float(partSettings.get(k, -1))==-1. for k in ['meanOpenCurr', 'sdOpenCurr', 'slopeOpenCurr'] ] ):
+			[ partSettings['meanOpenCurr'], partSettings['sdOpenCurr'], partSettings['slopeOpenCurr'] ] = OpenCurrentStats(
+						trajDataObj.previewdata(nPoints),
+						FsHz,
+						float(partSettings.get('minBaseline', -1)),
+						float(partSettings.get('maxBaseline', -1)),
+						str(partSettings.get('baselineEstimator', 'fit'))
+					)
+
+		# Events within a shard are processed serially. Shards are analyzed in temporary 
+		# databases and do not save checkpoints.
+		partSettings['parallelProc']=0
+		partSettings['checkpointIntervalSec']=0
+
+		results=[]
+		for i in range(len(shards)):
+			if i > 0:
+				leadFile=shards[i-1][-1]
+				fnames=[leadFile]+shards[i]
+				startIndex=int(fileStart[leadFile])
+				minIndex=startIndex+fileLength[leadFile]/2
+			else:
+				leadFile=None
+				fnames=shards[i]
+				startIndex=0
+				minIndex=0
+
+			if i < len(shards)-1:
+				lastFile=shards[i][-1]
+				maxIndex=int(fileStart[lastFile])+fileLength[lastFile]/2
+			else:
+				maxIndex=-1
+
+			results.append(
+				pool.apply_async(
+						_runshard,
+						(
+							trajDataHnd,
+							dataFilterHnd,
+							eventPartHnd,
+							eventProcHnd,
+							shardSettings,
+							partSettings,
+							procSettings,
+							settingsString,
+							fnames,
+							startIndex,
+							(-startIndex)%nPoints,
+							minIndex,
+							maxIndex,
+							leadFile,
+							format_path(tmpdir+'/shard-'+str(i)+'.sqlite')
+						)
+					)
+				)
+		pool.close()
+
+		shardinfo=_waitresults(results)
+
+		# A serial analysis stops at the first block with drift. Discard the shards that start after that block.
+		driftIndex=stopIndex.value
+		driftError=None
+		if driftIndex < np.inf:
+			driftError=[ s['driftError'] for s in shardinfo if s['driftIndex']==driftIndex ][0]
+			logger.warning("WARNING: The analysis stopped at data point {0}: {1}".format(int(driftIndex), driftError))
+			shardinfo=[ s for s in shardinfo if s['minIndex'] <= driftIndex ]
+
+		if dbFilename=='':
+			kwargs={}
+		else:
+			kwargs={'dbFilename': dataPath+'/'+dbFilename}
+		_mergeshards( 
+				trajDataObj, 
+				eventPartHnd, 
+				eventProcHnd, 
+				partSettings, 
+				procSettings, 
+				settingsString, 
+				shardinfo, 
+				startTime,
+				min(driftIndex, sum(dataLength)),
+				driftError,
+				**kwargs
+			)
+	finally:
+		pool.terminate()
+		pool.join()
+		shutil.rmtree(tmpdir, ignore_errors=True)
+
+def _initshardworker(stopIndex):
+	# Worker processes ignore SIGINT. A KeyboardInterrupt is handled by the parent process.
+	signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+	global _stopIndex
+	_stopIndex=stopIndex
+
+def _waitresults(results):
+	res=[]
+	for r in results:
+		# Wait with a timeout, which allows a KeyboardInterrupt to be handled.
+		while not r.ready():
+			r.wait(0.1)
+		res.append(r.get())
+
+	return res
+
+def _trajdataobj(trajDataHnd, dataFilterHnd, trajSettings, **kwargs):
+	kwargs.update(trajSettings)
+
+	if dataFilterHnd:
+		return trajDataHnd( datafilter=dataFilterHnd, **kwargs )
+	else:
+		return trajDataHnd( **kwargs )
+
+def _runshard(trajDataHnd, dataFilterHnd, eventPartHnd, eventProcHnd, trajSettings, partSettings, procSettings, settingsString, fnames, startIndex, skipPoints, minIndex, maxIndex, leadFile, dbFilename):
+	"""
+		Analyze a single shard in a worker process. The first data point of fnames is at startIndex in a
+		serial analysis. The first skipPoints points are discarded to align the data blocks with a serial
+		analysis. Events are only processed if they start at or after minIndex and before maxIndex (-1 to
+		process all remaining events). Return the information needed to merge the results.
+
+		When the open channel current drifts, the index of the first data point of the block is saved in
+		_stopIndex, which stops the shards that start after that block.
+	"""
+	dataOffset=startIndex+skipPoints
+	drift={ 'driftIndex' : np.inf, 'driftError' : None }
+
+	def _processEvent(self, eventobj):
+		idx=eventobj.absDataStartIndex+dataOffset
+
+		if idx >= minIndex and (maxIndex < 0 or idx < maxIndex):
+			eventPartHnd._processEvent(self, eventobj)
+
+	def _checkdrift(self, curr):
+		idx=dataOffset+getattr(self, 'driftCheckIndex', 0)
+		self.driftCheckIndex=getattr(self, 'driftCheckIndex', 0)+len(curr)
+
+		if minIndex > _stopIndex.value:
+			raise ExcessiveDriftError("The analysis was stopped because of drift at data point {0}.".format(int(_stopIndex.value)))
+
+		try:
+			eventPartHnd._checkdrift(self, curr)
+		except (ExcessiveDriftError, DriftRateError) as err:
+			drift.update({ 'driftIndex' : idx, 'driftError' : str(err) })
+			with _stopIndex.get_lock():
+				_stopIndex.value=min(_stopIndex.value, idx)
+			raise
+
+	# Keep the name of the partition algorithm, which is saved to the database.
+	shardPartHnd=type(eventPartHnd.__name__, (eventPartHnd,), { '_processEvent' : _processEvent, '_checkdrift' : _checkdrift })
+
+	trajDataObj=_trajdataobj( trajDataHnd, dataFilterHnd, trajSettings, fnames=fnames )
+	if skipPoints:
+		trajDataObj.popdata(skipPoints)
+
+	with shardPartHnd(
+						trajDataObj,
+						eventProcHnd,
+						dict(partSettings),
+						dict(procSettings),
+						settingsString,
+						dbFilename=dbFilename
+					) as EventPartition:
+		EventPartition.PartitionEvents()
+
+		# The state of the partition is used to write the analysis log of the merged analysis.
+		partitionState=dict( 
+				(k, getattr(EventPartition, k)) for k in EventPartition._checkpointattrs 
+				if hasattr(EventPartition, k) and k!='currData' 
+			)
+
+		return {
+				'dbFilename'		: dbFilename,
+				'dataOffset'		: dataOffset,
+				'leadFile'			: leadFile,
+				'minIndex'			: minIndex,
+				'driftIndex'		: drift['driftIndex'],
+				'driftError'		: drift['driftError'],
+				'partitionState'	: partitionState,
+				'segmentTime'		: EventPartition.segmentTime,
+				'procTime'			: EventPartition.procTime
+			}
+
+def _mergeshards(trajDataObj, eventPartHnd, eventProcHnd, partSettings, procSettings, settingsString, shardinfo, startTime, elapsedPoints, driftError, **kwargs):
+	"""
+		Merge the results of the shards into a single database. The database and the analysis log are written by
+		an instance of the partition algorithm, as in a serial analysis. The partition is set to the state of the 
+		last shard, with the range of open channel drift of all shards. The timing information is the sum of the 
+		processing time of the shards.
+	"""
+	with eventPartHnd(
+						trajDataObj,
+						eventProcHnd,
+						dict(partSettings),
+						dict(procSettings),
+						settingsString,
+						**kwargs
+					) as EventPartition:
+		for shard in shardinfo:
+			EventPartition.mdioDBHnd.appendDB(
+					shard['dbFilename'],
+					timeOffset=1000.*shard['dataOffset']/trajDataObj.FsHz,
+					excludeFiles=[ f for f in [ shard['leadFile'] ] if f ]
+				)
+
+		state=dict(shardinfo[-1]['partitionState'])
+		for (k, f) in [ ('minDrift', min), ('maxDrift', max), ('minDriftR', min), ('maxDriftR', max) ]:
+			if k in state:
+				state[k]=f( [ s['partitionState'][k] for s in shardinfo ] )
+		for (k, v) in state.iteritems():
+			setattr(EventPartition, k, v)
+
+		EventPartition.eventcount=len(EventPartition.mdioDBHnd.rawQuery("select recIDX from metadata"))
+		EventPartition.segmentTime=sum( [ s['segmentTime'] for s in shardinfo ] )
+		EventPartition.procTime=sum( [ s['procTime'] for s in shardinfo ] )
+
+		# Remove the files that were read by the shards from the files left to process.
+		nfiles=len(EventPartition.mdioDBHnd.rawQuery("select filename from processedfiles"))
+		trajDataObj.dataFiles=trajDataObj.dataFileList[nfiles:]
+
+		EventPartition.mdioDBHnd.writeAnalysisInfo([
+							trajDataObj.datPath,
+							trajDataObj.fileFormat,
+							eventPartHnd.__name__,
+							eventProcHnd.__name__,
+							EventPartition.fstring,
+							elapsedPoints/float(trajDataObj.FsHz),
+							EventPartition.DataLengthSec,
+							trajDataObj.FsHz
+						])
+
+		EventPartition.logger.info("\nStart time: "+str(startTime.strftime('%Y-%m-%d %I:%M %p'))+"\n\n")
+		EventPartition.logger.info('[Status]')
+		if driftError:
+			EventPartition.logger.info('\tSegment trajectory: ***ERROR***')
+			EventPartition.logger.info('\t\t{0}'.format(driftError))
+		else:
+			EventPartition.logger.info('\tSegment trajectory: ***NORMAL***')
+		EventPartition.logger.info('\tProcess events: ***NORMAL***')
+
+		EventPartition._writeoutputlog()
+
 class SingleChannelAnalysis(object):
 	"""
 		Run a single channel analysis. This is the entry point class for the analysis.
@@ -61,6 +395,8 @@ class SingleChannelAnalysis(object):
 			- `eventPartitionHnd` : a handle to a sub-class of :class:`~mosaic.metaEventPartition`
 			- `eventProcHnd` : a handle to a sub-class of :class:`~mosaic.metaEventProcessor`
 			- `dbFilename` : explicitly set the database name (optional kwarg).
+			- `shardFiles` : analyze groups of `shardFiles` data files in parallel worker processes (optional kwarg, default: 0, disabled). See :func:`run_shardedeventpartition`.
+			- `resume` : resume an interrupted analysis from the last checkpoint saved in the database set by `dbFilename` (optional kwarg, default: False). The analysis uses the settings saved in the database and is resumed sequentially when `shardFiles` is set.
 	"""
 	def __init__(self, dataPath, trajDataHnd, dataFilterHnd, eventPartitionHnd, eventProcHnd, **kwargs):
 		"""
@@ -77,6 +413,8 @@ class SingleChannelAnalysis(object):
 		self.eventProcHnd=eventProcHnd
 
 		self.dbFilename=kwargs.get('dbFilename', '')
+		self.shardFiles=int(kwargs.get('shardFiles', 0))
+		self.resume=bool(kwargs.get('resume', False))
 
 		self.subProc=None
 
@@ -88,11 +426,18 @@ class SingleChannelAnalysis(object):
 			:Parameters:
 				- `forkProcess` : start the analysis in a separate process if *True*. This option is useful when the main thread is used for other processing (e.g. GUI implementations).
 		"""
+		if self.shardFiles > 0 and not self.resume:
+			runfunc=run_shardedeventpartition
+			args=(self.dataPath, self.trajDataHnd, self.dataFilterHnd, self.eventPartitionHnd, self.eventProcHnd, self.dbFilename, self.shardFiles,)
+		else:
+			runfunc=run_eventpartition
+			args=(self.dataPath, self.trajDataHnd, self.dataFilterHnd, self.eventPartitionHnd, self.eventProcHnd, self.dbFilename, self.resume,)
+
 		if forkProcess:
 			try:
 				self.subProc = multiprocessing.Process( 
-						target=run_eventpartition,
-						args=(self.dataPath, self.trajDataHnd, self.dataFilterHnd, self.eventPartitionHnd, self.eventProcHnd, self.dbFilename,)
+						target=runfunc,
+						args=args
 					)
 				self.subProc.start()
 				# self.proc.join()
@@ -100,7 +445,7 @@ class SingleChannelAnalysis(object):
 				self.subProc.terminate()
 				self.subProc.join()
 		else:
-			run_eventpartition( self.dataPath, self.trajDataHnd, self.dataFilterHnd, self.eventPartitionHnd, self.eventProcHnd, self.dbFilename, )
+			runfunc( *args )
 
 	@registerStop("core")
 	def Stop(self):
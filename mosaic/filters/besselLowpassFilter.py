@@ -7,12 +7,17 @@
 	:License:	See LICENSE.TXT
 	:ChangeLog:
 	.. line-block::
+		10/18/26	AB	Renamed overlap and filterChunk to the metaIOFilter hooks _overlap and _filterChunk.
+		10/18/26	AB	Added streaming filter modes: a causal filter that carries its state between chunks and a
+						zero-phase filter that uses overlapping chunks (filterMode, overlap). The filter is
+						designed once in second-order sections.
+		10/18/26	AB	Fixed a TypeError when the filter was designed with a non-integer filter order.
                 11/2/16         KB      changed Bessel filter implementation to match expected rise time
 		9/27/16 	AB 	Control phase delay
 		9/13/15 	AB 	Updated logging to use mosaicLogFormat class
 		7/1/13		AB	Initial version
 """
-import numpy as np 
+import numpy as np
 import scipy.signal as sig
 import sys
 
@@ -27,25 +32,42 @@ class besselLowpassFilter(metaIOFilter.metaIOFilter):
 		In addition to metaIOFilter.__init__ args,
 			- `filterOrder` :		the filter order
 			- `filterCutoff` :	filter cutoff frequency in Hz
+			- `filterMode` :		one of 'chunk', 'causal' or 'zerophase' (default: 'chunk').
+										- 'chunk' : filter each chunk of data independently in the forward and reverse directions. The ends of each chunk are padded with the first and last data points.
+										- 'causal' : filter the data in the forward direction only. The state of the filter is carried from one chunk to the next, which results in a continuous output with the phase delay of the Bessel filter.
+										- 'zerophase' : filter the data in the forward and reverse directions. Each chunk is filtered together with `overlap` neighbouring data points on either side, which gives the same result as filtering a complete data file at once.
+			- `overlap` :		the number of neighbouring data points used in the 'zerophase' mode, in multiples of 1/`filterCutoff` (default: 10)
+			- `causal` :		deprecated, setting `causal` to "True" is equivalent to filterMode='causal'
 	"""
-	
+
 	def _init(self, **kwargs):
 		"""
 		"""
 		self.logger=mlog.mosaicLogging().getLogger(__name__)
 
 		try:
-			self.filterOrder=float(kwargs['filterOrder'])
+			self.filterOrder=int(float(kwargs['filterOrder']))
 			self.filterCutoff=float(kwargs['filterCutoff'])
 		except KeyError:
 			self.logger.error( "ERROR: Missing mandatory arguments 'filterOrder' or 'filterCutoff'" )
-		try:	
-                        self.causal = kwargs['causal'] == "True"
-                except KeyError:
-                        self.causal = False
 
-                if self.causal:
-                        raise NotImplementedError('Causal filter has not been implemented yet')
+		if str(kwargs.get('causal', False))=="True":
+			self.filterMode='causal'
+		else:
+			self.filterMode=str(kwargs.get('filterMode', 'chunk'))
+
+		if self.filterMode not in ['chunk', 'causal', 'zerophase']:
+			raise ValueError("Unknown filter mode '{0}'. filterMode must be one of 'chunk', 'causal' or 'zerophase'.".format(self.filterMode))
+
+		self.overlapCycles=float(kwargs.get('overlap', 10))
+
+		self.stateful=(self.filterMode=='causal')
+
+		# filter coefficients for each sampling frequency
+		self.filterDesign={}
+
+		# state of the causal filter
+		self.zi=None
 
 	def filterData(self, icurr, Fs):
 		"""
@@ -58,23 +80,57 @@ class besselLowpassFilter(metaIOFilter.metaIOFilter):
 		self.eventData=icurr
 		self.Fs=Fs
 
-		#pad the data with 10x the transient time at both ends to manually eliminate edge effects of the filter
-		#for some reason I can't get good results using the pad method in filtfilt so manual it is
-		#this means there may be some numerical artefacts but they should be well below the level of noise
-		
-		padding = int(10 * self.Fs/float(self.filterCutoff))
-		paddedsignal = np.pad(self.eventData,pad_width=padding,mode='edge')
-		
-		b, a=sig.bessel(
-							N=self.filterOrder, 
-							Wn=(self.filterCutoff/(float(self.Fs)/2.0)), 
-							btype='lowpass', 
-							analog=False, 
-							output='ba',
-							norm='mag'
-						)
+		if self.filterMode=='causal':
+			self._filterCausal()
+		elif self.filterMode=='zerophase':
+			self._filterChunk(icurr, Fs, 0, 0)
+		else:
+			self._filterChunkPadded()
 
-		self.eventData=sig.filtfilt(b, a, paddedsignal, padtype=None, method='pad')[padding:-padding]
+	def _overlap(self, Fs):
+		"""
+			Return the number of neighbouring data points required to filter a chunk of data in the 'zerophase' mode.
+			See :func:`~mosaic.filters.metaIOFilter.metaIOFilter._overlap`.
+		"""
+		if self.filterMode=='zerophase':
+			return self._padding(Fs)
+		else:
+			return 0
+
+	def _filterChunk(self, icurr, Fs, pre, post):
+		"""
+			Filter a chunk of data with `pre` and `post` neighbouring data points in the 'zerophase' mode.
+			When fewer neighbouring data points than :func:`_overlap` are available, i.e. at the ends of a data
+			file, the data are padded with the first or last data point.
+			See :func:`~mosaic.filters.metaIOFilter.metaIOFilter._filterChunk`.
+		"""
+		if self.filterMode!='zerophase':
+			super(besselLowpassFilter, self)._filterChunk(icurr, Fs, pre, post)
+			return
+
+		self.Fs=Fs
+
+		n=len(icurr)
+		if n-pre-post <= 0:
+			self.eventData=np.asarray(icurr[pre:pre], dtype=np.float64)
+			return
+
+		padding=self._padding(Fs)
+		padpre=max(padding-pre, 0)
+		padpost=max(padding-post, 0)
+
+		paddedsignal=np.pad(np.asarray(icurr, dtype=np.float64), pad_width=(padpre, padpost), mode='edge')
+
+		self.eventData=sig.sosfiltfilt(self._design(Fs, 'sos'), paddedsignal, padtype=None)[padpre+pre:padpre+n-post]
+
+	def reset(self):
+		"""
+			Clear the state of the causal filter. The next chunk of data is filtered as if it was the start
+			of a data file.
+		"""
+		super(besselLowpassFilter, self).reset()
+
+		self.zi=None
 
 	def formatsettings(self):
 		"""
@@ -85,5 +141,51 @@ class besselLowpassFilter(metaIOFilter.metaIOFilter):
 		self.logger.info( '\t\tFilter type = {0}'.format(self.__class__.__name__) )
 		self.logger.info( '\t\tFilter order = {0}'.format(self.filterOrder) )
 		self.logger.info( '\t\tFilter cutoff = {0} kHz'.format(self.filterCutoff*1e-3) )
-		self.logger.info( '\t\tDecimation = {0}'.format(self.decimate) )
-		
+		self.logger.info( '\t\tFilter mode = {0}'.format(self.filterMode) )
+		if self.filterMode=='zerophase':
+			self.logger.info( '\t\tOverlap = {0}/fc'.format(self.overlapCycles) )
+		self.logger.info( '\t\tDecimation = {0} ({1})'.format(self.decimate, self.decimateMode) )
+
+	def _filterChunkPadded(self):
+		#pad the data with 10x the transient time at both ends to manually eliminate edge effects of the filter
+		#for some reason I can't get good results using the pad method in filtfilt so manual it is
+		#this means there may be some numerical artefacts but they should be well below the level of noise
+
+		padding = int(10 * self.Fs/float(self.filterCutoff))
+		paddedsignal = np.pad(self.eventData,pad_width=padding,mode='edge')
+
+		b, a=self._design(self.Fs, 'ba')
+
+		self.eventData=sig.filtfilt(b, a, paddedsignal, padtype=None, method='pad')[padding:-padding]
+
+	def _filterCausal(self):
+		sos=self._design(self.Fs, 'sos')
+
+		icurr=np.asarray(self.eventData, dtype=np.float64)
+		if len(icurr)==0:
+			self.eventData=icurr
+			return
+
+		# Start from the steady state for the first data point
+		if self.zi is None:
+			self.zi=sig.sosfilt_zi(sos)*icurr[0]
+
+		(self.eventData, self.zi)=sig.sosfilt(sos, icurr, zi=self.zi)
+
+	def _padding(self, Fs):
+		return int(self.overlapCycles * Fs/float(self.filterCutoff))
+
+	def _design(self, Fs, output):
+		try:
+			return self.filterDesign[(Fs, output)]
+		except KeyError:
+			self.filterDesign[(Fs, output)]=sig.bessel(
+							N=self.filterOrder,
+							Wn=(self.filterCutoff/(float(Fs)/2.0)),
+							btype='lowpass',
+							analog=False,
+							output=output,
+							norm='mag'
+						)
+
+			return self.filterDesign[(Fs, output)]
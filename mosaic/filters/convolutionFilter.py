@@ -7,11 +7,16 @@
 	:License:	See LICENSE.TXT
 	:ChangeLog:
 	.. line-block::
+		10/18/26	AB	With polyphase decimation, short filters are combined with the decimator (_decimateResponse),
+						which only calculates the data points that are kept.
+		10/18/26	AB	Filter long kernels with FFT overlap-save (fftThreshold) and carry a fixed
+						length buffer between chunks. Fixed parsing of filterCoeff.
 		9/13/15 	AB 	Updated logging to use mosaicLogFormat class
 		8/16/13		AB	Initial version
 """
-import numpy as np 
+import numpy as np
 import scipy.signal as sig
+import scipy.fftpack
 
 import mosaic.filters.metaIOFilter as metaIOFilter
 import mosaic.utilities.mosaicLogging as mlog
@@ -21,20 +26,46 @@ __all__ = ["convolutionFilter"]
 
 class convolutionFilter(metaIOFilter.metaIOFilter):
 	"""
+		The filter carries the last len(`filterCoeff`)-1 data points of each chunk to the next chunk. The
+		first chunk of data is prepended with its first data point, which returns one filtered data point
+		for each data point. Kernels with at least `fftThreshold` coefficients are applied with FFT
+		overlap-save, which gives the same result as the direct correlation to within rounding errors. With 
+		polyphase decimation (decimateMode='polyphase'), kernels with fewer than `fftThreshold`*`decimate`/2 
+		coefficients are combined with the FIR filter of the decimator, and the filter is only applied to the data 
+		points that are kept. Longer kernels are applied with the FFT before the data are decimated. The coefficients [1.0] 
+		decimate the data without additional filtering.
+
 		:Keyword Args:
 		In addition to metaIOFilter.__init__ args,
 			- `filterCoeff` :		filter coefficients (default is a 10 point uniform moving average)
+			- `fftThreshold` :		minimum number of filter coefficients for which the FFT is used (default: 128)
 	"""
 
 	def _init(self, **kwargs):
 		"""
-		"""		
+		"""
 		try:
-			self.filterCoeff=ast.eval_(kwargs['filterCoeff'])
+			filterCoeff=kwargs['filterCoeff']
+			if isinstance(filterCoeff, basestring):
+				filterCoeff=eval_(filterCoeff)
+			self.filterCoeff=list(filterCoeff)
 		except KeyError:
 			self.filterCoeff=[1.0/10.0]*10
 
-		self.filtBuf=np.array([])
+		self.fftThreshold=int(kwargs.get('fftThreshold', 128))
+
+		self.stateful=True
+
+		self.useFFT=(len(self.filterCoeff) >= self.fftThreshold)
+
+		self.kernel=np.asarray(self.filterCoeff, dtype=np.float64)
+
+		# Work buffer that holds the carried data points followed by the current chunk
+		self.filtBuf=np.zeros(len(self.kernel)-1)
+		self.carried=False
+
+		# Spectrum of the kernel for each FFT length
+		self.kernelSpectrum={}
 
 		self.logger=mlog.mosaicLogging().getLogger(__name__)
 
@@ -46,10 +77,46 @@ class convolutionFilter(metaIOFilter.metaIOFilter):
 				- `icurr` :	ionic current in pA
 				- `Fs` :	original sampling frequency in Hz
 		"""
-		self.filtBuf=np.hstack( (self.filtBuf, icurr) )
-		self.eventData=np.correlate(self.filtBuf, self.filterCoeff, 'valid')
-		self.filtBuf=self.filtBuf[len(self.filterCoeff)-1:]
+		self.Fs=Fs
+
+		if self.foldedDecimation:
+			# the filter is applied by the polyphase decimator
+			self.eventData=np.array(icurr, dtype=np.float64)
+			return
+
+		icurr=np.asarray(icurr, dtype=np.float64)
+		n=len(icurr)
+		m=len(self.kernel)-1
+
+		if n==0:
+			self.eventData=icurr
+			return
+
+		if not self.carried:
+			self.filtBuf[:m]=icurr[0]
+			self.carried=True
+
+		if len(self.filtBuf)!=m+n:
+			buf=np.empty(m+n)
+			buf[:m]=self.filtBuf[:m]
+			self.filtBuf=buf
+
+		self.filtBuf[m:]=icurr
+
+		if self.useFFT:
+			self.eventData=self._correlateFFT(self.filtBuf)
+		else:
+			self.eventData=np.correlate(self.filtBuf, self.kernel, 'valid')
 
+		self.filtBuf[:m]=self.filtBuf[n:]
+
+	def reset(self):
+		"""
+			Clear the data points carried from the previous chunk.
+		"""
+		super(convolutionFilter, self).reset()
+
+		self.carried=False
 
 	def formatsettings(self):
 		"""
@@ -59,5 +126,31 @@ class convolutionFilter(metaIOFilter.metaIOFilter):
 
 		self.logger.info( '\t\tFilter type = {0}'.format(self.__class__.__name__) )
 		self.logger.info( '\t\tFilter coefficients = {0}'.format(self.filterCoeff) )
+		self.logger.info( '\t\tFFT = {0}'.format(self.useFFT) )
 		self.logger.info( '\t\tDecimation = {0}'.format(self.decimate) )
-		
+
+	def _decimateResponse(self):
+		"""
+			Return the impulse response of the filter, which is combined with the polyphase decimator.
+			See :func:`~mosaic.filters.metaIOFilter.metaIOFilter._decimateResponse`.
+		"""
+		# The combined filter applies len(kernel)/decimate additional coefficients to each data point, 
+		# which is slower than the FFT for more than about fftThreshold/2 coefficients.
+		if len(self.kernel) >= self.fftThreshold*self.decimate/2.0:
+			return None
+
+		return self.kernel[::-1]
+
+	def _correlateFFT(self, dat):
+		# Overlap-save: the circular correlation of dat with the kernel is
+		# exact for the last len(dat)-len(kernel)+1 data points.
+		m=len(self.kernel)-1
+		nfft=scipy.fftpack.next_fast_len(len(dat))
+
+		try:
+			H=self.kernelSpectrum[nfft]
+		except KeyError:
+			H=np.fft.rfft(self.kernel[::-1], nfft)
+			self.kernelSpectrum[nfft]=H
+
+		return np.fft.irfft(np.fft.rfft(dat, nfft)*H, nfft)[m:len(dat)]
@@ -0,0 +1,224 @@
+# -*- coding: utf-8 -*-
+"""
+	A data filter that applies a sequence of data filters
+
+	:Created: 	10/18/2026
+ 	:Author: 	Arvind Balijepalli <arvind.balijepalli@nist.gov>
+	:License:	See LICENSE.TXT
+	:ChangeLog:
+	.. line-block::
+		10/18/26	AB	Initial version
+"""
+import importlib
+
+import numpy as np
+
+import mosaic.filters.metaIOFilter as metaIOFilter
+import mosaic.utilities.mosaicLogging as mlog
+from mosaic.utilities.util import eval_
+from mosaic.utilities.mosaicLogFormat import mosaic_property
+
+__all__ = ["filterChain"]
+
+class filterChain(metaIOFilter.metaIOFilter):
+	"""
+		Apply a sequence of filters (stages) to each chunk of data. The output of each stage is passed
+		directly to the next stage, and the sampling frequency of each stage is the sampling frequency
+		of the previous stage after decimation. A typical settings section is shown below.
+
+		.. code-block:: javascript
+
+			"filterChain" : {
+					"filters"	: "[('besselLowpassFilter', {'filterOrder' : 6, 'filterCutoff' : 100000, 'filterMode' : 'zerophase'}), ('besselLowpassFilter', {'filterOrder' : 4, 'filterCutoff' : 200000, 'filterMode' : 'causal', 'decimate' : 8, 'decimateMode' : 'polyphase'})]",
+					"decimate"	: 1
+				}
+
+		Stages that require neighbouring data points (see :func:`~mosaic.filters.metaIOFilter.metaIOFilter.overlap`)
+		receive them when all preceding stages are applied at the original sampling frequency. Stages that follow
+		a stage with decimation filter each chunk without neighbouring data points.
+
+		Stateful stages filter each data point once, which keeps their state continuous from one chunk to 
+		the next. A stateful stage runs ahead of the chunk by the neighbouring data points that the following
+		stages require, and carries the filtered data points that follow the chunk to the next chunk. The 
+		preceding data points are taken from the output of the stateful stage for the previous chunk. The 
+		output of the chain is therefore identical to filtering a complete data file with each stage in turn.
+
+		The chain is not allocation-free: each stage returns a new array of filtered data, and the output of 
+		a stateful stage is joined with the carried data points before it is passed to the following stages.
+
+		:Keyword Args:
+		In addition to metaIOFilter.__init__ args,
+			- `filters` :	a list of (filter name, settings) pairs. Each filter name is the name of a module in mosaic.filters that defines a filter class of the same name.
+
+		:Properties:
+			- `stages` :	list of filter objects
+	"""
+
+	def _init(self, **kwargs):
+		"""
+		"""
+		self.logger=mlog.mosaicLogging().getLogger(__name__)
+
+		try:
+			filters=kwargs['filters']
+			if isinstance(filters, basestring):
+				filters=eval_(filters)
+		except KeyError:
+			self.logger.error( "ERROR: Missing mandatory argument 'filters'" )
+			filters=[]
+
+		self.stages=[]
+		for (name, filtsettings) in filters:
+			self.stages.append( self._filterclass(name)(**filtsettings) )
+
+		self.stateful=any([ s.stateful for s in self.stages ])
+
+		# the last output data points of each stateful stage and the output data points that follow the chunk
+		self.history={}
+		self.ahead={}
+
+	def filterData(self, icurr, Fs):
+		"""
+			Filter an ionic current time-series with each stage and store the result in self.eventData
+
+			:Parameters:
+				- `icurr` :	ionic current in pA
+				- `Fs` :	original sampling frequency in Hz
+		"""
+		self.filterChunk(icurr, Fs, 0, 0)
+
+	def _overlap(self, Fs):
+		"""
+			Return the sum of the neighbouring data points required by each stage, up to and including
+			the first stage with decimation. See :func:`~mosaic.filters.metaIOFilter.metaIOFilter._overlap`.
+		"""
+		L=0
+		for s in self.stages:
+			L+=s.overlap(Fs)
+			if s.totalDecimation > 1:
+				break
+
+		return L
+
+	def _filterChunk(self, icurr, Fs, pre, post):
+		"""
+			Filter a chunk of data with `pre` and `post` neighbouring data points. Each stateless stage uses 
+			its share of the neighbouring data points and passes the remainder to the next stage. Stateful 
+			stages filter the chunk with their own share of the neighbouring data points (see :func:`_filterStateful`).
+			See :func:`~mosaic.filters.metaIOFilter.metaIOFilter._filterChunk`.
+		"""
+		self.Fs=Fs
+
+		dat=icurr
+		L=self._overlap(Fs)
+		for (i, s) in enumerate(self.stages):
+			# neighbouring data points that are passed on to the following stages
+			L-=s.overlap(Fs)
+			if s.totalDecimation > 1:
+				L=0
+
+			if s.stateful:
+				(dat, pre, post)=self._filterStateful(i, s, dat, Fs, pre, post, L)
+			else:
+				keeppre=min(pre, L)
+				keeppost=min(post, L)
+
+				s.filterChunk(dat, Fs, pre-keeppre, post-keeppost)
+
+				dat=s.filteredData
+				(pre, post)=(keeppre, keeppost)
+
+			Fs=s.filterFs
+
+		self.eventData=dat
+
+	def reset(self):
+		"""
+			Reset each stage.
+		"""
+		super(filterChain, self).reset()
+
+		for s in self.stages:
+			s.reset()
+
+		self.history={}
+		self.ahead={}
+
+	def formatsettings(self):
+		"""
+			Populate `logObject` with settings strings for display
+		"""
+		self.logger.info( '\tFilter settings:' )
+
+		self.logger.info( '\t\tFilter type = {0}'.format(self.__class__.__name__) )
+		self.logger.info( '\t\tNumber of stages = {0}'.format(len(self.stages)) )
+		self.logger.info( '\t\tDecimation = {0}'.format(self.decimate) )
+
+		for s in self.stages:
+			s.formatsettings()
+
+	@mosaic_property
+	def totalDecimation(self):
+		"""
+			Return the product of the decimation of each stage and the decimation of the chain.
+		"""
+		return int(np.prod([ s.totalDecimation for s in self.stages ]))*self.decimate
+
+	@mosaic_property
+	def filterFs(self):
+		"""
+			Return the sampling frequency of filtered data.
+		"""
+		return self.Fs/self.totalDecimation
+
+	def __getattr__(self, name):
+		# Look up attributes that are not defined by the chain in the stages,
+		# starting with the last stage (e.g. maxWaveletLevel).
+		if not hasattr(type(self), name):
+			for s in reversed(self.__dict__.get('stages', [])):
+				if hasattr(s, name):
+					return getattr(s, name)
+
+		raise AttributeError("'{0}' object has no attribute '{1}'".format(type(self).__name__, name))
+
+	def _filterStateful(self, i, s, dat, Fs, pre, post, L):
+		# Filter the chunk in dat with stage i and return the output extended by up to L neighbouring 
+		# data points for the following stages. The preceding data points are the last L data points 
+		# returned by the stage. The stage runs ahead of the chunk by the following data points, which 
+		# are carried to the next chunk in self.ahead. Each data point is therefore filtered once.
+		n=len(dat)
+		keeppre=min(pre, L)
+		keeppost=min(post, L)
+
+		if not L:
+			s.filterChunk(dat, Fs, pre, post)
+			return (s.filteredData, 0, 0)
+
+		m=n-pre-post
+		ahead=self.ahead.get(i, dat[:0])
+
+		# filter the data points that follow the carried data points
+		if len(ahead) < m+keeppost:
+			start=pre+len(ahead)
+			end=n-post+keeppost
+			P=min(start, s.overlap(Fs))
+			Q=min(n-end, s.overlap(Fs))
+
+			s.filterChunk(dat[start-P:end+Q], Fs, P, Q)
+			ahead=np.concatenate([ahead, s.filteredData])
+
+		out=ahead[:m]
+		self.ahead[i]=ahead[m:]
+
+		hist=self.history.get(i, out[:0])
+		keeppre=min(keeppre, len(hist))
+
+		self.history[i]=np.concatenate([hist, out])[-L:]
+
+		return (np.concatenate([hist[len(hist)-keeppre:], ahead[:m+keeppost]]), keeppre, keeppost)
+
+	def _filterclass(self, name):
+		try:
+			return getattr(importlib.import_module('mosaic.filters.'+name), name)
+		except (ImportError, AttributeError):
+			raise ValueError("Unknown filter '{0}'. Each filter in a filterChain must be defined in a module of the same name in mosaic.filters.".format(name))
@@ -8,9 +8,20 @@
 	:License:	See LICENSE.TXT
 	:ChangeLog:
 	.. line-block::
+		10/18/26	AB	Copies of a filter (copy.deepcopy) share its logger.
+		10/18/26	AB	Added the totalDecimation property.
+		10/18/26	AB	Added a polyphase FIR decimator that is centred on the data points that are kept (decimateMode). The
+						filter runs ahead of the decimator and carries the following filtered data points to the next chunk
+						(overlap, filterChunk). Sub-classes implement _overlap and _filterChunk. FIR filters can fold their
+						response into the decimator (_decimateResponse).
+		10/18/26	AB	Added an interface for filters that use neighbouring data (overlap, filterChunk) or carry state between chunks (stateful, reset).
 		7/1/13		AB	Initial version
 """
 from abc import ABCMeta, abstractmethod
+import copy
+import logging
+import numpy as np
+import scipy.signal as sig
 import mosaic.utilities.util as util
 from mosaic.utilities.mosaicLogFormat import mosaic_property
 
@@ -27,10 +38,19 @@ class metaIOFilter(object):
 
 		:Parameters:
 			- `decimate` :		sets the downsampling ratio of the filtered data (default:1, no decimation). 
+			- `decimateMode` :	'stride' or 'polyphase' (default: 'stride').
+									- 'stride' : keep every `decimate` data point of the filtered data.
+									- 'polyphase' : apply a low-pass FIR anti-aliasing filter with a cutoff at the decimated Nyquist frequency. Only the data points that are kept are calculated, and the state of the FIR filter is carried from one chunk of data to the next. As in scipy.signal.resample_poly, the FIR filter is centred on the data points that are kept, so the decimated data are not delayed. The decimator requires 10*`decimate` filtered data points that follow each chunk (see :func:`overlap`). The filter runs ahead of the decimator by these data points, which are carried to the next chunk. When fewer data points are available, or when the filter decimates the data before the polyphase decimator (e.g. a filterChain with decimating stages), the last data point is repeated.
+
+		In addition, filters that require data that precedes or follows each chunk of data can implement 
+		:func:`_overlap` and :func:`_filterChunk`, and filters that carry state from one chunk to the next 
+		can set `stateful` and implement :func:`reset`. FIR filters can implement :func:`_decimateResponse`,
+		which applies the filter as part of the polyphase decimator without filtering every data point.
 
 		:Properties:
 			- `filteredData` :		list of filtered and decimated data
 			- `filterFs` :			sampling frequency after filtering and decimation
+			- `stateful` :			True if the filter carries state from one chunk of data to the next (default: False)
 	"""
 	__metaclass__=ABCMeta
 
@@ -38,10 +58,48 @@ class metaIOFilter(object):
 		"""
 		"""
 		self.decimate=int(kwargs.pop('decimate', 1))
+		self.decimateMode=str(kwargs.pop('decimateMode', 'stride'))
+
+		if self.decimateMode not in ['stride', 'polyphase']:
+			raise ValueError("Unknown decimation mode '{0}'. decimateMode must be one of 'stride' or 'polyphase'.".format(self.decimateMode))
+
+		self.stateful=False
 
 		# sub-class initialization
 		self._init(**kwargs)
 
+		self.polyphaseDecimation=(self.decimateMode=='polyphase' and self.decimate > 1)
+		self.foldedDecimation=False
+		if self.polyphaseDecimation:
+			# Anti-aliasing filter designed as in scipy.signal.resample_poly. The filter 
+			# is centred on the data point at index decimateCenter.
+			self.decimateTaps=sig.firwin(20*self.decimate+1, 1.0/self.decimate, window=('kaiser', 5.0))
+			self.decimateCenter=10*self.decimate
+			self.stateful=True
+
+			h=self._decimateResponse()
+			if h is not None:
+				self.decimateTaps=np.convolve(self.decimateTaps, h)
+				self.foldedDecimation=True
+
+			# Polyphase components of the FIR filter: decimatePhases[decimate-1-r, q]=decimateTaps[q*decimate+r]
+			taps=np.append(self.decimateTaps, np.zeros(-len(self.decimateTaps)%self.decimate))
+			self.decimatePhases=np.ascontiguousarray(taps.reshape(-1, self.decimate)[:, ::-1].T)
+
+		self._decimateState=None
+		self._decimateInput=None
+		self._decimateOutput=None
+		self._decimateLookahead=None
+
+	def __deepcopy__(self, memo):
+		# Loggers cannot be copied. A copy of a filter shares the logger of the filter.
+		c=self.__class__.__new__(self.__class__)
+		memo[id(self)]=c
+		for (k, v) in self.__dict__.iteritems():
+			c.__dict__[k]=v if isinstance(v, logging.Logger) else copy.deepcopy(v, memo)
+
+		return c
+
 	@abstractmethod
 	def _init(self, **kwargs):
 		"""
@@ -65,6 +123,121 @@ class metaIOFilter(object):
 		"""
 		pass
 
+	def overlap(self, Fs):
+		"""
+			Return the number of data points that are needed before and after a chunk of data to filter it. 
+			When the overlap is not zero, metaTrajIO passes each chunk to :func:`filterChunk` together with 
+			up to `overlap` neighbouring data points from the same data file on either side. The overlap is 
+			the sum of the overlap of the filter (:func:`_overlap`) and the data points used by the polyphase 
+			decimator.
+
+			:Parameters:
+				- `Fs` :	original sampling frequency in Hz
+		"""
+		return self._overlap(Fs)+self._lookahead()
+
+	def filterChunk(self, icurr, Fs, pre, post):
+		"""
+			Filter a chunk of data that is extended by neighbouring data points (see :func:`overlap`). The 
+			chunk is filtered with :func:`_filterChunk`. When the data is decimated with the polyphase decimator,
+			the data points that follow the chunk are filtered together with the chunk and are carried to the next 
+			chunk, which is then filtered from the end of the carried data points. Each chunk must therefore follow 
+			the previously filtered chunk, or :func:`reset` must be called first.
+
+			:Parameters:
+				- `icurr` :	ionic current in pA
+				- `Fs` :	original sampling frequency in Hz
+				- `pre` :	number of data points in `icurr` that precede the chunk
+				- `post` :	number of data points in `icurr` that follow the chunk
+		"""
+		L=self._lookahead()
+		if not L:
+			self._filterChunk(icurr, Fs, pre, post)
+			return
+
+		# filtered data points that follow the previous chunk
+		if self._decimateLookahead and self._decimateLookahead[0] is self.eventData:
+			ahead=self._decimateLookahead[1]
+		else:
+			ahead=np.zeros(0)
+
+		n=len(icurr)
+		m=n-pre-post
+		la=min(post, L)
+
+		# filter the data points that follow the carried data points
+		if len(ahead) < m+la:
+			start=pre+len(ahead)
+			end=n-post+la
+			P=min(start, self._overlap(Fs))
+			Q=min(n-end, self._overlap(Fs))
+
+			self._filterChunk(icurr[start-P:end+Q], Fs, P, Q)
+			if len(ahead):
+				ahead=np.concatenate([ahead, self.eventData])
+			else:
+				ahead=self.eventData
+
+		self.eventData=ahead[:m]
+		self._decimateLookahead=(self.eventData, ahead[m:])
+
+	def _overlap(self, Fs):
+		"""
+			Return the number of data points that the filter needs before and after a chunk of data. 
+
+			:Parameters:
+				- `Fs` :	original sampling frequency in Hz
+
+			:Default Behavior:
+
+				- Return 0.
+		"""
+		return 0
+
+	def _filterChunk(self, icurr, Fs, pre, post):
+		"""
+			Filter a chunk of data that is extended by neighbouring data points (see :func:`_overlap`). As with 
+			:func:`filterData`, the filtered chunk (without the neighbouring data points) must be stored in self.eventData.
+			`icurr` may hold more neighbouring data points than the filter requires.
+
+			:Parameters:
+				- `icurr` :	ionic current in pA
+				- `Fs` :	original sampling frequency in Hz
+				- `pre` :	number of data points in `icurr` that precede the chunk
+				- `post` :	number of data points in `icurr` that follow the chunk
+
+			:Default Behavior:
+
+				- Filter the chunk with :func:`filterData`.
+		"""
+		self.filterData(icurr[pre:len(icurr)-post], Fs)
+
+	def _decimateResponse(self):
+		"""
+			Return the impulse response of a FIR filter, which is combined with the polyphase decimator. Filters
+			that return a response must store the unfiltered data in self.eventData when `foldedDecimation` is True.
+
+			:Default Behavior:
+
+				- Return None, i.e. the filter is applied to every data point before decimation.
+		"""
+		return None
+
+	def reset(self):
+		"""
+			Clear the state carried from one chunk of data to the next by stateful filters. metaTrajIO 
+			calls this function before filtering data that does not follow the previously filtered chunk.
+			Sub-classes that implement this function must call the base class implementation.
+
+			:Default Behavior:
+
+				- Clear the state of the polyphase decimator.
+		"""
+		self._decimateState=None
+		self._decimateInput=None
+		self._decimateOutput=None
+		self._decimateLookahead=None
+
 	@abstractmethod
 	def formatsettings(self):
 		"""
@@ -79,9 +252,30 @@ class metaIOFilter(object):
 		"""
 			Return filtered data
 		"""
+		if self.polyphaseDecimation:
+			# Decimate each chunk of filtered data once
+			if self._decimateInput is not self.eventData:
+				# filtered data points that follow the chunk
+				if self._decimateLookahead and self._decimateLookahead[0] is self.eventData:
+					future=self._decimateLookahead[1]
+				else:
+					future=[]
+
+				self._decimateOutput=self._polyphaseDecimate(self.eventData, future)
+				self._decimateInput=self.eventData
+
+			return self._decimateOutput
+
 		# return util.decimate(self.eventData, self.decimate)
 		return self.eventData[::self.decimate]
 
+	@mosaic_property
+	def totalDecimation(self):
+		"""
+			Return the ratio of the original sampling frequency and the sampling frequency of filtered data.
+		"""
+		return self.decimate
+
 	@mosaic_property
 	def filterFs(self):
 		"""
@@ -89,4 +283,48 @@ class metaIOFilter(object):
 		"""
 		return self.Fs/self.decimate
 
+	def _lookahead(self):
+		# Number of data points that follow a chunk that are used by the polyphase decimator. The 
+		# filtered data points cannot be carried between chunks when the filter decimates the data.
+		if self.polyphaseDecimation and self.totalDecimation==self.decimate:
+			return self.decimateCenter
+		else:
+			return 0
+
+	def _polyphaseDecimate(self, dat, future):
+		# Decimate a chunk of data with the FIR filter centred on the data points that are kept. 
+		# The data points that precede the chunk are carried from the previous chunk, and the first 
+		# chunk is prepended with its first data point. The data points that follow the chunk are 
+		# taken from future, which is extended with its last data point. As with 'stride' decimation, 
+		# the data points that are kept are 0, decimate, 2*decimate, ... relative to the start of each chunk.
+		D=self.decimate
+		dat=np.asarray(dat, dtype=np.float64)
+		n=len(dat)
+		if n==0:
+			return dat
+
+		# The data point k of the chunk is at index nstate+k of z and is filtered 
+		# at index Q*D+k, where Q is the number of taps of each polyphase component.
+		(Q, c)=(self.decimatePhases.shape[1], self.decimateCenter)
+		nstate=Q*D-c
+		if self._decimateState is None:
+			self._decimateState=dat[0]*np.ones(nstate)
+
+		future=np.asarray(future, dtype=np.float64)[:c]
+		last=future[-1] if len(future) else dat[-1]
+
+		z=np.concatenate([self._decimateState, dat, future, last*np.ones(c-len(future))])
+		self._decimateState=z[n:n+nstate]
+
+		# Row t of the matrix holds the data points t*D+1, ..., t*D+D of z, and P[t, q] is the 
+		# polyphase component q of the filter applied to row t. The data point j*D of the chunk 
+		# is filtered at index (Q+j)*D of z, which is the sum of P[Q-1+j-q, q] over q.
+		J=int(np.ceil(n/float(D)))
+		T=J+Q-1
+		P=np.dot(z[1:1+T*D].reshape(T, D), self.decimatePhases)
+
+		out=P[Q-1:Q-1+J, 0].copy()
+		for q in range(1, Q):
+			out+=P[Q-1-q:Q-1-q+J, q]
 
+		return out
@@ -8,6 +8,8 @@
 	:Author: Arvind Balijepalli
 	:ChangeLog:
 	.. line-block::
+		10/18/26	AB	Added a streaming mode that denoises overlapping windows (filterMode) and an optional noise
+						threshold estimated over a baseline window (thresholdWindow). Wavelet objects are cached by name.
 		9/13/15 	AB 	Updated logging to use mosaicLogFormat class
 		8/31/14		AB	Initial version
 """
@@ -20,6 +22,10 @@ import mosaic.utilities.mosaicLogging as mlog
 
 __all__ = ["waveletDenoiseFilter"]
 
+# Wavelet objects for each wavelet name. pywt.Wavelet objects cannot be copied, 
+# so each filter stores the name of its wavelet.
+_wavelets={}
+
 class waveletDenoiseFilter(metaIOFilter.metaIOFilter):
 	"""
 		:Keyword Args:
@@ -27,6 +33,10 @@ class waveletDenoiseFilter(metaIOFilter.metaIOFilter):
 				- `wavelet` :		the type of wavelet
 				- `level` :		wavelet level
 				- `threshold` :	threshold type
+				- `filterMode` :	'chunk' or 'streaming' (default: 'chunk').
+										- 'chunk' : denoise each chunk of data independently.
+										- 'streaming' : denoise each chunk together with neighbouring data points on either side, which are discarded after the wavelet reconstruction. This removes artefacts at the ends of each chunk.
+				- `thresholdWindow` :	number of data points used to estimate the noise threshold (default: 0). When set, the threshold is estimated from the chunks of data that are filtered until `thresholdWindow` data points are processed and is then reused for all subsequent data. By default, the threshold is estimated from each chunk of data.
 	"""
 
 	def _init(self, **kwargs):
@@ -40,9 +50,24 @@ class waveletDenoiseFilter(metaIOFilter.metaIOFilter):
 			self.waveletThresholdSubType=str(kwargs['thresholdSubType'])
 
 			self.maxWaveletLevel=self.waveletLevel
+
+			self._wavelet()
 		except KeyError:
 			self.logger.error( "ERROR: Missing mandatory arguments 'wavelet', 'level' or 'threshold'" )
 
+		self.filterMode=str(kwargs.get('filterMode', 'chunk'))
+		if self.filterMode not in ['chunk', 'streaming']:
+			raise ValueError("Unknown filter mode '{0}'. filterMode must be one of 'chunk' or 'streaming'.".format(self.filterMode))
+
+		self.thresholdWindow=int(kwargs.get('thresholdWindow', 0))
+
+		# Noise threshold estimated over thresholdWindow data points
+		self.threshold=None
+		self.thresholdPoints=0
+		self.noiseStats=np.zeros(3)
+
+		# Maximum wavelet level for each data length
+		self.maxLevels={}
 
 	def filterData(self, icurr, Fs):
 		"""
@@ -55,18 +80,58 @@ class waveletDenoiseFilter(metaIOFilter.metaIOFilter):
 		# self.eventData=icurr
 		self.Fs=Fs
 
-		# Set up the wavelet
-		w=pywt.Wavelet(self.waveletType)
+		if self.filterMode=='streaming':
+			self._filterChunk(icurr, Fs, 0, 0)
+		else:
+			self.eventData=self._denoise(icurr, len(icurr))[:len(icurr)]
+
+	def _overlap(self, Fs):
+		"""
+			Return the number of neighbouring data points used to denoise a chunk of data in the 'streaming' mode,
+			which is the length of the wavelet filter at the deepest decomposition level. 
+			See :func:`~mosaic.filters.metaIOFilter.metaIOFilter._overlap`.
+		"""
+		if self.filterMode=='streaming':
+			return self._wavelet().dec_len*2**self.waveletLevel
+		else:
+			return 0
+
+	def _filterChunk(self, icurr, Fs, pre, post):
+		"""
+			Denoise a chunk of data together with `pre` and `post` neighbouring data points in the 'streaming' mode.
+			See :func:`~mosaic.filters.metaIOFilter.metaIOFilter._filterChunk`.
+		"""
+		if self.filterMode!='streaming':
+			super(waveletDenoiseFilter, self)._filterChunk(icurr, Fs, pre, post)
+			return
+
+		self.Fs=Fs
+
+		self.eventData=self._denoise(icurr, len(icurr)-pre-post)[pre:len(icurr)-post]
+
+	def _wavelet(self):
+		try:
+			return _wavelets[self.waveletType]
+		except KeyError:
+			_wavelets[self.waveletType]=pywt.Wavelet(self.waveletType)
+			return _wavelets[self.waveletType]
+
+	def _denoise(self, icurr, npoints):
+		wavelet=self._wavelet()
 
 		# Calculate the maximum wavelet level for the data length
-		self.maxWaveletLevel=pywt.dwt_max_level(len(icurr), filter_len=w.dec_len)
+		try:
+			self.maxWaveletLevel=self.maxLevels[len(icurr)]
+		except KeyError:
+			self.maxWaveletLevel=pywt.dwt_max_level(len(icurr), filter_len=wavelet.dec_len)
+			self.maxLevels[len(icurr)]=self.maxWaveletLevel
 
 		# Perform a wavelet decomposition to the specified level
-		wcoeff = pywt.wavedec(icurr, w, mode='sym', level=self.waveletLevel)
+		wcoeff = pywt.wavedec(icurr, wavelet, mode='sym', level=self.waveletLevel)
 
 		# Perform a simple threshold by setting all the detailed coefficients
 		# up to level n-1 to zero
-		thresh=np.std(wcoeff[-1])*self._thselect(wcoeff, self.waveletThresholdSubType)
+		thresh=self._threshold(wcoeff, npoints)
 
 		# print thresh, np.std(wcoeff[-1])
 		wcoeff[1:] = [ pywt.threshold(wc, thresh, self.waveletThresholdType) for wc in wcoeff[1:] ]
@@ -74,7 +139,21 @@ class waveletDenoiseFilter(metaIOFilter.metaIOFilter):
 		# 	wcoeff[-i]=np.zeros(len(wcoeff[-i]))
 
 		# Reconstruct the signal with the thresholded wavelet coefficients
-		self.eventData = pywt.waverec(wcoeff, self.waveletType, mode='sym')
+		return pywt.waverec(wcoeff, wavelet, mode='sym')
+
+	def _threshold(self, wcoeff, npoints):
+		if self.thresholdWindow <= 0:
+			return np.std(wcoeff[-1])*self._thselect(wcoeff, self.waveletThresholdSubType)
+
+		# Update the estimate of the noise threshold until thresholdWindow data points are processed
+		if self.thresholdPoints < self.thresholdWindow:
+			self.noiseStats+=[ len(wcoeff[-1]), np.sum(wcoeff[-1]), np.sum(wcoeff[-1]**2) ]
+			self.thresholdPoints+=npoints
+
+			(n, s, s2)=self.noiseStats
+			self.threshold=np.sqrt(max(s2/n-(s/n)**2, 0))*self._thselect(wcoeff, self.waveletThresholdSubType)
+
+		return self.threshold
 
 	def _thselect(self, dat, thtype):
 		"""
@@ -118,7 +197,7 @@ class waveletDenoiseFilter(metaIOFilter.metaIOFilter):
 			 	}[thtype]
 			return thalgo(dat, len(dat))
 		except KeyError, err:
-			logger.warning( "WARNING: Thresholding algorithm '{0}' is not available. Using default threshold (sqtwolog).".format(thtype) )
+			self.logger.warning( "WARNING: Thresholding algorithm '{0}' is not available. Using default threshold (sqtwolog).".format(thtype) )
 			# default
 			self.waveletThresholdSubType='sqtwolog'
 			return _sqtwolog(dat, len(dat))
@@ -134,6 +213,9 @@ class waveletDenoiseFilter(metaIOFilter.metaIOFilter):
 		self.logger.info( '\t\tWavelet level = {0}'.format(self.waveletLevel) )
 		self.logger.info( '\t\tWavelet threshold type = {0}'.format(self.waveletThresholdType) )
 		self.logger.info( '\t\tWavelet threshold sub-type = {0}'.format(self.waveletThresholdSubType) )
+		self.logger.info( '\t\tFilter mode = {0}'.format(self.filterMode) )
+		if self.thresholdWindow > 0:
+			self.logger.info( '\t\tThreshold window = {0} points'.format(self.thresholdWindow) )
 		self.logger.info( '\t\tDecimation = {0}'.format(self.decimate) )
 
 if __name__ == '__main__':
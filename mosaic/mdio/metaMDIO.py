@@ -6,6 +6,9 @@
 	:License:	See LICENSE.TXT
 	:ChangeLog:
 	.. line-block::
+		10/18/26	AB	Added an interface to save and restore analysis checkpoints.
+		10/18/26	AB	Added an interface to write multiple records at once.
+		10/18/26	AB	Added an interface to append the contents of a database.
 		11/9/14 	AB 	Added an interface to read/write the output log of an analysis from/to a DB.
 		3/1/14		AB	Initial version
 """
@@ -114,6 +117,17 @@ class metaMDIO(object):
 		"""
 		pass
 
+	@abstractmethod
+	def writeRecords(self, data, table=None):
+		"""
+			.. important:: |abstractmethod|
+
+			Write a list of records to a specified table in a single transaction. The 
+			arguments are identical to :func:`writeRecord`, except that data is a list
+			of records.
+		"""
+		pass
+
 	@abstractmethod
 	def writeSettings(self, settingsstring):
 		"""
@@ -159,6 +173,47 @@ class metaMDIO(object):
 		"""
 		pass
 
+	@abstractmethod
+	def appendDB(self, dbname, timeOffset=0.0, excludeFiles=[]):
+		"""
+			.. important:: |abstractmethod|
+
+			Append the event meta-data, the list of processed files and the analysis log from another database with identical meta-data columns.
+
+			:Args:
+				- `dbname` : 		full path to the database to append.
+				- `timeOffset` :	time offset in ms added to the absolute start time (AbsEventStart) of events that were not rejected.
+				- `excludeFiles` :	list of filenames that are not appended to the list of processed files.
+		"""
+		pass
+
+	@abstractmethod
+	def writeCheckpoint(self, checkpoint):
+		"""
+			.. important:: |abstractmethod|
+
+			Save the state of an analysis, which allows an interrupted analysis to be resumed. 
+			The number of records in the database is saved along with the checkpoint. Only the
+			most recent checkpoint is retained.
+
+			:Args:
+				- `checkpoint` : 	a dictionary of objects that can be pickled.
+		"""
+		pass
+
+	@abstractmethod
+	def readCheckpoint(self, rollback=False):
+		"""
+			.. important:: |abstractmethod|
+
+			Return the most recent checkpoint saved with :func:`writeCheckpoint` or None if the database
+			does not contain a checkpoint.
+
+			:Args:
+				- `rollback` : 	if True, delete records that were written after the checkpoint was saved (default: False).
+		"""
+		pass
+
 	@abstractmethod
 	def readSettings(self):
 		"""
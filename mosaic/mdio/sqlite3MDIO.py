@@ -6,6 +6,11 @@
 	:License:	See LICENSE.TXT
 	:ChangeLog:
 	.. line-block::
+		10/18/26	AB	Added a single precision list type (REAL32_LIST).
+		10/18/26	AB	Save and restore analysis checkpoints (writeCheckpoint, readCheckpoint).
+		10/18/26	AB	Added writeRecords to write multiple records in a single transaction.
+		10/18/26	AB	Added appendDB to merge the results of multiple analyses.
+		10/18/26	AB	Encode NumPy arrays without converting them to lists.
 		3/25/17 	AB 	Allow an optional argument to pass a database name.
 		12/6/15 	AB 	Add sampling frequency to analysis info table
 		8/5/15 		AB 	Added a function to export database tables to CSV
@@ -18,6 +23,7 @@
 import sys
 
 import sqlite3
+import cPickle
 import base64
 import struct
 import datetime
@@ -49,13 +55,18 @@ class data_record(dict):
 
 		if val[0].endswith('_LIST'):
 			if val[0]=='REAL_LIST':
-				(packstr, bytes) = ('%sd', 8)
+				(packstr, bytes, dtype) = ('%sd', 8, numpy.float64)
+			elif val[0]=='REAL32_LIST':
+				(packstr, bytes, dtype) = ('%sf', 4, numpy.float32)
 			elif val[0]=='INTEGER_LIST':
-				(packstr, bytes) = ('%si', 4)
+				(packstr, bytes, dtype) = ('%si', 4, numpy.int32)
 
 			if isinstance(val[1], unicode):
 				decoded_data=base64.b64decode(val[1])
 				dat = list(struct.unpack( packstr % int(len(decoded_data)/bytes), decoded_data ))
+			elif isinstance(val[1], numpy.ndarray):
+				# encode arrays directly from the array buffer, which is identical to the struct packed data
+				dat = base64.b64encode(numpy.ascontiguousarray(val[1], dtype=dtype).tostring())
 			else:
 				dat = base64.b64encode(struct.pack( packstr % len(val[1]), *val[1] ))
 
@@ -169,6 +180,28 @@ class sqlite3MDIO(metaMDIO.metaMDIO):
 					)
 
 
+	def writeRecords(self, data, table=None):
+		if not data:
+			return
+
+		if not table:
+			tabname=self.tableName
+			cols=self.colNames
+			datalist=[ self._datalist(d) for d in data ]
+		else:
+			tabname=table
+			cols=self._colnames(table)[:-1]
+			datalist=data
+
+		placeholders_list=','.join(['?' for i in range(len(cols))])
+
+		with self.db:
+			self.db.executemany(	'INSERT INTO ' + 
+						tabname + 
+						'('+', '.join(cols)+') VALUES('+
+						placeholders_list+')', datalist
+					)
+
 	def writeSettings(self, settingsstring):
 		with self.db:
 			self.db.execute( 'INSERT INTO analysissettings VALUES(?, ?)', (settingsstring, None,) )
@@ -186,6 +219,61 @@ class sqlite3MDIO(metaMDIO.metaMDIO):
 			self.db.execute('DELETE FROM analysislog')
 			self.db.execute( 'INSERT INTO analysislog VALUES(?, ?)', (analysislog, None,) )
 
+	def appendDB(self, dbname, timeOffset=0.0, excludeFiles=[]):
+		self.db.commit()
+		self.db.execute('ATTACH DATABASE ? AS appenddb', (dbname,))
+
+		try:
+			cols=', '.join(self.colNames)
+			selcols=', '.join( [ 'CASE WHEN AbsEventStart >= 0 THEN AbsEventStart+? ELSE AbsEventStart END' if c=='AbsEventStart' else c for c in self.colNames ] )
+			args=[ timeOffset for c in self.colNames if c=='AbsEventStart' ]
+
+			excl=','.join(['?' for f in excludeFiles])
+
+			with self.db:
+				self.db.execute( 'INSERT INTO '+self.tableName+' ('+cols+') SELECT '+selcols+' FROM appenddb.'+self.tableName+' ORDER BY recIDX', args )
+				self.db.execute( 'INSERT INTO processedfiles (filename, fileformat, modifiedtime) SELECT filename, fileformat, modifiedtime FROM appenddb.processedfiles WHERE filename NOT IN ('+excl+') ORDER BY recIDX', excludeFiles )
+		finally:
+			self.db.commit()
+			self.db.execute('DETACH DATABASE appenddb')
+
+	def writeCheckpoint(self, checkpoint):
+		self.db.commit()
+
+		with self.db:
+			self._setupcheckpoint()
+
+			# Save the number of records that were written when the checkpoint was saved.
+			records=dict( 
+					(tab, self.db.execute('SELECT IFNULL(MAX(recIDX), 0) FROM '+tab).fetchall()[0][0]) 
+					for tab in [self.tableName, 'processedfiles'] 
+				)
+
+			# allow only one entry in this table
+			self.db.execute('DELETE FROM checkpoint')
+			self.db.execute( 
+					'INSERT INTO checkpoint VALUES(?, ?)', 
+					(sqlite3.Binary(cPickle.dumps({'checkpoint' : checkpoint, 'records' : records}, cPickle.HIGHEST_PROTOCOL)), None,) 
+				)
+
+	def readCheckpoint(self, rollback=False):
+		self.db.commit()
+
+		with self.db:
+			self._setupcheckpoint()
+
+			q=self.db.execute('SELECT checkpoint FROM checkpoint').fetchall()
+			if len(q)>0:
+				state=cPickle.loads(str(q[0][0]))
+			else:
+				state={'checkpoint' : None, 'records' : {self.tableName : 0, 'processedfiles' : 0}}
+
+			if rollback:
+				for (tab, nrec) in state['records'].iteritems():
+					self.db.execute('DELETE FROM '+tab+' WHERE recIDX > ?', (nrec,))
+
+		return state['checkpoint']
+
 	def readSettings(self):
 		try:
 			self.db.commit()
@@ -393,6 +481,13 @@ class sqlite3MDIO(metaMDIO.metaMDIO):
 
 			self.db.commit()
 
+	def _setupcheckpoint(self):
+		# The checkpoint table is created when it is first used.
+		self.db.execute("create table if not exists checkpoint ( \
+				checkpoint BLOB, \
+				recIDX INTEGER PRIMARY KEY AUTOINCREMENT \
+			)")
+
 	def _sqltypes(self):
 		sqlstring=[]
 		for (k,v) in zip(self.colNames, self.colNames_t):
@@ -8,6 +8,9 @@
 	:License:	See LICENSE.TXT
 	:ChangeLog:
 	.. line-block::
+		10/18/26	AB	Save the state of a partially read event in checkpoints.
+		10/18/26	AB	Read additional data through _popdata to support the IO pipeline.
+		10/18/26	AB	Use a deque for the local data store.
 		9/25/17 	AB 	Save unfiltered event padding by default.
 		1/18/17 	AB 	Fix pre event baseline.
 		6/17/16 	AB 	Log function timing in developer mode.
@@ -62,6 +65,8 @@ class eventSegment(metaEventPartition.metaEventPartition):
 			- `slopeOpenCurr` :	Explicitly set open channel current slope. (default: -1, to 
 							calculate automatically)
 	"""
+	_checkpointattrs=metaEventPartition.metaEventPartition._checkpointattrs+['eventstart', 'eventdat', 'preeventdat']
+
 	def _init(self, trajDataObj, eventProcHnd, eventPartitionSettings, eventProcSettings):
 		"""
 			Segment a trajectory
@@ -137,6 +142,13 @@ class eventSegment(metaEventPartition.metaEventPartition):
 			self.esLogger.info('\tEvent time-series = ***disabled***')
 
 
+	def _setuppartition(self):
+		super(eventSegment, self)._setuppartition()
+
+		# This algorithm consumes data one point at a time, which is 
+		# faster with a deque than with the default circular buffer.
+		self.currData=deque()
+
 	#################################################################
 	# Interface functions
 	#################################################################
@@ -191,7 +203,7 @@ class eventSegment(metaEventPartition.metaEventPartition):
 					
 					# Check if there are enough data points to pad the event. If not pop more.
 					if len(self.currData) < self.eventPad:
-						self.currData.extend(list(self.trajDataObj.popdata(self.nPoints)))
+						self.currData.extend(list(self._popdata(self.nPoints)))
 
 					
 					# Cleanup event pad data before adding it to the event. We look for:
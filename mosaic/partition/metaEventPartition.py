@@ -7,6 +7,16 @@
 	:License:	See LICENSE.TXT
 	:ChangeLog:
 	.. line-block::
+		10/18/26	AB	Store partition data with the precision set by mosaic.DataPrecision.
+		10/18/26	AB	Periodically save checkpoints to the database, which allows an interrupted analysis to be resumed.
+						Checkpoints are disabled by default (checkpointIntervalSec=0).
+		10/18/26	AB	Added an optional IO pipeline with reader and writer threads (pipelineIO setting).
+		10/18/26	AB	Added closed-form estimates of the open channel statistics (baselineEstimator='moments'). The default
+						estimator fits the current histogram (baselineEstimator='fit').
+		10/18/26	AB	Send events to worker processes in batches and transfer event data through shared memory.
+		10/18/26	AB	Fixed a ZeroDivisionError in the output log when no events were processed.
+		10/18/26	AB	Process events in parallel with a multiprocessing pool.
+		10/18/26	AB	Store partition data in a preallocated circular buffer (npfifo).
 		9/25/17 	AB 	Save unfiltered event padding by default.
 		3/25/17 	AB 	Allow an optional argument to pass a database name.
 		6/29/16 	AB 	Fixed the open channel statistics routine (_openchanstats) to fix an 
@@ -36,6 +46,9 @@ import datetime
 import csv
 import cPickle
 import multiprocessing
+import multiprocessing.sharedctypes
+import threading
+import Queue
 
 import numpy as np 
 import scipy.stats
@@ -46,8 +59,9 @@ import mosaic.commonExceptions
 import mosaic.trajio.metaTrajIO as metaTrajIO
 import mosaic.mdio.sqlite3MDIO as sqlite3MDIO
 from mosaic.utilities.resource_path import format_path
-from mosaic.utilities.ionic_current_stats import OpenCurrentDist
+from mosaic.utilities.ionic_current_stats import OpenCurrentDist, OpenCurrentStats
 import mosaic.utilities.mosaicTiming as mosaicTiming
+import mosaic.utilities.npfifo as npfifo
 import mosaic.utilities.mosaicLogging as mlog
 from mosaic.utilities.mosaicLogFormat import _d
 
@@ -62,6 +76,213 @@ class ExcessiveDriftError(Exception):
 class DriftRateError(Exception):
 	pass
 
+# Shared memory used to transfer event data to worker processes.
+_sharedBuffer=None
+
+def _initworker(sharedBuffer=None):
+	# Worker processes ignore SIGINT. A KeyboardInterrupt is handled by the parent process.
+	signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+	global _sharedBuffer
+	_sharedBuffer=sharedBuffer
+
+def _processEventWorker(eventobjs):
+	"""
+		Process a batch of events in a worker process. Meta-data is not written to the database in the worker.
+		Instead, the records are returned to the parent process, which writes them in the order events were submitted.
+		Event data that was placed in shared memory by the parent process is copied into the event objects before 
+		they are processed.
+	"""
+	if _sharedBuffer is not None:
+		buf=np.ctypeslib.as_array(_sharedBuffer)
+
+	records=[]
+	for eventobj in eventobjs:
+		if isinstance(eventobj.eventData, _sharedData):
+			eventobj.eventData=eventobj.eventData.read(buf)
+			eventobj.eventDataU=eventobj.eventDataU.read(buf)
+
+		eventobj.dataFileHnd=_eventRecords()
+		eventobj.processEvent()
+
+		records.append(eventobj.dataFileHnd.records)
+
+	return records
+
+class _sharedData(object):
+	"""
+		Describe the location of an array in shared memory.
+	"""
+	__slots__=['offset', 'length']
+
+	def __init__(self, offset, length):
+		self.offset=offset
+		self.length=length
+
+	def __getstate__(self):
+		return (self.offset, self.length)
+
+	def __setstate__(self, state):
+		self.offset, self.length=state
+
+	def read(self, buf):
+		return np.array(buf[self.offset:self.offset+self.length])
+
+class _eventRecords(object):
+	"""
+		Collect records written by an event processing object.
+	"""
+	def __init__(self):
+		self.records=[]
+
+	def writeRecord(self, data, table='metadata'):
+		self.records.append(data)
+
+class _dataReader(threading.Thread):
+	"""
+		Read blocks of data from a metaTrajIO object in a background thread. Blocks are stored in
+		a bounded queue along with the names of data files that were opened while the block was read
+		and the position of the trajectory after the block was read.
+		An exception raised by the trajectory object (e.g. EmptyDataPipeError) is placed in the queue
+		and raised again when it is retrieved with :func:`popdata`.
+	"""
+	def __init__(self, trajDataObj, nPoints, maxQueue):
+		super(_dataReader, self).__init__()
+		self.daemon=True
+
+		self.trajDataObj=trajDataObj
+		self.nPoints=nPoints
+
+		self.dataQueue=Queue.Queue(maxQueue)
+		self.stopEvent=threading.Event()
+
+	def run(self):
+		while not self.stopEvent.is_set():
+			try:
+				item=self.trajDataObj.popdata(self.nPoints)
+			except BaseException, err:
+				item=err
+
+			files=self.trajDataObj.ProcessedFiles
+			self.trajDataObj.processedFilenames=[]
+
+			while not self.stopEvent.is_set():
+				try:
+					self.dataQueue.put((item, files, self.trajDataObj.globalDataIndex), timeout=0.1)
+					break
+				except Queue.Full:
+					pass
+
+			if isinstance(item, BaseException):
+				return
+
+	def popdata(self):
+		"""
+			Return the next block of data, the list of data files opened to read it and the 
+			position of the trajectory (globalDataIndex) at the end of the block.
+		"""
+		while(1):
+			try:
+				# Wait with a timeout, which allows a KeyboardInterrupt to be handled.
+				(item, files, index)=self.dataQueue.get(timeout=0.1)
+				break
+			except Queue.Empty:
+				pass
+
+		if isinstance(item, BaseException):
+			raise item
+
+		return (item, files, index)
+
+	def stop(self):
+		self.stopEvent.set()
+		self.join()
+
+class _recordWriter(threading.Thread):
+	"""
+		Write records to the database in a background thread. Records are added to a bounded
+		queue with :func:`writeRecord`, which implements the subset of the metaMDIO interface
+		used by event processing. The thread uses its own database connection and writes
+		all the records that are waiting in the queue in a single transaction.
+	"""
+	def __init__(self, mdioDBHnd, maxQueue):
+		super(_recordWriter, self).__init__()
+		self.daemon=True
+
+		self.dbFilename=mdioDBHnd.dbFilename
+		self.tableName=mdioDBHnd.tableName
+		self.colNames=mdioDBHnd.colNames
+		self.colNames_t=mdioDBHnd.colNames_t
+
+		self.recordQueue=Queue.Queue(maxQueue)
+		self.error=None
+
+	def run(self):
+		mdioDBHnd=sqlite3MDIO.sqlite3MDIO()
+		mdioDBHnd.openDB(self.dbFilename, tableName=self.tableName, colNames=self.colNames, colNames_t=self.colNames_t)
+
+		try:
+			running=True
+			while running:
+				items=[ self.recordQueue.get() ]
+				try:
+					while(1):
+						items.append(self.recordQueue.get_nowait())
+				except Queue.Empty:
+					pass
+
+				if items[-1] is None:
+					running=False
+					items.pop()
+
+				if self.error is None:
+					try:
+						self._write(mdioDBHnd, items)
+					except BaseException, err:
+						self.error=err
+
+				for i in range(len(items)+int(not running)):
+					self.recordQueue.task_done()
+		finally:
+			mdioDBHnd.closeDB()
+
+	def _write(self, mdioDBHnd, items):
+		# Write consecutive records to the same table in a single transaction.
+		i=0
+		while i < len(items):
+			table=items[i][1]
+			j=i
+			while j < len(items) and items[j][1]==table:
+				j+=1
+
+			mdioDBHnd.writeRecords( [ rec for (rec, tab) in items[i:j] ], table=table )
+			i=j
+
+	def writeRecord(self, data, table=None):
+		if self.error is not None:
+			raise self.error
+
+		self.recordQueue.put((data, table))
+
+	def flush(self):
+		"""
+			Block until all the records in the queue are written to the database.
+		"""
+		self.recordQueue.join()
+
+		if self.error is not None:
+			raise self.error
+
+	def close(self):
+		"""
+			Write the remaining records and wait for the thread to exit.
+		"""
+		self.recordQueue.put(None)
+		self.join()
+
+		if self.error is not None:
+			raise self.error
+
 class metaEventPartition(object):
 	"""
 		.. warning:: |metaclass|
@@ -85,17 +306,36 @@ class metaEventPartition(object):
 		current working directory)
 
 			- `writeEventTS` :	Write event current data to file. (default: 1, write data to file)
-			- `parallelProc` :	Process events in parallel using the pproc module. (default: 1, Yes)
+			- `parallelProc` :	Process events in parallel using a pool of worker processes. (default: 1, Yes)
 			- `reserveNCPU` :	Reserve the specified number of CPUs and exclude them from the parallel pool.
+			- `parallelBatchSize` :	Number of events sent to a worker process at a time when events are processed in parallel. (default: 50)
 			- `driftThreshold` :	Trigger a drift warning when the mean open channel current deviates by 'driftThreshold'*
 							SD from the baseline open channel current (default: 2)
 			- `maxDriftRate` :	Trigger a warning when the open channel conductance changes at a rate faster 
 							than that specified. (default: 2 pA/s)
 			- `minBaseline` : 	Minimum value for the ionic current baseline.
 			- `maxBaseline` : 	Maximum value for the ionic current baseline.
+			- `pipelineIO` :	Read data and write records to the database in background threads, which allows disk IO to overlap 
+							with the partition and processing of events. (default: 0, No)
+			- `baselineEstimator` :	Method used to estimate the open channel current statistics: 'fit' for a Gaussian fit to the current histogram (default) 
+							or 'moments' for closed-form estimates. See :func:`~mosaic.utilities.ionic_current_stats.OpenCurrentStats`.
+			- `checkpointIntervalSec` :	Save a checkpoint to the database every 'checkpointIntervalSec' seconds of analysis time. An interrupted 
+							analysis can be resumed from the last checkpoint by passing the 'resume' keyword argument along with the 
+							name of the existing database (dbFilename). Each checkpoint waits for the events that are being processed
+							in parallel. (default: 0, No checkpoints)
 	"""
 	__metaclass__=ABCMeta
 
+	# Attributes that describe the state of the event partition, which are saved in checkpoints. Sub-classes 
+	# extend this list with their own state.
+	_checkpointattrs=[
+				'globalDataIndex', 'dataStart', 'eventcount', 'eventprocessedcount', 
+				'meanOpenCurr', 'sdOpenCurr', 'slopeOpenCurr', 'thrCurr',
+				'minDrift', 'maxDrift', 'minDriftR', 'maxDriftR', 
+				'windowOpenCurrentMean', 'windowOpenCurrentSD', 'windowOpenCurrentSlope',
+				'currData'
+			]
+
 	def __init__(self, trajDataObj, eventProcHnd, eventPartitionSettings, eventProcSettings, settingsString, **kwargs):
 		"""
 			Initialize a new event segment object
@@ -118,10 +358,17 @@ class metaEventPartition(object):
 			self.writeEventTS=int(self.settingsDict.pop("writeEventTS",1))
 			self.parallelProc=int(self.settingsDict.pop("parallelProc",1))
 			self.reserveNCPU=int(self.settingsDict.pop("reserveNCPU",2))
+			self.parallelBatchSize=max(1, int(self.settingsDict.pop("parallelBatchSize",50)))
 			self.driftThreshold=float(self.settingsDict.pop("driftThreshold",2.0))
 			self.maxDriftRate=float(self.settingsDict.pop("maxDriftRate",2.0))
 			self.minBaseline=float(self.settingsDict.pop("minBaseline",-1.))
 			self.maxBaseline=float(self.settingsDict.pop("maxBaseline",-1.))
+			self.baselineEstimator=str(self.settingsDict.pop("baselineEstimator","fit"))
+			self.pipelineIO=int(self.settingsDict.pop("pipelineIO",0))
+			self.checkpointIntervalSec=float(self.settingsDict.pop("checkpointIntervalSec",0))
+
+			if self.baselineEstimator not in ['moments', 'fit']:
+				raise ValueError("baselineEstimator must be 'moments' or 'fit' (got '{0}')".format(self.baselineEstimator))
 		except ValueError as err:
 			raise mosaic.commonExceptions.SettingsTypeError( err )
 
@@ -129,15 +376,31 @@ class metaEventPartition(object):
 
 		self.tEventProcObj=self.eventProcHnd([], [], self.FsHz, eventstart=0,eventend=0, baselinestats=[ 0,0,0 ], algosettingsdict=self.eventProcSettingsDict.copy(), savets=False, absdatidx=0, datafileHnd=None )
 
+		# Resume an analysis from the last checkpoint saved in an existing database.
+		self.resume=kwargs.get('resume', False) and kwargs.get('dbFilename', '')!=''
+
 		self.mdioDBHnd=sqlite3MDIO.sqlite3MDIO()
-		self.mdioDBHnd.initDB(
-								dbPath=self.trajDataObj.datPath, 
-								tableName='metadata',
-								colNames=(self.tEventProcObj.mdHeadings()),
-								colNames_t=(self.tEventProcObj.mdHeadingDataType()),
-								dbFilename=kwargs.get('dbFilename', '')
-							)
-		self.mdioDBHnd.writeSettings(settingsString)
+		if self.resume:
+			self.mdioDBHnd.openDB(
+									kwargs['dbFilename'],
+									tableName='metadata',
+									colNames=(self.tEventProcObj.mdHeadings()),
+									colNames_t=(self.tEventProcObj.mdHeadingDataType())
+								)
+		else:
+			self.mdioDBHnd.initDB(
+									dbPath=self.trajDataObj.datPath, 
+									tableName='metadata',
+									colNames=(self.tEventProcObj.mdHeadings()),
+									colNames_t=(self.tEventProcObj.mdHeadingDataType()),
+									dbFilename=kwargs.get('dbFilename', '')
+								)
+			self.mdioDBHnd.writeSettings(settingsString)
+
+		# Records are written to the database with mdioWriter, which is replaced by a 
+		# writer thread when the IO pipeline is enabled.
+		self.mdioWriter=self.mdioDBHnd
+		self.dataReader=None
 
 		self.logger=mlog.mosaicLogging().getLogger(name=__name__, dbHnd=self.mdioDBHnd)
 		self.logger.debug(_d("Event Segment Initialization"))
@@ -170,23 +433,14 @@ class metaEventPartition(object):
 			Stop processing data.
 		"""
 		if self.parallelProc:
-			# send a STOP message to all the processes
-			for i in range(len(self.parallelProcDict)):
-				self.SendJobsChan.zmqSendData('job','STOP')
-			
-			# wait for the processes to terminate
-			for k in self.parallelProcDict.keys():
-				os.kill( self.parallelProcDict[k].pid, signal.SIGINT )
-				# self.parallelProcDict[k].terminate()
-			for k in self.parallelProcDict.keys():
-				self.parallelProcDict[k].join()
-
-			# shutdown the zmq channels
-			self.SendJobsChan.zmqShutdown()
-			self.RecvResultsChan.zmqShutdown()
+			# wait for the worker processes to exit
+			self.parallelPool.close()
+			self.parallelPool.join()
 
 		self._stop()
 
+		self._stoppipeline()
+
 		partitionTimer.PrintStatistics()
 
 		self.mdioDBHnd.closeDB()
@@ -199,16 +453,24 @@ class metaEventPartition(object):
 		
 		# Initialize segmentation
 		self._setuppartition()
+
+		if self.resume:
+			self._restorecheckpoint()
+
+		if self.pipelineIO:
+			self._setuppipeline()
+
 		try:
 			startTime=self.timingObj.time()
+			checkpointTime=time.time()
 			while(1):	
 				# with each pass obtain more data and
-				d=self.trajDataObj.popdata(self.nPoints)
+				d=self._popdata(self.nPoints)
 				# Check for excessive open channel drift
 				self._checkdrift(d)
 
 				# store the new data into a local store
-				self.currData.extend(list(d))
+				self.currData.extend(d)
 				
 				# update analysis info
 				self._writeanalysisinfo()
@@ -223,9 +485,13 @@ class metaEventPartition(object):
 					continue
 
 				# Write the list of processed files to the database
-				[ self.mdioDBHnd.writeRecord(f, table='processedfiles') for f in self.trajDataObj.ProcessedFiles ]
-				self.trajDataObj.processedFilenames=[]
+				if not self.dataReader:
+					[ self.mdioDBHnd.writeRecord(f, table='processedfiles') for f in self.trajDataObj.ProcessedFiles ]
+					self.trajDataObj.processedFilenames=[]
 
+				if self.checkpointIntervalSec > 0 and time.time()-checkpointTime > self.checkpointIntervalSec:
+					self._checkpoint()
+					checkpointTime=time.time()
 
 		except metaTrajIO.EmptyDataPipeError, err:
 			self.segmentTime=self.timingObj.time()-startTime
@@ -242,10 +508,16 @@ class metaEventPartition(object):
 			self.logger.info('\tSegment trajectory: ***USER STOP***')
 		except:
 			raise
+		finally:
+			if self.dataReader:
+				self.dataReader.stop()
 
 		# Finish processing events
 		self._cleanupeventprocessing()
 
+		# Write any remaining records before the output log is generated
+		self._stoppipeline()
+
 		# Write the output log file
 		self._writeoutputlog()
 
@@ -324,49 +596,185 @@ class metaEventPartition(object):
 						])
 
 	def _setupparallel(self):
-		# disable parallel
-		if self.parallelProc:
-			self.logger.warning("WARNING: Parallel processing is not available.")
-		self.parallelProc=False
-		return
-		
-		# check if parallel is available
+		# Setup a pool of worker processes. 
+		nworkers=max(1, multiprocessing.cpu_count()-self.reserveNCPU)
+
+		# Events are sent to the workers in batches. The number of batches waiting 
+		# to be processed is limited to 'parallelMaxQueue'.
+		self.parallelMaxQueue=4*nworkers
+
+		# Event data is transferred through shared memory that is divided into one slot 
+		# per batch. Only small descriptors of the data are pickled.
+		self.parallelSlotSize=2**17
+
 		try:
-			import mosaic.parallel.zmqWorker as zmqWorker
-			import mosaic.parallel.zmqIO as zmqIO
-		except ImportError:
-			self.logger.warning("WARNING: Parallel processing is not available.")
+			self.parallelBuffer=multiprocessing.sharedctypes.RawArray(
+					np.dtype(mosaic.DataPrecision).char, 
+					self.parallelMaxQueue*self.parallelSlotSize
+				)
+			self.parallelPool=multiprocessing.Pool(nworkers, initializer=_initworker, initargs=(self.parallelBuffer,))
+		except (OSError, ImportError, MemoryError), err:
+			self.logger.warning("WARNING: Parallel processing is not available ({0}).".format(err))
 			self.parallelProc=False
 			return
 
-		# setup parallel processing here
-		self.parallelProcDict={}
-
-		nworkers=multiprocessing.cpu_count() - self.reserveNCPU
-		for i in range(nworkers):
-			self.parallelProcDict[i] = multiprocessing.Process(
-											target=zmqWorker.zmqWorker, 
-											args=( 
-												{ 'job' : '127.0.0.1:'+str(5500) }, 
-												{ 'results' : '127.0.0.1:'+str(5600+i*10) }, 
-												"processEvent",
-												[ 
-													"sqlite3MDIO", 
-													self.mdioDBHnd.dbFilename,
-													(self.tEventProcObj.mdHeadings()),
-													(self.tEventProcObj.mdHeadingDataType()) 
-												],
-											)
-										)
-			self.parallelProcDict[i].start()
-		# allow the processes to start up
-		time.sleep(1)
-
-		tdict={}
-		[ tdict.update( {'results'+str(i) : '127.0.0.1:'+str(5600+i*10) } ) for i in range(nworkers) ]
-		# Parallel processing also needs zmq handles to send data to the worker processes and retrieve the results
-		self.SendJobsChan=zmqIO.zmqIO(zmqIO.PUSH, { 'job' : '127.0.0.1:'+str(5500) } )
-		self.RecvResultsChan=zmqIO.zmqIO(zmqIO.PULL, tdict )
+		self.parallelBufferArray=np.ctypeslib.as_array(self.parallelBuffer)
+		self.parallelFreeSlots=deque(range(self.parallelMaxQueue))
+
+		# Results are stored in the order batches are submitted to the pool.
+		self.parallelResults=deque()
+		self.parallelBatch=[]
+		self.parallelBatchLength=0
+
+		self.logger.debug(_d("Parallel event processing with {0} worker processes", nworkers))
+
+	def _setuppipeline(self):
+		# Start the reader and writer threads. The reader prefetches up to 4 blocks of data and 
+		# the writer queue holds up to 1000 records. Both block when their queue is full.
+		self.dataReader=_dataReader(self.trajDataObj, self.nPoints, 4)
+		self.mdioWriter=_recordWriter(self.mdioDBHnd, 1000)
+
+		self.dataReader.start()
+		self.mdioWriter.start()
+
+		self.logger.debug(_d("IO pipeline enabled."))
+
+	def _stoppipeline(self):
+		if self.dataReader:
+			self.dataReader.stop()
+			self.dataReader=None
+
+		if self.mdioWriter is not self.mdioDBHnd:
+			writer=self.mdioWriter
+			self.mdioWriter=self.mdioDBHnd
+			writer.close()
+
+	def _popdata(self, nPoints):
+		"""
+			Return the next nPoints from the trajectory. When the IO pipeline is enabled, data is read 
+			from the reader thread (nPoints must be equal to self.nPoints) and the names of newly opened
+			data files are written to the database.
+		"""
+		if self.dataReader:
+			(d, files, self.trajDataIndex)=self.dataReader.popdata()
+			[ self.mdioWriter.writeRecord(f, table='processedfiles') for f in files ]
+		else:
+			d=self.trajDataObj.popdata(nPoints)
+			self.trajDataIndex=self.trajDataObj.globalDataIndex
+
+		return d
+
+	def _flushrecords(self):
+		"""
+			Wait for all the events that were partitioned to be processed and their records 
+			to be written to the database.
+		"""
+		if self.parallelProc:
+			self._dispatchbatch()
+			self._collectresults(0)
+
+		if self.mdioWriter is not self.mdioDBHnd:
+			self.mdioWriter.flush()
+
+	def _checkpoint(self):
+		"""
+			Save the state of the analysis to the database. The position of the trajectory is saved as 
+			a data file and the offset of the next data point within that file.
+		"""
+		self._flushrecords()
+
+		(fileStart, fname)=max( (v, k) for (k, v) in self.trajDataObj.fileStartIndex.iteritems() if v <= self.trajDataIndex )
+
+		self.mdioDBHnd.writeCheckpoint({
+				'dataFile'			: fname,
+				'fileOffset'		: self.trajDataIndex-fileStart,
+				'fileStartIndex'	: fileStart,
+				'trajDataIndex'		: self.trajDataIndex,
+				'partitionState'	: dict( (k, getattr(self, k)) for k in self._checkpointattrs if hasattr(self, k) )
+			})
+
+		self.logger.debug(_d("Checkpoint saved at {0} (offset {1})", fname, self.trajDataIndex-fileStart))
+
+	def _restorecheckpoint(self):
+		"""
+			Restore the state of the analysis from the last checkpoint and discard records that were 
+			written after it was saved. If the database does not contain a checkpoint, the analysis 
+			is restarted from the beginning of the trajectory.
+		"""
+		checkpoint=self.mdioDBHnd.readCheckpoint(rollback=True)
+
+		if not checkpoint:
+			self.logger.warning("WARNING: No checkpoint was found in {0}. The analysis will restart from the beginning.".format(self.mdioDBHnd.dbFilename))
+			return
+
+		self.trajDataObj.seekfile(checkpoint['dataFile'], checkpoint['fileOffset'], startIndex=checkpoint['fileStartIndex'])
+		self.trajDataIndex=checkpoint['trajDataIndex']
+
+		# The data files read before the checkpoint are already in the database.
+		self.trajDataObj.processedFilenames=[]
+
+		for (k, v) in checkpoint['partitionState'].iteritems():
+			setattr(self, k, v)
+
+		self.logger.info("Resume analysis from {0} (offset {1}).".format(checkpoint['dataFile'], checkpoint['fileOffset']))
+
+	def _dispatchbatch(self):
+		"""
+			Send the current batch of events to the worker processes. The event data is copied to a free 
+			slot in shared memory. If the events do not fit in a slot, they are pickled along with the 
+			event objects.
+		"""
+		if not self.parallelBatch:
+			return
+
+		slot=None
+		if self.parallelBatchLength <= self.parallelSlotSize:
+			while not self.parallelFreeSlots:
+				self._collectresults(len(self.parallelResults)-1)
+			slot=self.parallelFreeSlots.popleft()
+
+			offset=slot*self.parallelSlotSize
+			for eventobj in self.parallelBatch:
+				eventobj.eventData=self._sharedcopy(eventobj.eventData, offset)
+				offset+=eventobj.eventData.length
+				eventobj.eventDataU=self._sharedcopy(eventobj.eventDataU, offset)
+				offset+=eventobj.eventDataU.length
+
+		self.parallelResults.append( 
+				[ self.parallelPool.apply_async(_processEventWorker, (self.parallelBatch,)), slot, len(self.parallelBatch) ]
+			)
+
+		self.parallelBatch=[]
+		self.parallelBatchLength=0
+
+	def _sharedcopy(self, dat, offset):
+		n=len(dat)
+		self.parallelBufferArray[offset:offset+n]=dat
+
+		return _sharedData(offset, n)
+
+	def _collectresults(self, maxqueue):
+		"""
+			Write the meta-data of processed events to the database in the order the events 
+			were submitted. Block until at most 'maxqueue' batches are waiting to be processed.
+		"""
+		while self.parallelResults:
+			[res, slot, nevents]=self.parallelResults[0]
+
+			if len(self.parallelResults) <= maxqueue and not res.ready():
+				break
+
+			# Wait with a timeout, which allows a KeyboardInterrupt to be handled.
+			while not res.ready():
+				res.wait(0.1)
+
+			for eventrecs in res.get():
+				[ self.mdioWriter.writeRecord(rec) for rec in eventrecs ]
+			
+			self.parallelResults.popleft()
+			if slot is not None:
+				self.parallelFreeSlots.append(slot)
+			self.eventprocessedcount+=nevents
 
 	def _setuppartition(self):
 		# At the start of a run, store baseline stats for the open channel state
@@ -380,6 +788,9 @@ class metaEventPartition(object):
 		self.globalDataIndex=0
 		self.dataStart=0
 
+		# the position of the trajectory after the most recent block of data was read.
+		self.trajDataIndex=self.trajDataObj.globalDataIndex
+
 		if self.meanOpenCurr == -1. or self.sdOpenCurr == -1. or self.slopeOpenCurr == -1.:
 			[ self.meanOpenCurr, self.sdOpenCurr, self.slopeOpenCurr ] = self._openchanstats(self.trajDataObj.previewdata(self.nPoints))
 			self.logger.debug(_d("Automatic open channel stats: {0}, {1}, {2}", self.meanOpenCurr, self.sdOpenCurr, self.slopeOpenCurr))
@@ -390,7 +801,7 @@ class metaEventPartition(object):
 		#self.openchanFIFO=npfifo.npfifo(nPoints)
 		
 		# setup a local data store that is used by the main event partition loop
-		self.currData = deque()
+		self.currData = npfifo.npfifo(2*self.nPoints, dtype=np.dtype(mosaic.DataPrecision))
 
 		#### Event Queue ####
 		# self.eventQueue=[]
@@ -413,19 +824,23 @@ class metaEventPartition(object):
 		try:
 			if self.parallelProc:
 				# gather up any remaining results from the worker processes
-				while self.eventprocessedcount < self.eventcount:
-					recvdat=self.RecvResultsChan.zmqReceiveData()
-					if recvdat != "":
-						#store the processed event
-						self.eventprocessedcount+=1
+				self._dispatchbatch()
+				while self.parallelResults:
+					self._collectresults(len(self.parallelResults)-1)
 
-						if self.eventprocessedcount%100 == 0:
-							sys.stdout.write('Processing %d of %d events.\r' % (self.eventprocessedcount,self.eventcount) )
-	    					sys.stdout.flush()
+					if self.eventprocessedcount%100 == 0:
+						sys.stdout.write('Processing %d of %d events.\r' % (self.eventprocessedcount,self.eventcount) )
+						sys.stdout.flush()
 
 			self.logger.info('\tProcess events: ***NORMAL***')
 			self.procTime+=self.timingObj.time()-startTime
 		except KeyboardInterrupt:
+			if self.parallelProc:
+				# discard events that have not been processed
+				self.parallelPool.terminate()
+				self.parallelResults.clear()
+				self.parallelBatch=[]
+
 			self.procTime+=self.timingObj.time()-startTime
 			self.logger.info('\tProcess events: ***USER STOP***')
 		except BaseException, err:
@@ -453,7 +868,7 @@ class metaEventPartition(object):
 		self.logger.info('\t\tTotal = {0}'.format(nTotal) )
 		self.logger.info('\t\tWarning = {0}'.format(nWarn) )	
 		self.logger.info('\t\tError = {0}'.format(nRejected) )
-		self.logger.info('\t\tError rate = {0} %'.format(100.*round(nRejected/float(nTotal),4)) )
+		self.logger.info('\t\tError rate = {0} %'.format(100.*round(nRejected/float(max(nTotal, 1)),4)) )
 
 		self.logger.info("[Settings]")
 
@@ -501,25 +916,7 @@ class metaEventPartition(object):
 			Errors:
 				None
 		"""
-		n=len(curr)
-
-		#curr=self.trajDataObj.previewdata(nPoints)
-		t=1./self.FsHz
-		tstamp=np.arange(0, n*t, t, dtype=np.float64)[:n]
-
-		#print "nPoints=", n, "len(tstamp)=", len(tstamp), "type(curr)", type(curr)
-		
-		# Calculate the mean and standard deviation of the open state
-		mu, sig=OpenCurrentDist(curr, 0.5, self.minBaseline, self.maxBaseline)
-
-		# Fit the data to a straight line to calculate the slope
-		slope, intercept, r_value, p_value, std_err=scipy.stats.linregress(tstamp, curr)
-
-		# self.logger.debug(_d("mu={0}, sigma={1}, slope={2}", mu, sig, slope ))
-
-		# Return stats
-
-		return [ mu, sig, slope ]
+		return OpenCurrentStats(curr, self.FsHz, self.minBaseline, self.maxBaseline, self.baselineEstimator)
 	
 		
 
@@ -577,24 +974,22 @@ class metaEventPartition(object):
 		startTime=self.timingObj.time()
 
 		if self.parallelProc:
-			# handle parallel
-			sys.stdout.flush()
+			# The meta-data IO object cannot be passed to worker processes.
+			eventobj.dataFileHnd=None
 
-			self.SendJobsChan.zmqSendData('job', cPickle.dumps(eventobj))
-			
-			# check for a message 100 times. If an empty message is recevied quit immediately
-			for i in range(100):	
-				recvdat=self.RecvResultsChan.zmqReceiveData()
-				if recvdat=="":	# bail on receiving an empty message
-					return
+			nevent=len(eventobj.eventData)+len(eventobj.eventDataU)
+			if self.parallelBatchLength+nevent > self.parallelSlotSize:
+				self._dispatchbatch()
 
-				self.eventprocessedcount+=1
-				#store the processed event
-				# self.eventQueue.append( cPickle.loads(recvdat) )
+			self.parallelBatch.append(eventobj)
+			self.parallelBatchLength+=nevent
 
+			if len(self.parallelBatch) >= self.parallelBatchSize:
+				self._dispatchbatch()
+				self._collectresults(self.parallelMaxQueue)
 		else:
 			# First set the meta-data IO object in eventobj
-			eventobj.dataFileHnd=self.mdioDBHnd
+			eventobj.dataFileHnd=self.mdioWriter
 
 			# call the process event function and store
 			eventobj.processEvent()
@@ -8,6 +8,8 @@
 	:License:	See LICENSE.TXT
 	:ChangeLog:
 	.. line-block::
+		10/18/26	AB	Store the event time-series in single precision (REAL32_LIST) when mosaic.DataPrecision is float32.
+		10/18/26	AB	Allow event processing objects to be pickled.
 		9/22/17 	AB 	Add a parameter to save unfiltered event padding.
 		8/3/16		JF	Fixed missing dependency (time)
 		5/27/16 	AB 	Add a flagEvent function that should be used to set a non-critical warning status.
@@ -23,6 +25,7 @@
 from abc import ABCMeta, abstractmethod
 import types
 import time
+import logging
 import mosaic.utilities.mosaicTiming as mosaicTiming
 import mosaic.utilities.mosaicLogging as mlog
 import sqlite3
@@ -35,6 +38,10 @@ __all__ = ["metaEventProcessor", "MissingMDIOError"]
 class MissingMDIOError(Exception):
 	pass
 
+class _loggerName(str):
+	# The name of a logger stored when an event processing object is pickled
+	pass
+
 class metaEventProcessor(object):
 	"""
 		.. warning:: |metaclass|
@@ -101,6 +108,27 @@ class metaEventProcessor(object):
 		# Call sub-class initialization
 		self._init(**kwargs)
 
+	def __getstate__(self):
+		"""
+			Loggers cannot be pickled. Replace each logger with its name and remove 
+			the meta-data IO object, which allows events to be sent to worker processes.
+		"""
+		state=self.__dict__.copy()
+
+		for k, v in state.items():
+			if isinstance(v, logging.Logger):
+				state[k]=_loggerName(v.name)
+		state['dataFileHnd']=None
+
+		return state
+
+	def __setstate__(self, state):
+		for k, v in state.items():
+			if isinstance(v, _loggerName):
+				state[k]=mlog.mosaicLogging().getLogger(name=str(v))
+
+		self.__dict__.update(state)
+
 	def processEvent(self):
 		"""
 			This is the equivalent of a pure virtual function in C++. 
@@ -182,7 +210,10 @@ class metaEventProcessor(object):
 		"""
 			Return a list of meta-data tags data types.
 		"""
-		return self._mdHeadingDataType()+['REAL', 'REAL_LIST']
+		if np.dtype(mosaic.DataPrecision)==np.float32:
+			return self._mdHeadingDataType()+['REAL', 'REAL32_LIST']
+		else:
+			return self._mdHeadingDataType()+['REAL', 'REAL_LIST']
 
 
 	def flagEvent(self, status):
@@ -7,6 +7,12 @@
 	:License:	See LICENSE.TXT
 	:ChangeLog:
 	.. line-block::
+		10/18/26	AB	Added default settings for cacheTrajIO.
+		10/18/26	AB	Added the checkpointIntervalSec setting to the event partition algorithms (default: 0, checkpoints are disabled).
+		10/18/26	AB	Added the pipelineIO setting to the event partition algorithms.
+		10/18/26	AB	Added the baselineEstimator setting to the event partition algorithms (default: 'fit').
+		10/18/26	AB	Added the parallelBatchSize setting to the event partition algorithms.
+		10/18/26	AB	Added default settings for vectorizedEventSegment.
 		9/22/17 	AB 	Removed the filterEventPadding option to eventSegment.
 		7/15/17 	AB 	Add the filterEventPadding option to eventSegment.
 		3/16/16 	AB 	Replaced InitThreshold with StepSize in default settings for ADEPT and warn users when InitThreshold is used.
@@ -127,8 +133,33 @@ __settings__="""
 		"writeEventTS"			: "1",
 		"parallelProc"			: "0",
 		"reserveNCPU"			: "2",
+		"parallelBatchSize"		: "50",
 		"minBaseline"			: "-1",
-		"maxBaseline"			: "-1"
+		"maxBaseline"			: "-1",
+		"baselineEstimator"		: "fit",
+		"pipelineIO"			: "0",
+		"checkpointIntervalSec"	: "0"
+	},
+	"vectorizedEventSegment" : {
+		"blockSizeSec" 			: "0.5",
+		"eventPad" 				: "50",
+		"minEventLength" 		: "5",
+		"maxEventLength"		: "10000", 
+		"eventThreshold" 		: "6.0",
+		"driftThreshold" 		: "999.0",
+		"maxDriftRate" 			: "999.0",
+		"meanOpenCurr"			: "-1",
+		"sdOpenCurr"			: "-1",
+		"slopeOpenCurr"			: "-1",
+		"writeEventTS"			: "1",
+		"parallelProc"			: "0",
+		"reserveNCPU"			: "2",
+		"parallelBatchSize"		: "50",
+		"minBaseline"			: "-1",
+		"maxBaseline"			: "-1",
+		"baselineEstimator"		: "fit",
+		"pipelineIO"			: "0",
+		"checkpointIntervalSec"	: "0"
 	},
 	"adept2State" : {
 		"FitTol"				: "1.e-7",
@@ -190,6 +221,11 @@ __settings__="""
 		"Fs" :	"500000",
 		"dcOffset" : 0.0, 
 		"start" : 0.0 
+	},
+	"cacheTrajIO": {
+		"filter" : "*.mtc", 
+		"dcOffset" : 0.0, 
+		"start" : 0.0 
 	}
 }
 """
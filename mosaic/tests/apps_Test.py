@@ -1,6 +1,14 @@
 import time
+import os
+import json
+import shutil
+import tempfile
+import numpy as np
 import mosaic.apps.SingleChannelAnalysis
+import mosaic.mdio.sqlite3MDIO as sqlite3MDIO
+from mosaic.trajio.tsvTrajIO import *
 import mosaic.partition.eventSegment as es
+import mosaic.partition.vectorizedEventSegment as ves
 import mosaic.process.adept2State as adept2State
 from mosaic.trajio.qdfTrajIO import *
 
@@ -34,6 +42,164 @@ class EventPartitionTest(object):
 
 		assert type(self.appObj)==mosaic.apps.SingleChannelAnalysis.SingleChannelAnalysis
 
+class ShardedAnalysisTest(object):
+	def setUp(self):
+		self.datapath=tempfile.mkdtemp()
+
+	def tearDown(self):
+		shutil.rmtree(self.datapath, ignore_errors=True)
+
+	def setupDataSet(self, datfile, nfiles, driftFile=-1):
+		# The open channel current in driftFile is offset by 0.5 (~17 SD), which stops the analysis.
+		dat=np.loadtxt(datfile)
+		for i, d in enumerate(np.array_split(dat, nfiles)):
+			np.savetxt(self.datapath+'/data-'+str(i)+'.csv', d+0.5*(i==driftFile))
+
+		sett={
+			"tsvTrajIO" : { "Fs" : 50000, "filter" : "*.csv" },
+			"eventSegment" : {
+				"blockSizeSec" : 0.006, "eventPad" : 50, "minEventLength" : 5, "maxEventLength" : 10000,
+				"eventThreshold" : 5.0, "driftThreshold" : 10 if driftFile >= 0 else 1000, "maxDriftRate" : 9999.0, 
+				"meanOpenCurr" : 1, "sdOpenCurr" : 0.03, "slopeOpenCurr" : 0, "writeEventTS" : 1, "parallelProc" : 0, "reserveNCPU" : 0
+			},
+			"adept2State" : { "FitTol" : "1.e-7", "FitIters" : "50000", "LinkRCConst" : "1" }
+		}
+		# The histogram fit is unreliable for short blocks of this data set, which is flagged as drift.
+		if driftFile >= 0:
+			sett["eventSegment"]["baselineEstimator"]="moments"
+
+		with open(self.datapath+'/.settings', 'w') as f:
+			f.write(json.dumps(sett))
+
+	def runAnalysis(self, dbname, shardFiles):
+		# Run the analysis in a separate process to avoid leaving database log handlers open in the test process.
+		appObj=mosaic.apps.SingleChannelAnalysis.SingleChannelAnalysis(
+				self.datapath,
+				tsvTrajIO, 
+				None,
+				es.eventSegment,
+				adept2State.adept2State,
+				dbFilename=dbname,
+				shardFiles=shardFiles
+			)
+		appObj.Run(forkProcess=True)
+		appObj.subProc.join()
+
+		db=sqlite3MDIO.sqlite3MDIO()
+		db.openDB(self.datapath+'/'+dbname)
+		q=db.rawQuery("select AbsEventStart, ProcessingStatus from metadata")
+		f=db.rawQuery("select filename from processedfiles")
+		info=db.readAnalysisInfo()
+		log=db.readAnalysisLog()
+		db.closeDB()
+
+		# The analysis log is also written to a file
+		with open(self.datapath+'/'+dbname.replace('sqlite', 'log')) as logfile:
+			assert logfile.read()==log
+
+		return q, f, info, log
+
+	def runTestSharded(self, datfile, nfiles, shardFiles, driftFile=-1):
+		self.setupDataSet(datfile, nfiles, driftFile)
+
+		serial, serialfiles, serialinfo, seriallog=self.runAnalysis('serial.sqlite', 0)
+		sharded, shardedfiles, shardedinfo, shardedlog=self.runAnalysis('sharded.sqlite', shardFiles)
+
+		assert len(serial) == len(sharded)
+		assert serialfiles == shardedfiles
+
+		# The analysis time ends at the block with drift
+		assert serialinfo['dataLengthSec'] == shardedinfo['dataLengthSec']
+		if driftFile >= 0:
+			assert shardedinfo['analysisTimeSec'] < shardedinfo['dataLengthSec']
+		else:
+			assert shardedinfo['analysisTimeSec'] == shardedinfo['dataLengthSec']
+
+		# The sharded analysis writes a single log with the same sections as a serial analysis
+		for section in ['[Status]', '[Summary]', '[Settings]', '[Output]', '[Timing]', 'ERROR', 'Total = '+str(len(serial))]:
+			assert seriallog.count(section) == shardedlog.count(section)
+
+		for (s, p) in zip(serial, sharded):
+			assert s[1] == p[1]
+			assert round(s[0], 6) == round(p[0], 6)
+
+class ShardedAnalysis_TestSuite(ShardedAnalysisTest):
+	def test_shardedAnalysis(self):
+		for (nfiles, shardFiles) in [ (4, 1), (5, 2) ]:
+			yield self.runTestSharded, 'mosaic/tests/testdata/testEventPartition1.csv', nfiles, shardFiles
+
+	def test_shardedAnalysisDrift(self):
+		for (nfiles, shardFiles, driftFile) in [ (4, 1, 2), (5, 2, 3), (5, 2, 1) ]:
+			yield self.runTestSharded, 'mosaic/tests/testdata/testEventPartition1.csv', nfiles, shardFiles, driftFile
+
+def _interruptedPartition(eventPartHnd, nblocks):
+	# Return a partition algorithm that is interrupted by the user after reading nblocks of data.
+	def _popdata(self, nPoints):
+		self.nblocks=getattr(self, 'nblocks', 0)+1
+		if self.nblocks > nblocks:
+			raise KeyboardInterrupt
+
+		return eventPartHnd._popdata(self, nPoints)
+
+	# Keep the name of the partition algorithm, which is used to read its settings.
+	return type(eventPartHnd.__name__, (eventPartHnd,), { '_popdata' : _popdata })
+
+class ResumeAnalysisTest(ShardedAnalysisTest):
+	def setupDataSet(self, datfile, nfiles, pipelineIO):
+		super(ResumeAnalysisTest, self).setupDataSet(datfile, nfiles)
+
+		with open(self.datapath+'/.settings', 'r') as f:
+			sett=json.loads(f.read())
+
+		# Save a checkpoint after every block
+		sett["eventSegment"].update({ "checkpointIntervalSec" : 1e-6, "pipelineIO" : pipelineIO })
+		sett["vectorizedEventSegment"]=sett["eventSegment"]
+
+		with open(self.datapath+'/.settings', 'w') as f:
+			f.write(json.dumps(sett))
+
+	def runAnalysis(self, dbname, eventPartHnd, resume):
+		appObj=mosaic.apps.SingleChannelAnalysis.SingleChannelAnalysis(
+				self.datapath,
+				tsvTrajIO, 
+				None,
+				eventPartHnd,
+				adept2State.adept2State,
+				dbFilename=dbname,
+				resume=resume
+			)
+		appObj.Run(forkProcess=True)
+		appObj.subProc.join()
+
+		db=sqlite3MDIO.sqlite3MDIO()
+		db.openDB(self.datapath+'/'+dbname)
+		q=db.rawQuery("select AbsEventStart, ProcessingStatus from metadata")
+		f=db.rawQuery("select filename from processedfiles")
+		db.closeDB()
+
+		return q, f
+
+	def runTestResume(self, datfile, nfiles, eventPartHnd, nblocks, pipelineIO):
+		self.setupDataSet(datfile, nfiles, pipelineIO)
+
+		full, fullfiles=self.runAnalysis('full.sqlite', eventPartHnd, False)
+		partial, partialfiles=self.runAnalysis('resume.sqlite', _interruptedPartition(eventPartHnd, nblocks), False)
+		resumed, resumedfiles=self.runAnalysis('resume.sqlite', eventPartHnd, True)
+
+		assert len(partial) < len(full)
+		assert len(full) == len(resumed)
+		assert fullfiles == resumedfiles
+
+		for (s, p) in zip(full, resumed):
+			assert s[1] == p[1]
+			assert round(s[0], 6) == round(p[0], 6)
+
+class ResumeAnalysis_TestSuite(ResumeAnalysisTest):
+	def test_resumeAnalysis(self):
+		for eventPartHnd in [es.eventSegment, ves.vectorizedEventSegment]:
+			for (nfiles, nblocks, pipelineIO) in [ (1, 20, 0), (4, 45, 0), (4, 45, 1) ]:
+				yield self.runTestResume, 'mosaic/tests/testdata/testEventPartition1.csv', nfiles, eventPartHnd, nblocks, pipelineIO
+
 class EventPartitionSingle_TestSuite(EventPartitionTest):
 	def test_singleChannelAppSetup(self):
 		yield self.runTestSetup
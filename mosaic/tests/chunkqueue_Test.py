@@ -0,0 +1,63 @@
+import numpy as np
+import mosaic.utilities.chunkqueue as chunkqueue
+
+class ChunkQueueTest(object):
+	def runTestPop(self, chunksize, nchunks, nread):
+		q=chunkqueue.chunkqueue()
+		dat=np.arange(chunksize*nchunks, dtype=np.float64)
+
+		out=[]
+		for i in range(nchunks):
+			q.append(dat[i*chunksize:(i+1)*chunksize])
+			out.extend(q.pop(nread).tolist())
+		out.extend(q.pop(len(q)).tolist())
+
+		assert np.all(np.array(out) == dat)
+		assert len(q) == 0
+
+	def runTestPeek(self, chunksize, n):
+		q=chunkqueue.chunkqueue()
+		dat=np.arange(10*chunksize, dtype=np.float64)
+
+		for i in range(10):
+			q.append(dat[i*chunksize:(i+1)*chunksize])
+		q.discard(3)
+
+		assert np.all(q.peek(n) == dat[3:3+n])
+		assert len(q) == len(dat)-3
+
+	def runTestView(self, n):
+		q=chunkqueue.chunkqueue()
+		dat=np.arange(100, dtype=np.float64)
+		q.append(dat)
+
+		# data within a single chunk is not copied
+		assert np.may_share_memory(q.pop(n), dat)
+
+	def runTestEmpty(self, n):
+		q=chunkqueue.chunkqueue()
+		q.append(np.arange(n))
+
+		assert len(q.pop(2*n+1)) == n
+		assert len(q.pop(10)) == 0
+
+		q.append(np.arange(n))
+		q.clear()
+		assert len(q) == 0
+
+class ChunkQueue_TestSuite(ChunkQueueTest):
+	def test_pop(self):
+		for (chunksize, nchunks, nread) in [ (10, 10, 7), (10, 10, 10), (10, 10, 25), (33, 5, 1) ]:
+			yield self.runTestPop, chunksize, nchunks, nread
+
+	def test_peek(self):
+		for (chunksize, n) in [ (10, 5), (10, 7), (10, 50), (10, 200) ]:
+			yield self.runTestPeek, chunksize, n
+
+	def test_view(self):
+		for n in [ 1, 50, 100 ]:
+			yield self.runTestView, n
+
+	def test_empty(self):
+		for n in [ 0, 1, 10 ]:
+			yield self.runTestEmpty, n
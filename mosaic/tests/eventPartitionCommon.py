@@ -1,6 +1,7 @@
 import json
 import glob
 import os
+import numpy as np
 from nose.tools import raises
 import mosaic
 import mosaic.settings as settings
@@ -12,7 +13,7 @@ class EventPartitionTest(object):
 	def setUp(self):
 		self.datapath = 'mosaic/tests/testdata'
 
-	def runTestCase(self, datfile, prmfile, eventPartHnd, parallel):
+	def runTestCase(self, datfile, prmfile, eventPartHnd, parallel, batchsize=None, pipeline=False):
 		prm=testutil.readparams(prmfile)
 		dat=tsvTrajIO(fnames=[datfile], Fs=prm['Fs'], separator=',')
 
@@ -30,6 +31,11 @@ class EventPartitionTest(object):
 
 		if parallel:
 			epartsettings['parallelProc'] = 1
+			if batchsize:
+				epartsettings['parallelBatchSize'] = batchsize
+
+		if pipeline:
+			epartsettings['pipelineIO'] = 1
 
 		testobj=eventPartHnd(
 							dat, 
@@ -42,6 +48,119 @@ class EventPartitionTest(object):
 
 		assert testobj.eventcount == prm['nevents']
 
+		# events are written to the database in the order they occur (rejected events have AbsEventStart=-1)
+		q=testobj.mdioDBHnd.queryDB("select AbsEventStart from metadata")
+		t=[ r[0] for r in q if r[0] >= 0 ]
+		assert len(q) == prm['nevents']
+		assert all( [ t[i] < t[i+1] for i in range(len(t)-1) ] )
+
+		assert len(testobj.mdioDBHnd.rawQuery("select filename from processedfiles")) == 1
+
+		testobj.Stop()
+
+		for f in glob.glob('mosaic/tests/testdata/*.sqlite'):
+			os.remove(f)
+
+	def runComparisonTest(self, datfile, prmfile, eventPartHnd, refEventPartHnd, blockSizeSec):
+		ev=self._partitionedEvents(datfile, prmfile, eventPartHnd, blockSizeSec)
+		refev=self._partitionedEvents(datfile, prmfile, refEventPartHnd, blockSizeSec)
+
+		assert len(ev) == len(refev)
+
+		for (e, r) in zip(ev, refev):
+			assert e[0] == r[0]
+			assert e[1] == r[1]
+			assert e[2] == r[2]
+			assert np.all(np.array(e[3]) == np.array(r[3]))
+
+	def _partitionedEvents(self, datfile, prmfile, eventPartHnd, blockSizeSec):
+		prm=testutil.readparams(prmfile)
+		dat=tsvTrajIO(fnames=[datfile], Fs=prm['Fs'], separator=',')
+
+		sett = (settings.settings('.', defaultwarn=False).settingsDict)
+
+		epartsettings = sett[eventPartHnd.__name__]
+
+		epartsettings['blockSizeSec'] = blockSizeSec
+		epartsettings['meanOpenCurr'] = 1
+		epartsettings['sdOpenCurr'] = 0.03 
+		epartsettings['slopeOpenCurr'] = 0
+		epartsettings['driftThreshold'] = 1000
+		epartsettings['maxDriftRate'] = 9999.0
+		epartsettings['eventThreshold'] = 5.0
+
+		events=[]
+		class _recordEvents(eventPartHnd):
+			def _processEvent(self, eventobj):
+				events.append( (eventobj.absDataStartIndex, eventobj.eStartEstimate, eventobj.eEndEstimate, list(eventobj.eventData)) )
+				super(_recordEvents, self)._processEvent(eventobj)
+
+		testobj=_recordEvents(
+							dat, 
+							a2s.adept2State, 
+							epartsettings,
+							sett["adept2State"],
+							json.dumps(sett, indent=4)
+						)
+		testobj.PartitionEvents()
+		testobj.Stop()
+
+		for f in glob.glob('mosaic/tests/testdata/*.sqlite'):
+			os.remove(f)
+
+		return events
+
+	def runPrecisionTest(self, datfile, prmfile, eventPartHnd):
+		prm=testutil.readparams(prmfile)
+
+		# remove databases left by earlier tests, which could be reused if they have the same name
+		for f in glob.glob('mosaic/tests/testdata/*.sqlite'):
+			os.remove(f)
+
+		mosaic.DataPrecision='float32'
+		try:
+			dat=tsvTrajIO(fnames=[datfile], Fs=prm['Fs'], separator=',')
+
+			sett = (settings.settings('.', defaultwarn=False).settingsDict)
+
+			epartsettings = sett[eventPartHnd.__name__]
+
+			epartsettings['blockSizeSec'] = 0.006
+			epartsettings['meanOpenCurr'] = 1
+			epartsettings['sdOpenCurr'] = 0.03 
+			epartsettings['slopeOpenCurr'] = 0
+			epartsettings['driftThreshold'] = 1000
+			epartsettings['maxDriftRate'] = 9999.0
+			epartsettings['eventThreshold'] = 5.0
+			epartsettings['writeEventTS'] = 1
+
+			dtypes=set()
+			class _recordEvents(eventPartHnd):
+				def _processEvent(self, eventobj):
+					dtypes.add(np.asarray(eventobj.eventData).dtype)
+					super(_recordEvents, self)._processEvent(eventobj)
+
+			testobj=_recordEvents(
+								dat, 
+								a2s.adept2State, 
+								epartsettings,
+								sett["adept2State"],
+								json.dumps(sett, indent=4)
+							)
+			testobj.PartitionEvents()
+		finally:
+			mosaic.DataPrecision='float64'
+
+		assert testobj.eventcount == prm['nevents']
+		assert dtypes == set([np.dtype(np.float32)])
+
+		# time-series are stored in single precision
+		assert dict(zip(testobj.mdioDBHnd.mdColumnNames, testobj.mdioDBHnd.mdColumnTypes))['TimeSeries'] == 'REAL32_LIST'
+
+		q=testobj.mdioDBHnd.queryDB("select TimeSeries from metadata")
+		assert len(q) == prm['nevents']
+		assert all( [ len(r[0]) > 0 for r in q ] )
+
 		testobj.Stop()
 
 		for f in glob.glob('mosaic/tests/testdata/*.sqlite'):
@@ -5,4 +5,14 @@ class EventPartitionParallel_TestSuite(EventPartitionTest):
 	def test_eventPartition(self):
 		for i in range(1,6):
 			basename='mosaic/tests/testdata/testEventPartition'+str(i)
-			yield self.runTestCase, basename+'.csv', basename+'.prm', es.eventSegment, False
\ No newline at end of file
+			yield self.runTestCase, basename+'.csv', basename+'.prm', es.eventSegment, True
+
+	def test_eventPartitionBatch(self):
+		for i in range(1,6):
+			basename='mosaic/tests/testdata/testEventPartition'+str(i)
+			yield self.runTestCase, basename+'.csv', basename+'.prm', es.eventSegment, True, 7
+
+	def test_eventPartitionPipeline(self):
+		for i in range(1,6):
+			basename='mosaic/tests/testdata/testEventPartition'+str(i)
+			yield self.runTestCase, basename+'.csv', basename+'.prm', es.eventSegment, True, None, True
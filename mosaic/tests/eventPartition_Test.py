@@ -1,5 +1,6 @@
 from mosaic.tests.eventPartitionCommon import EventPartitionTest
 import mosaic.partition.eventSegment as es
+import mosaic.partition.vectorizedEventSegment as ves
 
 class EventPartitionSingle_TestSuite(EventPartitionTest):
 	def test_eventPartition(self):
@@ -7,7 +8,45 @@ class EventPartitionSingle_TestSuite(EventPartitionTest):
 			basename='mosaic/tests/testdata/testEventPartition'+str(i)
 			yield self.runTestCase, basename+'.csv', basename+'.prm', es.eventSegment, False
 
+	def test_eventPartitionDataPrecision(self):
+		for i in range(1,6):
+			basename='mosaic/tests/testdata/testEventPartition'+str(i)
+			yield self.runPrecisionTest, basename+'.csv', basename+'.prm', es.eventSegment
+
 	def test_eventPartitionErrors(self):
 		for param in ['writeEventTS', 'driftThreshold', 'blockSizeSec', 'meanOpenCurr', 'sdOpenCurr', 'slopeOpenCurr','driftThreshold','maxDriftRate', 'eventThreshold']:
 			basename='mosaic/tests/testdata/testEventPartition1'
 			yield self.runTestError, basename+'.csv', param, es.eventSegment, False
+
+class VectorizedEventPartition_TestSuite(EventPartitionTest):
+	def test_eventPartition(self):
+		for i in range(1,6):
+			basename='mosaic/tests/testdata/testEventPartition'+str(i)
+			yield self.runTestCase, basename+'.csv', basename+'.prm', ves.vectorizedEventSegment, False
+
+	def test_eventPartitionDataPrecision(self):
+		for i in range(1,6):
+			basename='mosaic/tests/testdata/testEventPartition'+str(i)
+			yield self.runPrecisionTest, basename+'.csv', basename+'.prm', ves.vectorizedEventSegment
+
+	def test_eventPartitionCompare(self):
+		for i in range(1,6):
+			for blk in [0.002, 0.006]:
+				basename='mosaic/tests/testdata/testEventPartition'+str(i)
+				yield self.runComparisonTest, basename+'.csv', basename+'.prm', ves.vectorizedEventSegment, es.eventSegment, blk
+
+	def test_eventPartitionErrors(self):
+		for param in ['writeEventTS', 'driftThreshold', 'blockSizeSec', 'meanOpenCurr', 'sdOpenCurr', 'slopeOpenCurr','driftThreshold','maxDriftRate', 'eventThreshold']:
+			basename='mosaic/tests/testdata/testEventPartition1'
+			yield self.runTestError, basename+'.csv', param, ves.vectorizedEventSegment, False
+
+class PipelineEventPartition_TestSuite(EventPartitionTest):
+	def test_eventPartition(self):
+		for i in range(1,6):
+			basename='mosaic/tests/testdata/testEventPartition'+str(i)
+			yield self.runTestCase, basename+'.csv', basename+'.prm', es.eventSegment, False, None, True
+
+	def test_vectorizedEventPartition(self):
+		for i in range(1,6):
+			basename='mosaic/tests/testdata/testEventPartition'+str(i)
+			yield self.runTestCase, basename+'.csv', basename+'.prm', ves.vectorizedEventSegment, False, None, True
@@ -0,0 +1,475 @@
+import copy
+import numpy as np
+import scipy.signal as sig
+from nose.tools import raises
+import mosaic.filters.besselLowpassFilter as besselLowpassFilter
+import mosaic.filters.convolutionFilter as convolutionFilter
+import mosaic.filters.waveletDenoiseFilter as waveletDenoiseFilter
+import mosaic.filters.filterChain as filterChain
+
+class FiltersTest(object):
+	def besselFilter(self, filterMode, **kwargs):
+		return besselLowpassFilter.besselLowpassFilter(filterOrder="6", filterCutoff="10000", filterMode=filterMode, **kwargs)
+
+	def chunks(self, dat, chunksize):
+		return [ dat[i:i+chunksize] for i in range(0, len(dat), chunksize) ]
+
+	def streamFilter(self, f, dat, chunksize, Fs):
+		# filter dat in chunks with the neighbouring data points requested by the filter
+		L=f.overlap(Fs)
+		n=len(dat)
+
+		out=[]
+		for i in range(0, n, chunksize):
+			j=min(i+chunksize, n)
+			pre=min(L, i)
+			post=min(L, n-j)
+			f.filterChunk(dat[i-pre:j+post], Fs, pre, post)
+			out.append(f.filteredData)
+
+		return np.hstack(out)
+
+	def polyphaseRef(self, y, h, decimate):
+		# the FIR filter h centred on each data point of y, with y extended by its first and last data points
+		M=len(h)-1
+		c=10*decimate
+		z=np.concatenate([y[0]*np.ones(M-c), y, y[-1]*np.ones(c)])
+
+		return np.convolve(z, h)[M:M+len(y)]
+
+	def runBesselCausalTest(self, n, chunksize, Fs):
+		dat=np.random.normal(100., 5., n)
+		f=self.besselFilter('causal')
+
+		out=[]
+		for d in self.chunks(dat, chunksize):
+			f.filterData(d, Fs)
+			out.append(f.filteredData)
+
+		sos=sig.bessel(6, 10000/(Fs/2.), btype='lowpass', output='sos', norm='mag')
+		ref=sig.sosfilt(sos, dat, zi=sig.sosfilt_zi(sos)*dat[0])[0]
+
+		assert f.stateful
+		assert np.allclose(np.hstack(out), ref, rtol=0, atol=1e-9)
+
+		# reset restarts the filter
+		f.reset()
+		f.filterData(dat[:chunksize], Fs)
+		assert np.allclose(f.filteredData, ref[:chunksize], rtol=0, atol=1e-9)
+
+	def runBesselZeroPhaseTest(self, n, chunksize, Fs, overlap):
+		dat=np.random.normal(100., 5., n)
+		f=self.besselFilter('zerophase', overlap=overlap)
+
+		L=f.overlap(Fs)
+		assert L==int(overlap*Fs/10000.)
+
+		out=[]
+		for i in range(0, n, chunksize):
+			j=min(i+chunksize, n)
+			pre=min(L, i)
+			post=min(L, n-j)
+			f.filterChunk(dat[i-pre:j+post], Fs, pre, post)
+			out.append(f.filteredData)
+
+		# filter the complete data set
+		f.filterData(dat, Fs)
+		ref=f.filteredData
+
+		sos=sig.bessel(6, 10000/(Fs/2.), btype='lowpass', output='sos', norm='mag')
+		assert np.allclose(ref, sig.sosfiltfilt(sos, np.pad(dat, L, mode='edge'), padtype=None)[L:L+n], rtol=0, atol=1e-9)
+
+		assert not f.stateful
+		assert len(np.hstack(out))==n
+		assert np.allclose(np.hstack(out), ref, rtol=0, atol=1e-6)
+
+	def runBesselChunkTest(self, filterOrder, causal):
+		dat=np.random.normal(100., 5., 10000)
+		f=besselLowpassFilter.besselLowpassFilter(filterOrder=filterOrder, filterCutoff="10000", causal=causal)
+		f.filterData(dat, 500000.)
+
+		assert f.filterOrder==6
+		assert len(f.filteredData)==len(dat)
+		assert np.std(f.filteredData) < np.std(dat)
+
+	@raises(ValueError)
+	def runBesselErrorTest(self, filterMode):
+		self.besselFilter(filterMode)
+
+	def runPolyphaseTest(self, n, chunksize, decimate):
+		dat=np.random.normal(100., 5., n)
+		f=self.besselFilter('causal', decimate=decimate, decimateMode='polyphase')
+
+		assert f.stateful
+		assert f.overlap(500000.)==10*decimate
+
+		out=self.streamFilter(f, dat, chunksize, 500000.)
+
+		# the decimator state is only updated once per chunk
+		last=f.filteredData
+		assert f.filteredData is last
+
+		# filter the complete data set at the original sampling frequency
+		f.reset()
+		f.decimateMode='stride'
+		f.polyphaseDecimation=False
+		f.filterData(dat, 500000.)
+		ref=self.polyphaseRef(f.eventData, f.decimateTaps, decimate)
+
+		# data points are kept from the start of each chunk
+		idx=np.hstack([ np.arange(i, min(i+chunksize, n), decimate) for i in range(0, n, chunksize) ])
+
+		assert f.filterFs==500000./decimate
+		assert len(out)==len(idx)
+		assert np.allclose(out, ref[idx], rtol=0, atol=1e-9)
+
+	def runPolyphaseStepTest(self, f, step, chunksize):
+		# a step from 0 to 1 pA is not delayed by the polyphase decimator
+		n=100000
+		dat=np.append(np.zeros(step), np.ones(n-step))
+		decimate=f.totalDecimation
+
+		out=self.streamFilter(f, dat, chunksize, 500000.)
+		idx=np.hstack([ np.arange(i, min(i+chunksize, n), decimate) for i in range(0, n, chunksize) ])
+
+		k=np.argmax(out >= 0.5)
+		assert abs(idx[k]-step) < decimate
+		assert np.allclose(out[:k-20], 0, rtol=0, atol=1e-3)
+		assert np.allclose(out[k+20:], 1, rtol=0, atol=1e-3)
+
+	def runPolyphaseFoldedTest(self, n, chunksize, ncoeff, decimate):
+		dat=np.random.normal(100., 5., n)
+		coeff=np.random.uniform(0, 1, ncoeff)
+
+		f=convolutionFilter.convolutionFilter(filterCoeff=list(coeff), decimate=decimate, decimateMode='polyphase')
+
+		# long kernels are applied with the FFT and are not combined with the decimator
+		assert f.foldedDecimation==(ncoeff < f.fftThreshold*decimate/2)
+
+		out=self.streamFilter(f, dat, chunksize, 500000.)
+
+		# filter the complete data set and then decimate it with the polyphase decimator
+		g=convolutionFilter.convolutionFilter(filterCoeff=list(coeff))
+		g.filterData(dat, 500000.)
+		b=besselLowpassFilter.besselLowpassFilter(filterOrder=6, filterCutoff=10000, decimate=decimate, decimateMode='polyphase')
+		ref=self.polyphaseRef(g.filteredData, b.decimateTaps, decimate)
+
+		idx=np.hstack([ np.arange(i, min(i+chunksize, n), decimate) for i in range(0, n, chunksize) ])
+
+		# the last data points of the data set are padded before and after the filter respectively
+		keep=idx < n-10*decimate-ncoeff
+		assert len(out)==len(idx)
+		assert np.allclose(out[keep], ref[idx][keep], rtol=1e-9, atol=0)
+
+	def runPolyphaseAliasTest(self, decimate):
+		# a sine wave above the Nyquist frequency of the decimated data
+		Fs=500000.
+		t=np.arange(200000)/Fs
+		dat=np.sin(2*np.pi*0.75*(Fs/decimate)*t)
+
+		f=besselLowpassFilter.besselLowpassFilter(filterOrder="6", filterCutoff=Fs/2.5, filterMode='causal', decimate=decimate, decimateMode='polyphase')
+		out=[]
+		for d in self.chunks(dat, 10000):
+			f.filterData(d, Fs)
+			out.append(f.filteredData)
+		out=np.hstack(out)
+
+		f=besselLowpassFilter.besselLowpassFilter(filterOrder="6", filterCutoff=Fs/2.5, filterMode='causal', decimate=decimate)
+		f.filterData(dat, Fs)
+
+		# the aliased signal is suppressed by the polyphase decimator
+		assert np.std(f.filteredData[100:]) > 0.1
+		assert np.std(out[100:]) < 1e-2*np.std(f.filteredData[100:])
+
+	@raises(ValueError)
+	def runDecimateErrorTest(self, decimateMode):
+		self.besselFilter('chunk', decimate=2, decimateMode=decimateMode)
+
+	def runConvolutionTest(self, n, chunksize, ncoeff, fftThreshold):
+		dat=np.random.normal(100., 5., n)
+		coeff=np.random.uniform(0, 1, ncoeff)
+
+		f=convolutionFilter.convolutionFilter(filterCoeff=str(list(coeff)), fftThreshold=fftThreshold)
+		assert f.useFFT==(ncoeff >= fftThreshold)
+
+		out=[]
+		for d in self.chunks(dat, chunksize):
+			f.filterData(d, 500000.)
+			out.append(f.filteredData)
+			assert len(out[-1])==len(d)
+
+		ref=np.correlate(np.append(dat[0]*np.ones(ncoeff-1), dat), coeff, 'valid')
+
+		assert f.stateful
+		assert np.allclose(np.hstack(out), ref, rtol=0, atol=1e-9)
+
+		# reset restarts the filter
+		f.reset()
+		f.filterData(dat[:chunksize], 500000.)
+		assert np.allclose(f.filteredData, ref[:chunksize], rtol=0, atol=1e-9)
+
+	def waveletFilter(self, filterMode, **kwargs):
+		return waveletDenoiseFilter.waveletDenoiseFilter(wavelet="sym5", level="5", thresholdType="soft", thresholdSubType="sqtwolog", filterMode=filterMode, **kwargs)
+
+	def runWaveletStreamingTest(self, n, chunksize):
+		dat=np.random.normal(100., 5., n)
+		f=self.waveletFilter('streaming', thresholdWindow=1)
+
+		L=f.overlap(500000.)
+		assert L==10*2**5
+
+		out=[]
+		for i in range(0, n, chunksize):
+			j=min(i+chunksize, n)
+			pre=min(L, i)
+			post=min(L, n-j)
+			f.filterChunk(dat[i-pre:j+post], 500000., pre, post)
+			out.append(f.filteredData)
+			assert len(out[-1])==j-i
+
+		# the threshold is estimated from the first chunk and reused
+		assert f.thresholdPoints==min(chunksize, n)
+
+		# denoise the complete data set with the same threshold
+		g=self.waveletFilter('chunk', thresholdWindow=1)
+		g.threshold=f.threshold
+		g.thresholdPoints=1
+		g.filterData(dat, 500000.)
+
+		assert np.allclose(np.hstack(out), g.filteredData, rtol=0, atol=1e-9)
+
+	def runWaveletThresholdTest(self, thresholdWindow):
+		dat=np.random.normal(100., 5., 100000)
+		f=self.waveletFilter('chunk', thresholdWindow=thresholdWindow)
+
+		thresh=[]
+		for d in self.chunks(dat, 10000):
+			f.filterData(d, 500000.)
+			thresh.append(f.threshold)
+
+		# the threshold is updated until thresholdWindow data points are processed
+		nchunks=int(np.ceil(thresholdWindow/10000.))
+		assert len(set(thresh[nchunks-1:]))==1
+		assert len(set(thresh[:nchunks]))==nchunks
+
+	def runWaveletPolyphaseTest(self, n, chunksize, decimate):
+		# a smooth step that is not changed by the wavelet filter
+		t=np.arange(n)
+		dat=100.-50.*np.tanh((t-n/3.)/200.)
+
+		f=waveletDenoiseFilter.waveletDenoiseFilter(wavelet='sym5', level=5, thresholdType='soft', thresholdSubType='sqtwolog', filterMode='streaming', decimate=decimate, decimateMode='polyphase')
+		out=self.streamFilter(f, dat, chunksize, 500000.)
+
+		ref=self.polyphaseRef(dat, f.decimateTaps, decimate)
+		idx=np.hstack([ np.arange(i, min(i+chunksize, n), decimate) for i in range(0, n, chunksize) ])
+
+		assert len(out)==len(idx)
+		assert np.allclose(out, ref[idx], rtol=0, atol=1e-3)
+
+		# the filter can be copied
+		g=copy.deepcopy(f)
+		assert g.overlap(500000.)==f.overlap(500000.)
+
+	def runWaveletChunkTest(self, n):
+		dat=np.random.normal(100., 5., n)
+		f=self.waveletFilter('chunk')
+		f.filterData(dat, 500000.)
+
+		assert len(f.filteredData)==n
+		assert np.std(f.filteredData) < np.std(dat)
+
+	@raises(ValueError)
+	def runWaveletErrorTest(self, filterMode):
+		self.waveletFilter(filterMode)
+
+	def runChainTest(self, n, chunksize):
+		dat=np.random.normal(100., 5., n)
+		f=filterChain.filterChain(
+				filters="[('besselLowpassFilter', {'filterOrder' : 6, 'filterCutoff' : 10000, 'filterMode' : 'zerophase'}), ('convolutionFilter', {'filterCoeff' : [0.1]*10}), ('besselLowpassFilter', {'filterOrder' : 4, 'filterCutoff' : 20000, 'filterMode' : 'zerophase', 'overlap' : 5})]"
+			)
+
+		L=f.overlap(500000.)
+		assert L==500+125
+		assert f.stateful
+
+		out=[]
+		for i in range(0, n, chunksize):
+			j=min(i+chunksize, n)
+			pre=min(L, i)
+			post=min(L, n-j)
+			f.filterChunk(dat[i-pre:j+post], 500000., pre, post)
+			out.append(f.filteredData)
+			assert len(out[-1])==j-i
+
+		# apply each filter to the complete data set
+		ref=dat
+		for (mode, kwargs) in [('zerophase', {}), (None, {}), ('zerophase', {'filterOrder' : 4, 'filterCutoff' : 20000, 'overlap' : 5})]:
+			if mode:
+				g=besselLowpassFilter.besselLowpassFilter(**dict({'filterOrder' : 6, 'filterCutoff' : 10000, 'filterMode' : mode}, **kwargs))
+			else:
+				g=convolutionFilter.convolutionFilter()
+			g.filterData(ref, 500000.)
+			ref=g.filteredData
+
+		assert np.allclose(np.hstack(out), ref, rtol=0, atol=1e-6)
+
+	def runChainStatefulTest(self, n, chunksize, causalFirst):
+		# a step in the data shows artefacts at the boundaries of chunks
+		dat=np.random.normal(100., 5., n)
+		dat[n/3:]-=50.
+
+		stages=[
+				('besselLowpassFilter', {'filterOrder' : 4, 'filterCutoff' : 2000, 'filterMode' : 'causal'}),
+				('besselLowpassFilter', {'filterOrder' : 6, 'filterCutoff' : 50000, 'filterMode' : 'zerophase'})
+			]
+		if not causalFirst:
+			stages.reverse()
+
+		f=filterChain.filterChain(filters=stages)
+
+		L=f.overlap(500000.)
+		assert L==100
+
+		out=[]
+		for i in range(0, n, chunksize):
+			j=min(i+chunksize, n)
+			pre=min(L, i)
+			post=min(L, n-j)
+			f.filterChunk(dat[i-pre:j+post], 500000., pre, post)
+			out.append(f.filteredData)
+			assert len(out[-1])==j-i
+
+		# apply each filter to the complete data set
+		ref=dat
+		for (name, kwargs) in stages:
+			g=besselLowpassFilter.besselLowpassFilter(**kwargs)
+			g.filterData(ref, 500000.)
+			ref=g.filteredData
+
+		assert np.allclose(np.hstack(out), ref, rtol=0, atol=1e-6)
+
+	def runChainDecimateTest(self, n, chunksize):
+		dat=np.random.normal(100., 5., n)
+		f=filterChain.filterChain(
+				filters=[
+					('besselLowpassFilter', {'filterOrder' : 6, 'filterCutoff' : 10000, 'filterMode' : 'causal', 'decimate' : 2}),
+					('convolutionFilter', {'decimate' : 3, 'decimateMode' : 'polyphase'})
+				],
+				decimate=2
+			)
+
+		assert f.totalDecimation==12
+		assert f.overlap(500000.)==0
+
+		out=[]
+		for d in self.chunks(dat, chunksize):
+			f.filterData(d, 500000.)
+			out.append(f.filteredData)
+			assert len(out[-1])==int(np.ceil(len(d)/12.))
+
+		assert f.filterFs==500000./12
+		assert f.stages[1].Fs==250000.
+
+	def runChainAttrTest(self):
+		f=filterChain.filterChain(filters=[('waveletDenoiseFilter', {'wavelet' : 'sym5', 'level' : 5, 'thresholdType' : 'soft', 'thresholdSubType' : 'sqtwolog'})])
+		f.filterData(np.random.normal(100., 5., 10000), 500000.)
+
+		# attributes of the stages are available from the chain
+		assert f.maxWaveletLevel==f.stages[0].maxWaveletLevel
+
+	@raises(ValueError)
+	def runChainErrorTest(self, name):
+		filterChain.filterChain(filters=[(name, {})])
+
+class Filters_TestSuite(FiltersTest):
+	def test_besselCausal(self):
+		for n in [1, 9999, 100000]:
+			for chunksize in [1, 1000, 10000]:
+				if n/chunksize < 10000:
+					yield self.runBesselCausalTest, n, chunksize, 500000.
+
+	def test_besselZeroPhase(self):
+		for (n, chunksize) in [(100000, 10000), (99999, 10000), (100000, 333), (1000, 10000)]:
+			for overlap in [5, 10, 20]:
+				yield self.runBesselZeroPhaseTest, n, chunksize, 500000., overlap
+
+	def test_besselChunk(self):
+		for filterOrder in ["6", "6.0", 6]:
+			for causal in ["False", False]:
+				yield self.runBesselChunkTest, filterOrder, causal
+
+	def test_besselError(self):
+		for filterMode in ["", "acausal"]:
+			yield self.runBesselErrorTest, filterMode
+
+	def test_polyphase(self):
+		for (n, chunksize) in [(100000, 10000), (99999, 10000), (10000, 333), (1000, 7), (5, 10000)]:
+			for decimate in [2, 3, 8]:
+				yield self.runPolyphaseTest, n, chunksize, decimate
+
+	def test_polyphaseStep(self):
+		for step in [50037, 49995, 50000]:
+			for decimate in [2, 8]:
+				yield self.runPolyphaseStepTest, convolutionFilter.convolutionFilter(filterCoeff=[1.0], decimate=decimate, decimateMode='polyphase'), step, 10000
+				yield self.runPolyphaseStepTest, self.besselFilter('zerophase', decimate=decimate, decimateMode='polyphase'), step, 10000
+
+	def test_polyphaseFolded(self):
+		for (n, chunksize) in [(100000, 10000), (10000, 333)]:
+			for ncoeff in [1, 10, 200]:
+				for decimate in [2, 8]:
+					yield self.runPolyphaseFoldedTest, n, chunksize, ncoeff, decimate
+
+	def test_polyphaseAlias(self):
+		for decimate in [2, 8]:
+			yield self.runPolyphaseAliasTest, decimate
+
+	def test_decimateError(self):
+		for decimateMode in ["", "fir"]:
+			yield self.runDecimateErrorTest, decimateMode
+
+	def test_convolution(self):
+		for (n, chunksize) in [(100000, 10000), (99999, 10000), (10000, 333), (5, 10000)]:
+			for ncoeff in [1, 10, 1000]:
+				for fftThreshold in [1, 128]:
+					yield self.runConvolutionTest, n, chunksize, ncoeff, fftThreshold
+
+	def test_waveletStreaming(self):
+		for (n, chunksize) in [(100000, 8192), (99999, 8192), (10000, 4096), (1000, 8192)]:
+			yield self.runWaveletStreamingTest, n, chunksize
+
+	def test_waveletThreshold(self):
+		for thresholdWindow in [1, 10000, 25000]:
+			yield self.runWaveletThresholdTest, thresholdWindow
+
+	def test_waveletPolyphase(self):
+		for (n, chunksize) in [(100000, 8192), (10000, 4096)]:
+			for decimate in [2, 4]:
+				yield self.runWaveletPolyphaseTest, n, chunksize, decimate
+
+	def test_waveletChunk(self):
+		for n in [9999, 10000]:
+			yield self.runWaveletChunkTest, n
+
+	def test_waveletError(self):
+		for filterMode in ["", "zerophase"]:
+			yield self.runWaveletErrorTest, filterMode
+
+	def test_chain(self):
+		for (n, chunksize) in [(100000, 10000), (99999, 10000), (10000, 333)]:
+			yield self.runChainTest, n, chunksize
+
+	def test_chainStateful(self):
+		for (n, chunksize) in [(100000, 10000), (99999, 10000), (10000, 333), (1000, 37)]:
+			for causalFirst in [True, False]:
+				yield self.runChainStatefulTest, n, chunksize, causalFirst
+
+	def test_chainDecimate(self):
+		for (n, chunksize) in [(100000, 10000), (99999, 10000), (10000, 333)]:
+			yield self.runChainDecimateTest, n, chunksize
+
+	def test_chainAttr(self):
+		yield self.runChainAttrTest,
+
+	def test_chainError(self):
+		for name in ['besselFilter', 'noFilter']:
+			yield self.runChainErrorTest, name
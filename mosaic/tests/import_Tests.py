@@ -28,13 +28,16 @@ class ModuleImport_TestSuite(ModuleImportTest):
 		'mosaic.filters.besselLowpassFilter',	
 		'mosaic.filters.convolutionFilter',
 		'mosaic.filters.waveletDenoiseFilter',
+		'mosaic.filters.filterChain',
 		'mosaic.partition.metaEventPartition', 
 		'mosaic.partition.eventSegment', 
+		'mosaic.partition.vectorizedEventSegment', 
 		'mosaic.trajio.metaTrajIO', 
 		'mosaic.trajio.qdfTrajIO', 
 		'mosaic.trajio.tsvTrajIO',
 		'mosaic.trajio.abfTrajIO', 
 		'mosaic.trajio.binTrajIO', 
+		'mosaic.trajio.cacheTrajIO',
 		'mosaic.process.metaEventProcessor', 
 		'mosaic.process.cusumPlus', 
 		'mosaic.process.adept', 
@@ -47,6 +50,9 @@ class ModuleImport_TestSuite(ModuleImportTest):
 		'mosaic.utilities.analysis',
 		'mosaic.utilities.mosaicLogFormat',
 		'mosaic.utilities.sqlQuery',
+		'mosaic.utilities.npfifo',
+		'mosaic.utilities.chunkqueue',
+		'mosaic.utilities.trajcache',
 		'mosaic.utilities.fit_funcs',
 		'mosaic.utilities.mosaicTiming',
 		'mosaic.utilities.util',
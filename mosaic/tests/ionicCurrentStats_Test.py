@@ -0,0 +1,55 @@
+import numpy as np
+import scipy.stats
+from mosaic.utilities.ionic_current_stats import *
+
+class IonicCurrentStatsTest(object):
+	def _data(self, mu, sd, slope, n, FsHz, blockfrac):
+		np.random.seed(42)
+
+		t=np.arange(n)/float(FsHz)
+		dat=np.random.normal(mu, sd, n)+slope*t
+
+		# add a blockade at 50% of the open channel current
+		nb=int(blockfrac*n)
+		dat[n/4:n/4+nb]=np.random.normal(mu/2., sd, nb)
+
+		return dat
+
+	def runTestMoments(self, mu, sd, blockfrac):
+		dat=self._data(mu, sd, 0, 100000, 100000, blockfrac)
+
+		[m, s]=OpenCurrentMoments(dat, 0.5)
+
+		assert round(abs(m-abs(mu))/sd, 1) <= 0.1
+		assert round(abs(s-sd)/sd, 2) <= 0.05
+
+	def runTestSlope(self, slope, FsHz):
+		dat=self._data(100., 5., slope, 10000, FsHz, 0)
+
+		ref=scipy.stats.linregress(np.arange(len(dat))/float(FsHz), dat)[0]
+
+		assert round(OpenCurrentSlope(dat, FsHz)-ref, 6) == 0
+
+	def runTestMethods(self, mu, sd):
+		dat=self._data(mu, sd, 0, 100000, 100000, 0.1)
+
+		[m1, s1, sl1]=OpenCurrentStats(dat, 100000, method='moments')
+		[m2, s2, sl2]=OpenCurrentStats(dat, 100000, method='fit')
+
+		assert round(abs(m1-m2)/sd, 1) <= 0.1
+		assert round(abs(s1-s2)/sd, 1) <= 0.1
+		assert round(sl1-sl2, 6) == 0
+
+class IonicCurrentStats_TestSuite(IonicCurrentStatsTest):
+	def test_openCurrentMoments(self):
+		for mu in [120., -120.]:
+			for blockfrac in [0, 0.1, 0.3]:
+				yield self.runTestMoments, mu, 5., blockfrac
+
+	def test_openCurrentSlope(self):
+		for slope in [-10., 0., 25.]:
+			yield self.runTestSlope, slope, 50000
+
+	def test_openCurrentMethods(self):
+		for sd in [2., 5.]:
+			yield self.runTestMethods, 150., sd
@@ -25,6 +25,12 @@ class MDIOTest(object):
 
 		assert len(d.keys()) > 0
 
+	def runTestdatarecordArray(self, data_label, data, data_t):
+		d=sqlite3MDIO.data_record(data_label, [np.array(data)], data_t)
+		l=sqlite3MDIO.data_record(data_label, [data], data_t)
+
+		assert d[data_label[0]] == l[data_label[0]]
+
 	def runTestSQLQuery(self, dbname, q):
 		s=sqlite3MDIO.sqlite3MDIO()
 		s.openDB(dbname)
@@ -65,5 +71,9 @@ class MDIOTest_TestSuite(MDIOTest):
 		yield self.runTestCSVExport, resource_path("eventMD-PEG28-ADEPT2State.sqlite"), """select ProcessingStatus from metadata"""
 
 	def test_datarecord(self):
-		for dat_t in ["REAL_LIST", "INTEGER_LIST"]:
-			yield self.runTestdatarecord, ['data'], [[0,1,2]], [dat_t]
\ No newline at end of file
+		for dat_t in ["REAL_LIST", "REAL32_LIST", "INTEGER_LIST"]:
+			yield self.runTestdatarecord, ['data'], [[0,1,2]], [dat_t]
+
+	def test_datarecordarray(self):
+		for dat_t in ["REAL_LIST", "REAL32_LIST", "INTEGER_LIST"]:
+			yield self.runTestdatarecordArray, ['data'], [0,1,2], [dat_t]
@@ -0,0 +1,75 @@
+import numpy as np
+from nose.tools import raises
+import mosaic.utilities.npfifo as npfifo
+
+class NPFIFOTest(object):
+	def runTestExtend(self, size, blocksize, nblocks):
+		f=npfifo.npfifo(size)
+		dat=np.arange(blocksize*nblocks, dtype=np.float64)
+
+		for i in range(nblocks):
+			f.extend(dat[i*blocksize:(i+1)*blocksize])
+
+		assert len(f) == len(dat)
+		assert np.all(f.peek() == dat)
+
+	def runTestWrap(self, size, blocksize, nread):
+		f=npfifo.npfifo(size)
+		dat=np.arange(10*blocksize, dtype=np.float64)
+
+		out=[]
+		for i in range(10):
+			f.extend(dat[i*blocksize:(i+1)*blocksize])
+			out.extend(f.pop(nread).tolist())
+		out.extend(f.pop(len(f)).tolist())
+
+		assert np.all(np.array(out) == dat)
+		assert len(f) == 0
+
+	def runTestLookback(self, lookback, nread):
+		f=npfifo.npfifo(16, lookback=lookback)
+		dat=np.arange(100, dtype=np.float64)
+
+		f.extend(dat[:50])
+		f.discard(nread)
+		f.extend(dat[50:])
+
+		n=min(lookback, nread)
+		assert np.all(f.lookback(lookback) == dat[nread-n:nread])
+		assert np.all(f.peek() == dat[nread:])
+
+	def runTestDeque(self, key):
+		f=npfifo.npfifo(4)
+		dat=np.arange(10, dtype=np.float64)
+		f.extend(dat)
+
+		assert np.all(f[key] == dat[key])
+
+	@raises(IndexError)
+	def runTestEmpty(self, n):
+		f=npfifo.npfifo(4)
+		f.extend(np.arange(n))
+
+		while 1:
+			f.popleft()
+
+class NPFIFO_TestSuite(NPFIFOTest):
+	def test_extend(self):
+		for (size, blocksize, nblocks) in [ (1, 10, 10), (100, 10, 10), (1000, 10, 10) ]:
+			yield self.runTestExtend, size, blocksize, nblocks
+
+	def test_wrap(self):
+		for (size, blocksize, nread) in [ (16, 10, 7), (16, 10, 10), (4, 10, 3), (100, 33, 20) ]:
+			yield self.runTestWrap, size, blocksize, nread
+
+	def test_lookback(self):
+		for (lookback, nread) in [ (0, 10), (5, 10), (10, 5), (20, 45) ]:
+			yield self.runTestLookback, lookback, nread
+
+	def test_deque(self):
+		for key in [ 0, 5, -1, slice(2,7), slice(0,10,2) ]:
+			yield self.runTestDeque, key
+
+	def test_empty(self):
+		for n in [ 0, 1, 10 ]:
+			yield self.runTestEmpty, n
@@ -1,15 +1,48 @@
 import copy
+import json
+import os
+import shutil
+import tempfile
+import time
+import threading
 from nose.tools import raises
+import mosaic
 from mosaic.utilities.resource_path import resource_path
 import mosaic.trajio.metaTrajIO as metaTrajIO
 import mosaic.trajio.qdfTrajIO as qdfTrajIO
 import mosaic.trajio.binTrajIO as binTrajIO
 import mosaic.trajio.tsvTrajIO as tsvTrajIO
 import mosaic.trajio.chimeraTrajIO as chimeraTrajIO
+import mosaic.trajio.cacheTrajIO as cacheTrajIO
+import mosaic.utilities.trajcache as trajcache
+import mosaic.trajio.abf.abf as abf
+import mosaic.trajio.qdf.qdf as qdf
 import mosaic.filters.besselLowpassFilter as besselLowpassFilter
+import mosaic.filters.filterChain as filterChain
+import mosaic.filters.metaIOFilter as metaIOFilter
 from mosaic.utilities.ionic_current_stats import OpenCurrentDist
 import numpy as np
 
+class scaleFilter(metaIOFilter.metaIOFilter):
+	# A filter that scales each chunk of data independently.
+	def _init(self, **kwargs):
+		pass
+
+	def filterData(self, icurr, Fs):
+		self.eventData=2.*icurr
+		self.Fs=Fs
+
+	def formatsettings(self):
+		pass
+
+class attrTrajIO(binTrajIO.binTrajIO):
+	# A TrajIO that sets an attribute when a data file is read, which is saved in the trajectory cache.
+	_cacheattrs=['fileAttr']
+
+	def readdata(self, fname):
+		self.fileAttr=os.path.basename(fname)
+		return super(attrTrajIO, self).readdata(fname)
+
 class TrajIOTest(object):
 	_refcurrent=[135.99604311732614, 6.6679749349455024]
 	_trajioHnd={
@@ -150,6 +183,22 @@ class TrajIOTest(object):
 
 		dat=q.popdata(1000)
 
+	def runTSVChunkTestCase(self, chunkrows, sep):
+		datapath=tempfile.mkdtemp()
+		try:
+			fname=datapath+'/chunk.tsv'
+			ref=np.column_stack( (np.arange(2500)*2e-6, np.random.normal(100., 5., 2500), np.ones(2500)) )
+			np.savetxt(fname, ref, delimiter=sep, header=sep.join(['t', 'i', 'v']), comments='')
+
+			q=tsvTrajIO.tsvTrajIO(fnames=[fname], nCols=3, timeCol=0, currCol=1, separator=sep)
+			q.tsvChunkRows=chunkrows
+
+			assert np.allclose(q.readdata(fname), ref[:,1], rtol=1e-15, atol=0)
+			assert np.isclose(q.Fs, 500000.)
+			assert len(self.readall(q))==2500
+		finally:
+			shutil.rmtree(datapath, ignore_errors=True)
+
 	def runFuncTestCase(self, dattype, sdict, funcname, args, kwargs):
 		t=copy.deepcopy(TrajIOTest._trajioHnd[dattype])
 
@@ -170,11 +219,551 @@ class TrajIOTest(object):
 		print propname, "=", getattr(d, propname)
 		assert len(str(getattr(d, propname))) > 0
 
+	def readall(self, q):
+		dat=[]
+		try:
+			while(1):
+				dat.append(q.popdata(q.CHUNKSIZE))
+		except metaTrajIO.EmptyDataPipeError:
+			pass
+
+		return np.hstack(dat)
+
+	def runFileLengthTestCase(self, dattype, dirname):
+		t=TrajIOTest._trajioHnd[dattype]
+		q=t[0](dirname=dirname, **t[1])
+
+		n=q.filelength(q.dataFileList[0])
+
+		assert n==len(self.readall(t[0](dirname=dirname, **t[1])))
+
+	def setupSeekData(self, lengths, decimate):
+		self.datapath=tempfile.mkdtemp()
+
+		fnames=[]
+		for i, n in enumerate(lengths):
+			fnames.append(self.datapath+'/seek-'+str(i)+'.bin')
+			np.random.normal(100., 5., n).tofile(fnames[-1])
+
+		with open(self.datapath+'/.settings', 'w') as f:
+			f.write(json.dumps({"scaleFilter" : {"decimate" : decimate}}))
+
+		kwargs=copy.deepcopy(TrajIOTest._trajioHnd['bin'][1])
+		kwargs.pop('filter')
+		kwargs['fnames']=fnames
+		if decimate:
+			kwargs['datafilter']=scaleFilter
+
+		return kwargs
+
+	def trajioObj(self, kwargs):
+		# the list of filenames is consumed as files are read
+		return binTrajIO.binTrajIO(**dict(kwargs, fnames=list(kwargs['fnames'])))
+
+	def runSeekTestCase(self, lengths, decimate, index):
+		try:
+			kwargs=self.setupSeekData(lengths, decimate)
+
+			ref=self.readall(self.trajioObj(kwargs))
+
+			q=self.trajioObj(kwargs)
+			q.seek(index)
+
+			assert q.globalDataIndex==index
+			assert len(ref)==sum([ q.filelength(f) for f in kwargs['fnames'] ])
+			assert np.all(self.readall(q)==ref[index:])
+		finally:
+			shutil.rmtree(self.datapath, ignore_errors=True)
+
+	def runWindowTestCase(self, lengths, decimate, startSec, durationSec):
+		try:
+			kwargs=self.setupSeekData(lengths, decimate)
+
+			ref=self.readall(self.trajioObj(kwargs))
+			rawkwargs=dict(kwargs)
+			rawkwargs.pop('datafilter', None)
+			rawref=self.readall(self.trajioObj(rawkwargs))
+
+			q=self.trajioObj(kwargs)
+			dat=q.popdata(100)
+
+			i=int(startSec*q.FsHz)
+			assert np.all(q.readWindow(startSec, durationSec)==ref[i:i+int(durationSec*q.FsHz)])
+
+			i=int(startSec*q.Fs)
+			assert np.all(q.readWindow(startSec, durationSec, filtered=False)==rawref[i:i+int(durationSec*q.Fs)])
+
+			# the position of the trajectory is unchanged
+			assert np.all(q.popdata(100)==ref[100:200])
+		finally:
+			shutil.rmtree(self.datapath, ignore_errors=True)
+
+	def runTailTestCase(self, usedirname, writes):
+		self.datapath=tempfile.mkdtemp()
+		try:
+			dat=np.random.normal(100., 5., sum(n for (f, n) in writes)+25000)
+
+			# data that is available when the analysis starts
+			dat[:25000].tofile(self.datapath+'/tail-0.bin')
+
+			def _write():
+				i=25000
+				for (f, n) in writes:
+					time.sleep(0.02)
+					with open(self.datapath+'/tail-'+str(f)+'.bin', 'ab') as fh:
+						b=dat[i:i+n].tostring()
+						# write an incomplete record first
+						fh.write(b[:len(b)/2+3])
+						fh.flush()
+						time.sleep(0.02)
+						fh.write(b[len(b)/2+3:])
+					i+=n
+
+			kwargs=copy.deepcopy(TrajIOTest._trajioHnd['bin'][1])
+			kwargs.update(tailMode=1, tailPollSec=0.005, tailTimeoutSec=0.5)
+			if usedirname:
+				kwargs.update(dirname=self.datapath, filter='tail-*.bin')
+			else:
+				kwargs.pop('filter')
+				kwargs['fnames']=[self.datapath+'/tail-0.bin']
+
+			q=binTrajIO.binTrajIO(**kwargs)
+
+			w=threading.Thread(target=_write)
+			w.start()
+			try:
+				d=self.readall(q)
+			finally:
+				w.join()
+
+			if usedirname:
+				assert np.all(d==dat)
+			else:
+				# only data that is appended to the first file is read
+				assert np.all(d==dat[:25000+sum(n for (f, n) in writes if f==0)])
+		finally:
+			shutil.rmtree(self.datapath, ignore_errors=True)
+
+	def runIncompleteRecordTestCase(self, dattype):
+		self.datapath=tempfile.mkdtemp()
+		try:
+			t=TrajIOTest._trajioHnd[dattype]
+			ref=self.readall(t[0](dirname='mosaic/tests/testdata/', **t[1]))
+
+			# a data file that ends with an incomplete record
+			with open('mosaic/tests/testdata/'+t[1]['filter'], 'rb') as f:
+				b=f.read()
+			with open(self.datapath+'/'+t[1]['filter'], 'wb') as f:
+				f.write(b+b[:1])
+
+			q=t[0](dirname=self.datapath, **t[1])
+			assert q.filelength(q.dataFileList[0])==len(ref)
+			assert np.all(self.readall(q)==ref)
+		finally:
+			shutil.rmtree(self.datapath, ignore_errors=True)
+
+	def runDataLengthTestCase(self, lengths, start, end):
+		try:
+			kwargs=self.setupSeekData(lengths, 0)
+			kwargs['SamplingFrequency']=5000
+			kwargs['start']=start
+			if end:
+				kwargs['end']=end
+
+			q=self.trajioObj(kwargs)
+
+			if end > 0:
+				assert np.isclose(q.DataLengthSec, min(end, sum(lengths)/5000.)-start)
+			else:
+				assert np.isclose(q.DataLengthSec, sum(lengths)/5000.-start)
+		finally:
+			shutil.rmtree(self.datapath, ignore_errors=True)
+
+	def runStartTestCase(self, lengths, start):
+		try:
+			kwargs=self.setupSeekData(lengths, 0)
+
+			q=self.trajioObj(kwargs)
+			q.popdata(int(start*q.FsHz)-1)
+			ref=q.popdata(1000)
+
+			kwargs['start']=start
+			q=self.trajioObj(kwargs)
+
+			assert np.all(q.popdata(1000)==ref)
+		finally:
+			shutil.rmtree(self.datapath, ignore_errors=True)
+
+	def runPrefetchTestCase(self, lengths, decimate, depth, maxMB, index):
+		try:
+			kwargs=self.setupSeekData(lengths, decimate)
+
+			ref=self.readall(self.trajioObj(kwargs))
+
+			q=self.trajioObj(dict(kwargs, prefetchDepth=depth, prefetchMaxMB=maxMB))
+			q.seek(index)
+
+			assert np.all(self.readall(q)==ref[index:])
+			assert q.prefetchThread is None
+		finally:
+			shutil.rmtree(self.datapath, ignore_errors=True)
+
+	def runPrecisionTestCase(self, lengths, decimate, depth):
+		try:
+			kwargs=self.setupSeekData(lengths, decimate)
+			kwargs['dcOffset']=10.0
+
+			ref=self.readall(self.trajioObj(kwargs))
+			refwin=self.trajioObj(kwargs).readWindow(0.001, 0.01)
+
+			mosaic.DataPrecision='float32'
+			try:
+				q=self.trajioObj(dict(kwargs, prefetchDepth=depth))
+				dat=self.readall(q)
+				win=q.readWindow(0.001, 0.01)
+			finally:
+				mosaic.DataPrecision='float64'
+
+			assert dat.dtype==np.float32
+			assert win.dtype==np.float32
+			assert len(dat)==len(ref)
+			assert np.allclose(dat, ref, rtol=1e-6)
+			assert np.allclose(win, refwin, rtol=1e-6)
+		finally:
+			shutil.rmtree(self.datapath, ignore_errors=True)
+
+	def runBesselTestCase(self, filterMode, decimate, index):
+		try:
+			kwargs=self.setupSeekData([25000, 15000, 30000], 0)
+			kwargs['datafilter']=besselLowpassFilter.besselLowpassFilter
+
+			filtsettings={"filterOrder" : 6, "filterCutoff" : 10000, "filterMode" : filterMode, "decimate" : decimate}
+			with open(self.datapath+'/.settings', 'w') as f:
+				f.write(json.dumps({"besselLowpassFilter" : filtsettings}))
+
+			# filter each data file at once
+			ref=[]
+			for fname in kwargs['fnames']:
+				b=besselLowpassFilter.besselLowpassFilter(**filtsettings)
+				b.filterData(np.fromfile(fname), 500000)
+				ref.append(b.filteredData)
+			ref=np.hstack(ref)
+
+			dat=self.readall(self.trajioObj(kwargs))
+			assert len(dat)==len(ref)
+			assert np.allclose(dat, ref, rtol=0, atol=1e-9)
+
+			q=self.trajioObj(kwargs)
+			q.seek(index)
+			assert np.allclose(self.readall(q), ref[index:], rtol=0, atol=1e-9)
+
+			i=int(0.045*q.FsHz)
+			assert np.allclose(q.readWindow(0.045, 0.01), ref[i:i+int(0.01*q.FsHz)], rtol=0, atol=1e-9)
+		finally:
+			shutil.rmtree(self.datapath, ignore_errors=True)
+
+	def runPolyphaseTestCase(self, decimate, index):
+		try:
+			kwargs=self.setupSeekData([25000, 15000, 30000], decimate)
+			with open(self.datapath+'/.settings', 'w') as f:
+				f.write(json.dumps({"scaleFilter" : {"decimate" : decimate, "decimateMode" : "polyphase"}}))
+
+			ref=self.readall(self.trajioObj(kwargs))
+			assert len(ref)==sum([ self.trajioObj(kwargs).filelength(f) for f in kwargs['fnames'] ])
+
+			q=self.trajioObj(kwargs)
+			q.seek(index)
+			assert np.allclose(self.readall(q), ref[index:], rtol=0, atol=1e-9)
+
+			i=int(0.045*q.FsHz)
+			assert np.allclose(q.readWindow(0.045, 0.01), ref[i:i+int(0.01*q.FsHz)], rtol=0, atol=1e-9)
+		finally:
+			shutil.rmtree(self.datapath, ignore_errors=True)
+
+	def runChainTestCase(self, index):
+		try:
+			kwargs=self.setupSeekData([25000, 15000, 30000], 0)
+			kwargs['datafilter']=filterChain.filterChain
+
+			filters="[('besselLowpassFilter', {'filterOrder' : 6, 'filterCutoff' : 10000, 'filterMode' : 'zerophase'}), ('convolutionFilter', {}), ('besselLowpassFilter', {'filterOrder' : 4, 'filterCutoff' : 20000, 'filterMode' : 'causal', 'decimate' : 2, 'decimateMode' : 'polyphase'})]"
+			with open(self.datapath+'/.settings', 'w') as f:
+				f.write(json.dumps({"filterChain" : {"filters" : filters, "decimate" : 2}}))
+
+			ref=self.readall(self.trajioObj(kwargs))
+
+			q=self.trajioObj(kwargs)
+			assert q.FsHz==500000/4
+			assert len(ref)==sum([ q.filelength(f) for f in kwargs['fnames'] ])
+
+			q.seek(index)
+			assert np.allclose(self.readall(q), ref[index:], rtol=0, atol=1e-9)
+
+			i=int(0.045*q.FsHz)
+			assert np.allclose(q.readWindow(0.045, 0.01), ref[i:i+int(0.01*q.FsHz)], rtol=0, atol=1e-9)
+		finally:
+			shutil.rmtree(self.datapath, ignore_errors=True)
+
+	def runCacheWriterTestCase(self, abort):
+		cachedir=tempfile.mkdtemp()
+		try:
+			fname='mosaic/tests/testdata/SingleChan-0001_1.bin'
+			cachefname=trajcache.cachefilename(cachedir+'/cache', fname)
+
+			# two writers cache the same data file at the same time
+			w1=trajcache.cachewriter(cachefname, fname, 500000, 'settings')
+			w2=trajcache.cachewriter(cachefname, fname, 500000, 'settings')
+			assert w1.tmpfname!=w2.tmpfname
+
+			w1.write(np.arange(1000))
+			w2.write(np.arange(2000))
+			w1.close()
+			if abort:
+				w2.abort()
+			else:
+				w2.close()
+
+			(dat, hdr)=trajcache.readcache(cachefname)
+			assert np.all(dat==np.arange([2000, 1000][abort]))
+			assert os.listdir(cachedir+'/cache')==[os.path.basename(cachefname)]
+		finally:
+			shutil.rmtree(cachedir, ignore_errors=True)
+
+	def runPrefetchLimitTestCase(self, maxBytes):
+		p=metaTrajIO._filePrefetcher(lambda f: np.ones(1000)*int(f), 3, maxBytes)
+		p.start()
+		try:
+			p.schedule(['1', '2', '3'])
+
+			t0=time.time()
+			while len(p.ready) < 3 and time.time()-t0 < 1.0:
+				time.sleep(0.01)
+
+			# only one file is read ahead once the limit is exceeded
+			assert len(p.ready)==min(3, 1+(maxBytes-1)/8000)
+
+			assert np.all(p.popdata('1')==1)
+			assert p.popdata('1') is None
+			assert p.popdata('4') is None
+
+			# discard files that are no longer needed
+			p.schedule(['3'])
+			assert '2' not in p.ready
+		finally:
+			p.stop()
+
+	def runABFDataTestCase(self, header, dt):
+		raw=np.arange(-25000, 25000, 7).astype(dt).reshape((-1,1))
+
+		# reference: scale the complete data set at once
+		ref=raw.astype('f')
+		if dt=='i2':
+			if header['fFileVersionNumber'] < 2.:
+				abf.reformat_integer_V1(ref, 1, header)
+			else:
+				abf.reformat_integer_V2(ref, 1, header)
+		ref=ref[:,0]
+
+		d=abf.abfdata(raw, header)
+
+		assert len(d)==len(ref)
+		assert np.all(np.hstack([ d[i:i+1000] for i in range(0, len(d), 1000) ])==ref)
+		assert np.all(np.asarray(d)==ref)
+
+		# integer indices return a single data point
+		assert d[5]==ref[5] and d[-1]==ref[-1] and d[np.int64(7)]==ref[7]
+		self.checkIndexErrors(d)
+
+	def checkIndexErrors(self, d):
+		for (key, err) in [(len(d), IndexError), (-len(d)-1, IndexError), ('a', TypeError), (1.5, TypeError)]:
+			try:
+				d[key]
+				raise AssertionError("{0} was not raised for index {1}".format(err.__name__, key))
+			except err:
+				pass
+
+	def runQDFDataTestCase(self, fmt, chunksize):
+		q=qdf.QDF('mosaic/tests/testdata/SingleChan-0001.qdf', 9.1e9, 1.07e-12)
+		if fmt=='V':
+			ref=q.VoltageToCurrent()
+			d=q.VoltageToCurrent(lazy=True)
+		else:
+			ref=q.Current()
+			d=q.Current(lazy=True)
+
+		assert len(d)==len(ref)
+		assert np.all(np.hstack([ d[i:i+chunksize] for i in range(0, len(d), chunksize) ])==ref)
+		assert np.all(np.asarray(d)==ref)
+
+		# integer indices return a single data point
+		assert d[5]==ref[5] and d[-1]==ref[-1] and d[np.int64(7)]==ref[7]
+		self.checkIndexErrors(d)
+
+	def runCacheTestCase(self, dattype, dtype):
+		t=TrajIOTest._trajioHnd[dattype]
+		cachedir=tempfile.mkdtemp()
+
+		def noread(fname):
+			raise AssertionError("{0} was read instead of the trajectory cache.".format(fname))
+
+		try:
+			ref=self.readall(t[0](dirname='mosaic/tests/testdata/', **t[1]))
+
+			# the first analysis creates the cache
+			q=t[0](dirname='mosaic/tests/testdata/', cacheData=1, cacheDir=cachedir, cacheDataType=dtype, **t[1])
+			assert np.allclose(self.readall(q), ref, rtol=np.finfo(dtype).eps, atol=0)
+
+			# subsequent analyses read the cache
+			q=t[0](dirname='mosaic/tests/testdata/', cacheData=1, cacheDir=cachedir, cacheDataType=dtype, **t[1])
+			q.readdata=noread
+			dat=self.readall(q)
+			assert np.allclose(dat, ref, rtol=np.finfo(dtype).eps, atol=0)
+			assert q.FsHz==500000
+
+			# cache files can be read directly
+			c=cacheTrajIO.cacheTrajIO(dirname=cachedir, filter='*.mtc')
+			assert np.all(self.readall(c)==dat)
+			assert c.FsHz==500000
+
+			# a change in settings invalidates the cache
+			cachefname=trajcache.cachefilename(cachedir, q.dataFileList[0])
+			assert trajcache.validcache(cachefname, q.dataFileList[0], q.cacheSettings)
+			assert not trajcache.validcache(cachefname, q.dataFileList[0], q.cacheSettings+'x')
+		finally:
+			shutil.rmtree(cachedir, ignore_errors=True)
+
+	def runCacheAttrsTestCase(self):
+		kwargs=TrajIOTest._trajioHnd['bin'][1]
+		cachedir=tempfile.mkdtemp()
+
+		def noread(fname):
+			raise AssertionError("{0} was read instead of the trajectory cache.".format(fname))
+
+		try:
+			q=attrTrajIO(dirname='mosaic/tests/testdata/', cacheData=1, cacheDir=cachedir, **kwargs)
+			self.readall(q)
+
+			# the attribute is restored from the cache
+			q=attrTrajIO(dirname='mosaic/tests/testdata/', cacheData=1, cacheDir=cachedir, **kwargs)
+			q.readdata=noread
+			self.readall(q)
+			assert q.fileAttr==kwargs['filter']
+		finally:
+			shutil.rmtree(cachedir, ignore_errors=True)
+
 class TrajIO_TestSuite(TrajIOTest):
 	def test_trajio(self):
 		for dat in ['qdf','bin', 'tsv', 'csv']:
 			yield self.runTestCase, dat, 'mosaic/tests/testdata/'
 
+	def test_trajioFileLength(self):
+		for dat in ['qdf','bin', 'tsv', 'chi']:
+			yield self.runFileLengthTestCase, dat, 'mosaic/tests/testdata/'
+
+	def test_trajioSeek(self):
+		for decimate in [0, 1, 3]:
+			for index in [0, 1, 3333, 9999, 12345, 20000, 25000, 34567, 40000, 61000]:
+				yield self.runSeekTestCase, [25000, 15000, 30000], decimate, index/max(1, decimate)
+
+	def test_trajioWindow(self):
+		for decimate in [0, 3]:
+			for (startSec, durationSec) in [(0, 0.01), (0.01, 0.001), (0.045, 0.01), (0.02, 0.1), (0.05, 0.05), (0.2, 0.01)]:
+				yield self.runWindowTestCase, [25000, 15000, 30000], decimate, startSec, durationSec
+
+	def test_trajioTail(self):
+		for usedirname in [True, False]:
+			for writes in [[], [(0, 15000)], [(0, 3), (0, 15000), (1, 30000), (1, 5)], [(1, 30000), (2, 7)]]:
+				yield self.runTailTestCase, usedirname, writes
+
+	def test_trajioIncompleteRecord(self):
+		for dattype in ['bin', 'chi']:
+			yield self.runIncompleteRecordTestCase, dattype
+
+	def test_trajioDataLength(self):
+		for lengths in [[25000, 15000, 30000], [100000, 1000], [1000, 100000, 7]]:
+			for (start, end) in [(0, 0), (1, 0), (1, 10), (0, -1), (0, 100)]:
+				yield self.runDataLengthTestCase, lengths, start, end
+
+	def test_trajioStart(self):
+		for start in [0.01, 0.05, 0.1]:
+			yield self.runStartTestCase, [25000, 15000, 30000], start
+
+	def test_trajioPrefetch(self):
+		for decimate in [0, 3]:
+			for depth in [1, 2]:
+				for maxMB in [1024, 0.01]:
+					for index in [0, 12345, 34567]:
+						yield self.runPrefetchTestCase, [25000, 15000, 30000, 10000], decimate, depth, maxMB, index/max(1, decimate)
+
+	def test_trajioPrecision(self):
+		for decimate in [0, 3]:
+			for depth in [0, 1]:
+				yield self.runPrecisionTestCase, [25000, 15000, 30000], decimate, depth
+
+	def test_trajioBessel(self):
+		for filterMode in ['causal', 'zerophase']:
+			for decimate in [1, 2]:
+				for index in [0, 12345, 34567]:
+					yield self.runBesselTestCase, filterMode, decimate, index/decimate
+
+	def test_trajioPolyphase(self):
+		for decimate in [3, 8]:
+			for index in [0, 12345, 34567]:
+				yield self.runPolyphaseTestCase, decimate, index/decimate
+
+	def test_trajioFilterChain(self):
+		for index in [0, 3333, 8642]:
+			yield self.runChainTestCase, index
+
+	def test_trajioPrefetchLimit(self):
+		for maxBytes in [1, 16000, 2**20]:
+			yield self.runPrefetchLimitTestCase, maxBytes
+
+	def test_trajioCache(self):
+		for dat in ['qdf', 'bin', 'tsv']:
+			for dtype in ['f4', 'f8']:
+				yield self.runCacheTestCase, dat, dtype
+
+	def test_trajioCacheAttrs(self):
+		yield self.runCacheAttrsTestCase,
+
+	def test_trajioCacheWriter(self):
+		for abort in [False, True]:
+			yield self.runCacheWriterTestCase, abort
+
+	def test_qdfData(self):
+		for fmt in ['V', 'pA']:
+			for chunksize in [999, 10000]:
+				yield self.runQDFDataTestCase, fmt, chunksize
+
+	def test_abfData(self):
+		hdr1={
+				'fFileVersionNumber' : 1.8,
+				'fInstrumentScaleFactor' : [0.5],
+				'fSignalGain' : [2.0],
+				'fADCProgrammableGain' : [1.5],
+				'nTelegraphEnable' : [1],
+				'fTelegraphAdditGain' : [10.0],
+				'fADCRange' : 10.0,
+				'lADCResolution' : 32768,
+				'fInstrumentOffset' : [0.1],
+				'fSignalOffset' : [0.05]
+			}
+		hdr2={
+				'fFileVersionNumber' : 2.0,
+				'listADCInfo' : [{
+									'fInstrumentScaleFactor' : 0.5,
+									'fSignalGain' : 2.0,
+									'fADCProgrammableGain' : 1.5,
+									'nTelegraphEnable' : 0,
+									'fInstrumentOffset' : 0.1,
+									'fSignalOffset' : 0.05
+								}],
+				'protocol' : { 'fADCRange' : 10.0, 'lADCResolution' : 32768 }
+			}
+		for hdr in [hdr1, hdr2]:
+			for dt in ['i2', 'f4']:
+				yield self.runABFDataTestCase, hdr, dt
+
 	def test_trajiochimera(self):
 		yield self.runTestCaseChimera, 'chi', 'mosaic/tests/testdata/'
 
@@ -200,6 +789,11 @@ class TrajIO_TestSuite(TrajIOTest):
 	def test_tsvSettingsTest(self):
 		yield self.runTSVCurrentTestCase, 'mosaic/tests/testdata/'
 
+	def test_tsvChunkTest(self):
+		for chunkrows in [1000, 2500, 100000]:
+			for sep in ['\t', ',']:
+				yield self.runTSVChunkTestCase, chunkrows, sep
+
 	def test_trajioSetupErrorTest(self):
 		for sett in [
 					{"dirname": "mosaic/tests/testdata/", "fnames" : resource_path("SingleChan-0001.qdf")},
@@ -0,0 +1,183 @@
+import os
+import glob
+import shutil
+import tempfile
+import numpy as np
+from nose.tools import raises
+import mosaic.trajio.binTrajIO as binTrajIO
+import mosaic.utilities.trajpyramid as trajpyramid
+
+class TrajPyramidTest(object):
+	def setupData(self, lengths):
+		self.datapath=tempfile.mkdtemp()
+
+		self.fnames=[]
+		for i, n in enumerate(lengths):
+			self.fnames.append(self.datapath+'/pyr-'+str(i)+'.bin')
+			np.random.normal(100., 5., n).tofile(self.fnames[-1])
+
+		return np.concatenate([ np.fromfile(f) for f in self.fnames ])
+
+	def trajioObj(self):
+		return binTrajIO.binTrajIO(
+				fnames=list(self.fnames),
+				SamplingFrequency=100000,
+				ColumnTypes=[('curr_pA', 'f8')],
+				IonicCurrentColumn='curr_pA',
+				dcOffset=1.0
+			)
+
+	def runTestLevels(self, lengths, minDecimation):
+		try:
+			dat=self.setupData(lengths)-1.0
+
+			p=trajpyramid.trajpyramid(self.trajioObj(), minDecimation=minDecimation, minBins=8)
+
+			assert p.length==len(dat)
+			assert p.levels[0]["decimation"]==minDecimation
+			assert p.levels[-1]["length"] < 8 or len(p.levels)==1
+
+			# compare each level to the envelope of the complete data set
+			for l in p.levels:
+				d=l["decimation"]
+				(ymin, ymax, ymean)=p._levels[d]
+
+				n=(len(dat)+d-1)/d
+				pad=np.append(dat, np.nan*np.ones(n*d-len(dat))).reshape(n, d)
+
+				assert len(ymin)==n
+				assert np.allclose(ymin, np.nanmin(pad, axis=1))
+				assert np.allclose(ymax, np.nanmax(pad, axis=1))
+				assert np.allclose(ymean, np.nanmean(pad, axis=1))
+		finally:
+			shutil.rmtree(self.datapath, ignore_errors=True)
+
+	def runTestWindow(self, startSec, durationSec, nbins):
+		try:
+			dat=self.setupData([300001, 123457, 77777])-1.0
+
+			p=trajpyramid.trajpyramid(self.trajioObj(), minBins=16)
+			(t, ymin, ymax, ymean)=p.window(startSec, durationSec, nbins)
+
+			i0=int(startSec*100000)
+			seg=dat[i0:i0+int(durationSec*100000)]
+
+			assert len(t)==min(nbins, len(seg))
+			assert len(t)==len(ymin)==len(ymax)==len(ymean)
+			assert np.all(np.diff(t) > 0)
+			assert np.all(ymin <= ymax)
+
+			# the envelope contains the data in the window
+			if len(seg):
+				assert np.min(ymin) <= np.min(seg)+1e-4
+				assert np.max(ymax) >= np.max(seg)-1e-4
+		finally:
+			shutil.rmtree(self.datapath, ignore_errors=True)
+
+	def runTestWindowMean(self, n, nbins):
+		try:
+			dat=self.setupData([n])-1.0
+
+			p=trajpyramid.trajpyramid(self.trajioObj(), minDecimation=16, minBins=4)
+			(t, ymin, ymax, ymean)=p.window(0, n/100000., nbins)
+
+			# the mean of each bin is weighted by the number of data points, including a partial last bin
+			idx=np.append(np.round(t*100000).astype(int), n)
+			ref=[ np.mean(dat[i:j]) for (i, j) in zip(idx[:-1], idx[1:]) ]
+			assert np.allclose(ymean, ref, rtol=1e-5)
+		finally:
+			shutil.rmtree(self.datapath, ignore_errors=True)
+
+	def runTestCache(self):
+		try:
+			self.setupData([50000, 20000])
+
+			p=trajpyramid.trajpyramid(self.trajioObj())
+			mtime=os.path.getmtime(p.pyramidfname)
+
+			# the pyramid is read from the file
+			q=trajpyramid.trajpyramid(self.trajioObj())
+			assert q.pyramidfname==p.pyramidfname
+			assert os.path.getmtime(q.pyramidfname)==mtime
+			assert np.all(q.window(0, 1, 100)[1]==p.window(0, 1, 100)[1])
+
+			# a new pyramid is built when a data file changes
+			np.random.normal(100., 5., 1000).tofile(self.fnames[-1])
+			q=trajpyramid.trajpyramid(self.trajioObj())
+			assert q.length==51000
+			assert len(glob.glob(self.datapath+'/.mosaiccache/*.mtp'))==2
+		finally:
+			shutil.rmtree(self.datapath, ignore_errors=True)
+
+	def runTestNoBuild(self):
+		try:
+			self.setupData([50000])
+
+			# a pyramid is not built when build is False
+			try:
+				trajpyramid.trajpyramid(self.trajioObj(), build=False)
+				assert False
+			except trajpyramid.TrajPyramidError:
+				pass
+			assert len(glob.glob(self.datapath+'/.mosaiccache/*.mtp'))==0
+
+			# an existing pyramid is read
+			p=trajpyramid.trajpyramid(self.trajioObj())
+			q=trajpyramid.trajpyramid(self.trajioObj(), build=False)
+			assert q.pyramidfname==p.pyramidfname
+			assert np.all(q.window(0, 0.5, 100)[1]==p.window(0, 0.5, 100)[1])
+		finally:
+			shutil.rmtree(self.datapath, ignore_errors=True)
+
+	def runTestEnvelope(self, n, nbins):
+		dat=np.random.normal(100., 5., n)
+		(idx, ymin, ymax, ymean)=trajpyramid.envelope(dat, nbins)
+
+		assert len(idx)==min(n, nbins)
+		assert np.all(ymin <= ymean) and np.all(ymean <= ymax)
+		if n:
+			assert np.min(ymin)==np.min(dat)
+			assert np.max(ymax)==np.max(dat)
+			assert np.allclose(np.sum(ymean*np.diff(np.append(idx, n))), np.sum(dat))
+
+		(x, y)=trajpyramid.interleave(idx, ymin, ymax)
+		assert len(x)==len(y)==2*len(idx)
+
+	@raises(trajpyramid.TrajPyramidError)
+	def runTestError(self, minDecimation):
+		try:
+			self.setupData([1000])
+			trajpyramid.trajpyramid(self.trajioObj(), minDecimation=minDecimation)
+		finally:
+			shutil.rmtree(self.datapath, ignore_errors=True)
+
+class TrajPyramid_TestSuite(TrajPyramidTest):
+	def test_levels(self):
+		for lengths in [ [1000], [64], [300001, 123457, 77777], [10, 20000, 5] ]:
+			for minDecimation in [1, 16, 64]:
+				yield self.runTestLevels, lengths, minDecimation
+
+	def test_window(self):
+		for (startSec, durationSec) in [ (0, 10), (0.5, 1.0), (1.2345, 0.01), (4.9, 1.0), (6.0, 1.0) ]:
+			for nbins in [3, 100, 2000]:
+				yield self.runTestWindow, startSec, durationSec, nbins
+
+	def test_windowMean(self):
+		for n in [1000, 1033, 100001]:
+			for nbins in [2, 3, 7]:
+				yield self.runTestWindowMean, n, nbins
+
+	def test_cache(self):
+		yield self.runTestCache,
+
+	def test_noBuild(self):
+		yield self.runTestNoBuild,
+
+	def test_envelope(self):
+		for n in [0, 1, 99, 10000]:
+			for nbins in [1, 100, 5000]:
+				yield self.runTestEnvelope, n, nbins
+
+	def test_error(self):
+		for minDecimation in [0, 3, 100]:
+			yield self.runTestError, minDecimation
@@ -8,6 +8,8 @@
 	Created: 5/23/2013
 
 	ChangeLog:
+		10/18/26	AB	Return the data as an abfdata object that scales the data in chunks as it is read.
+		10/18/26	AB	Added abflength to read the number of samples from the file header.
 		7/28/14 	AB 	Included support for mode 5 (event driven fixed length)
 		5/23/13		AB	Initial version
 """
@@ -95,12 +97,7 @@ def abfload_gp(filename):
 	# gap free mode
 	m = data.size%nbchannel
 	if m != 0 : data = data[:-m]
-	data = data.reshape( (data.size/nbchannel, nbchannel)).astype('f')
-	if dt == dtype('i2'):
-		if version <2. :
-			reformat_integer_V1(data, nbchannel , header)
-		elif version >=2. :
-			reformat_integer_V2(data, nbchannel , header)                
+	data = abfdata(data.reshape( (data.size/nbchannel, nbchannel)), header)
 
 	# save the sampling frequency separately
 	if version <2. :
@@ -108,7 +105,57 @@ def abfload_gp(filename):
 	elif version >=2. :
 		freq = 1.e6/header['protocol']['fADCSequenceInterval']
 
-	return [freq, header['fFileSignature'], bandwidth, gain, data[:,0]]
+	return [freq, header['fFileSignature'], bandwidth, gain, data]
+
+class abfdata(object):
+	"""
+	the data of the first channel of an ABF file. The data remains memory mapped 
+	and is converted to float and scaled only when a slice of the data is read, 
+	which keeps the memory used by a large file proportional to the size of the slice.
+	"""
+	def __init__(self, data, header):
+		self.data = data
+		self.header = header
+
+	def __len__(self):
+		return len(self.data)
+
+	def __getitem__(self, key):
+		if isinstance(key, (int, long, integer)):
+			# an integer index returns a single data point
+			i = key + len(self) if key < 0 else key
+			if not 0 <= i < len(self):
+				raise IndexError("index {0} is out of bounds for ABF data with length {1}".format(key, len(self)))
+			return self[i:i+1][0]
+		elif not isinstance(key, slice):
+			raise TypeError("ABF data indices must be integers or slices, not {0}".format(type(key).__name__))
+
+		data = self.data[key].astype('f')
+		if self.data.dtype == dtype('i2'):
+			if self.header['fFileVersionNumber'] <2. :
+				reformat_integer_V1(data, self.data.shape[1] , self.header)
+			else :
+				reformat_integer_V2(data, self.data.shape[1] , self.header)
+
+		return data[:,0]
+
+	def __array__(self, dtype=None):
+		return asarray(self[:], dtype=dtype)
+
+def abflength(filename):
+	"""
+	return the number of samples per channel from the file header
+	"""
+	header = read_header(filename)
+
+	if header['fFileVersionNumber'] <2. :
+		nbchannel = header['nADCNumChannels']
+		totalsize = header['lActualAcqLength']
+	else :
+		nbchannel = header['sections']['ADCSection']['llNumEntries']
+		totalsize = header['sections']['DataSection']['llNumEntries']
+
+	return totalsize/nbchannel
 
 def read_header(filename):
 	"""
@@ -8,6 +8,9 @@
 	:License:	See LICENSE.TXT
 	:ChangeLog:
 	.. line-block::
+		10/18/26	AB	Save the amplifier settings in the trajectory cache, and do not log them when they are unknown.
+		10/18/26	AB	Keep the data memory mapped and scale it one chunk at a time.
+		10/18/26	AB	Read the length of a data file from the file header.
 		9/13/15 	AB 	Updated logging to use mosaicLogFormat class
 		3/28/15 	AB 	Updated file read code to match new metaTrajIO API.
 		5/23/13		AB	Initial version
@@ -25,6 +28,9 @@ class abfTrajIO(metaTrajIO.metaTrajIO):
 	"""
 		Read ABF1 and ABF2 file formats. Currently, only 
 		gap-free mode and single channel recordings are supported.
+		Data files are memory mapped and the raw data is converted to 
+		a current as each chunk of data is read, which allows large files 
+		to be processed without loading them into memory.
 
 		A typical settings section to read ABF files is shown below.
 
@@ -41,7 +47,14 @@ class abfTrajIO(metaTrajIO.metaTrajIO):
 			In addition to :class:`~mosaic.metaTrajIO.metaTrajIO` args,
 				None
 		"""
+	# The amplifier settings are read from the file header and are restored from the trajectory cache.
+	_cacheattrs=['bandwidth', 'gain']
+
 	def _init(self, **kwargs):
+		# The amplifier settings are unknown until a data file (or its cache) is read.
+		self.bandwidth=None
+		self.gain=None
+
 		self.abfLogger=mlog.mosaicLogging().getLogger(name=__name__)
 	
 	def readdata(self, fname):
@@ -55,7 +68,7 @@ class abfTrajIO(metaTrajIO.metaTrajIO):
 			
 			:Returns:
 
-				- An array object that holds raw (unscaled) data from `fname`
+				- An :class:`~mosaic.trajio.abf.abf.abfdata` object that holds memory mapped data from `fname`. Slices of the object return the scaled current.
 			
 			:Errors:
 
@@ -74,10 +87,18 @@ class abfTrajIO(metaTrajIO.metaTrajIO):
 
 		return dat
 
+	def _filelength(self, fname):
+		"""
+			Return the number of data points in a data file from the file header.
+		"""
+		return abf.abflength(fname)
+
 	def _formatsettings(self):
 		"""
 			Log settings strings
 		"""
-		self.abfLogger.info( 'Lowpass filter = {0} kHz'.format(self.bandwidth*0.001) )
-		self.abfLogger.info( 'Signal gain = {0}'.format(self.gain) )
+		if self.bandwidth is not None:
+			self.abfLogger.info( 'Lowpass filter = {0} kHz'.format(self.bandwidth*0.001) )
+		if self.gain is not None:
+			self.abfLogger.info( 'Signal gain = {0}'.format(self.gain) )
 
@@ -7,6 +7,8 @@ Binary file implementation of metaTrajIO. Read raw binary files with specified r
 	:License:	See LICENSE.TXT
 	:ChangeLog:
 	.. line-block::
+		10/18/26	AB	Ignore incomplete records at the end of a data file, which allows files to be read while they are written.
+		10/18/26	AB	Calculate the length of a data file from its size.
 		9/13/15 	AB 	Updated logging to use mosaicLogFormat class
 		3/28/15 	AB 	Updated file read code to match new metaTrajIO API.
 		1/27/15 	AB 	Memory map files on read.
@@ -18,6 +20,7 @@ Binary file implementation of metaTrajIO. Read raw binary files with specified r
 		4/22/13		AB	Initial version
 """
 import struct
+import os
 
 import mosaic.trajio.metaTrajIO as metaTrajIO
 import mosaic.utilities.mosaicLogging as mlog
@@ -188,6 +191,12 @@ class binTrajIO(metaTrajIO.metaTrajIO):
 		"""
 		return self.readBinaryFile(fname)
 		
+	def _filelength(self, fname):
+		"""
+			Return the number of data points in a data file from the file size.
+		"""
+		return (os.path.getsize(fname)-self.HeaderOffset)/np.dtype(self.ColumnTypes).itemsize
+
 	def _formatsettings(self):
 		"""
 			Log settings strings
@@ -198,7 +207,12 @@ class binTrajIO(metaTrajIO.metaTrajIO):
 		self.binLogger.info( '\t\tData type = \'{0}\''.format(self.IonicCurrentType) )
 
 	def readBinaryFile(self, fname):
-		return np.memmap(fname, dtype=self.ColumnTypes, mode='r', offset=self.HeaderOffset)[self.IonicCurrentColumn]
+		# Only complete records are read, which allows files that are being written to be read.
+		n=self._filelength(fname)
+		if n <= 0:
+			return np.zeros(0, dtype=self.ColumnTypes)[self.IonicCurrentColumn]
+
+		return np.memmap(fname, dtype=self.ColumnTypes, mode='r', offset=self.HeaderOffset, shape=(n,))[self.IonicCurrentColumn]
 		
 	def scaleData(self, data):
 		"""
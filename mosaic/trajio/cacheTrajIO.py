@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+"""
+	An implementation of metaTrajIO that reads MOSAIC trajectory cache files.
+
+	:Created: 	10/18/2026
+	:Author: 	Arvind Balijepalli <arvind.balijepalli@nist.gov>
+	:License:	See LICENSE.TXT
+	:ChangeLog:
+	.. line-block::
+		10/18/26	AB	Initial version
+"""
+import numpy as np
+
+import mosaic.trajio.metaTrajIO as metaTrajIO
+import mosaic.utilities.mosaicLogging as mlog
+import mosaic.utilities.trajcache as trajcache
+
+__all__ = ["cacheTrajIO"]
+
+class cacheTrajIO(metaTrajIO.metaTrajIO):
+	"""
+		Read trajectory cache files (see :mod:`~mosaic.utilities.trajcache`). Cache files hold the
+		scaled ionic current from a data file and are created by any TrajIO object when the ``cacheData``
+		option is set. The files are memory mapped, which allows them to be read at the bandwidth of the disk
+		without decoding the original data files. The sampling frequency is read from the cache file header.
+
+		A typical settings section to read cache files is shown below.
+
+		.. code-block:: javascript
+
+			"cacheTrajIO" : {
+					"filter"			: "*.mtc",
+					"start"				: 0.0,
+					"dcOffset"			: 0.0
+				}
+
+		:Parameters:
+			In addition to :class:`~mosaic.metaTrajIO.metaTrajIO` args,
+				None
+	"""
+	def _init(self, **kwargs):
+		self.fileFormat='cache'
+
+		self.cacheLogger=mlog.mosaicLogging().getLogger(name=__name__)
+
+	def readdata(self, fname):
+		"""
+			Return a memory map of the data in a cache file. Set a class
+			attribute Fs with the sampling frequency in Hz.
+
+			:Parameters:
+
+				- `fname` :  fileame to read
+
+			:Returns:
+
+				- An array object that holds data from `fname`
+
+			:Errors:
+
+				- `SamplingRateChangedError` : if the sampling rate for any data file differs from previous
+		"""
+		(data, hdr)=trajcache.readcache(fname)
+
+		if not hasattr(self, 'Fs'):
+			self.Fs=float(hdr["Fs"])
+		else:
+			if self.Fs!=float(hdr["Fs"]):
+				raise metaTrajIO.SamplingRateChangedError("The sampling rate in the data file '{0}' has changed.".format(fname))
+
+		self.sourceFile=hdr["source"]
+
+		return data
+
+	def _filelength(self, fname):
+		"""
+			Return the number of data points in a cache file from the file header.
+		"""
+		return trajcache.readheader(fname)["length"]
+
+	def _formatsettings(self):
+		"""
+			Log settings strings
+		"""
+		self.cacheLogger.info( '\t\tSource data file = \'{0}\''.format(getattr(self, 'sourceFile', 'N/A')) )
+
+	def scaleData(self, data):
+		"""
+			See :func:`mosaic.metaTrajIO.metaTrajIO.scaleData`.
+		"""
+		return np.asarray(data, dtype=np.float64)
@@ -7,10 +7,13 @@ Chimera VC100 concatenated file format implementation of metaTrajIO. Read concat
 	:License:	See LICENSE.TXT
 	:ChangeLog:
 	.. line-block::
+		10/18/26	AB	Ignore incomplete records at the end of a data file, which allows files to be read while they are written.
+		10/18/26	AB	Calculate the length of a data file from its size.
                 7/29/16         KB      Miscelleneous bugfixes
 		7/11/16		KB	Initial version
 """
 import struct
+import os
 
 import mosaic.trajio.metaTrajIO as metaTrajIO
 import mosaic.utilities.mosaicLogging as mlog
@@ -166,6 +169,12 @@ class chimeraTrajIO(metaTrajIO.metaTrajIO):
 		"""
 		return self.readBinaryFile(fname)
 		
+	def _filelength(self, fname):
+		"""
+			Return the number of data points in a data file from the file size.
+		"""
+		return (os.path.getsize(fname)-self.HeaderOffset)/np.dtype(self.ColumnTypes).itemsize
+
 	def _formatsettings(self):
 		"""
 			Populate `logObject` with settings strings for display
@@ -185,7 +194,12 @@ class chimeraTrajIO(metaTrajIO.metaTrajIO):
 		
 
 	def readBinaryFile(self, fname):
-		return np.memmap(fname, dtype=self.ColumnTypes, mode='r', offset=self.HeaderOffset)[self.IonicCurrentColumn]
+		# Only complete records are read, which allows files that are being written to be read.
+		n=self._filelength(fname)
+		if n <= 0:
+			return np.zeros(0, dtype=self.ColumnTypes)[self.IonicCurrentColumn]
+
+		return np.memmap(fname, dtype=self.ColumnTypes, mode='r', offset=self.HeaderOffset, shape=(n,))[self.IonicCurrentColumn]
 		
 	def scaleData(self, data):
 		"""
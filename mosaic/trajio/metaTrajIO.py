@@ -7,6 +7,21 @@
 	:License:	See LICENSE.TXT	
 	:ChangeLog:
 	.. line-block::
+		10/18/26	AB	Use the total decimation of the data filter to calculate the length of filtered data.
+		10/18/26	AB	Update the state of stateful decimators when a data filter is reset.
+		10/18/26	AB	Pass neighbouring data points to data filters that require them and reset stateful filters at the start of each data file.
+		10/18/26	AB	Added readPoints to read a window of data specified with data point indices.
+		10/18/26	AB	Added a tail mode that reads data files while they are being written (tailMode, tailPollSec, tailTimeoutSec).
+		10/18/26	AB	Store data in the pipe with the precision set by mosaic.DataPrecision.
+		10/18/26	AB	Calculate DataLengthSec from the length of each data file.
+		10/18/26	AB	Added readWindow to read data from any time window without changing the position of the trajectory.
+		10/18/26	AB	Added an optional trajectory cache that stores scaled data from each data file (cacheData, cacheDir, cacheDataType).
+						Attributes listed in _cacheattrs are stored in the cache and restored when it is read.
+		10/18/26	AB	Added an optional background thread that reads and scales upcoming data files (prefetchDepth, prefetchMaxMB).
+		10/18/26	AB	Store the data pipe as a list of chunks (chunkqueue) and subtract the DC offset once per chunk.
+		10/18/26	AB	Seek directly to the start point and within data files using the length of each file (seek, filelength).
+		10/18/26	AB	Added seekfile to reposition the trajectory and track the index of the first data point in each file.
+		10/18/26	AB	Track the total number of data points added to the pipe and keep a copy of the list of data files.
 		4/13/17 	AB 	Negative end values enable runnning an analysis on all available data.
 		7/29/16 	AB 	Add additional filtering when constructing a list of data files to process.
 		1/27/17 	AB 	Perform a lexical sort of input data files
@@ -27,13 +42,19 @@ import sys
 from abc import ABCMeta, abstractmethod
 import glob
 import os
+import threading
+import time
+from collections import OrderedDict
 import numpy as np
 
+import mosaic
 import mosaic.settings as settings
 from mosaic.utilities.resource_path import format_path, path_separator
 import mosaic.utilities.mosaicLogging as mlog
-from mosaic.utilities.mosaicLogFormat import _dprop, mosaic_property
+from mosaic.utilities.mosaicLogFormat import _d, _dprop, mosaic_property
 import mosaic.utilities.mosaicTiming as mtime
+import mosaic.utilities.chunkqueue as chunkqueue
+import mosaic.utilities.trajcache as trajcache
 
 __all__ = ["metaTrajIO", "IncompatibleArgumentsError", "IncorrectDataFormat", "EndOfFileError", "SamplingRateChangedError", "EmptyDataPipeError", "FileNotFoundError"]
 
@@ -60,6 +81,100 @@ ignorelist=[
 		"*.sqlite"
 	]
 
+class _filePrefetcher(threading.Thread):
+	"""
+		Read data files in a background thread. The thread loads the files passed to :func:`schedule` 
+		in order, up to `depth` files ahead, and pauses while the loaded data exceeds `maxBytes`. An 
+		exception raised while reading a file is raised again when the file is retrieved with :func:`popdata`.
+	"""
+	def __init__(self, loadfunc, depth, maxBytes):
+		super(_filePrefetcher, self).__init__()
+		self.daemon=True
+
+		self.loadfunc=loadfunc
+		self.depth=depth
+		self.maxBytes=maxBytes
+
+		self.scheduled=[]			# files that should be read ahead
+		self.pending=[]				# scheduled files that have not been read yet
+		self.loading=None			# file that is currently being read
+		self.ready=OrderedDict()	# data from files that were read
+
+		self.cond=threading.Condition()
+		self.stopFlag=False
+
+	def run(self):
+		while(1):
+			with self.cond:
+				while not self.stopFlag and (not self.pending or self._readybytes() >= self.maxBytes):
+					self.cond.wait(0.1)
+
+				if self.stopFlag:
+					return
+
+				fname=self.pending.pop(0)
+				self.loading=fname
+
+			try:
+				data=self.loadfunc(fname)
+			except BaseException, err:
+				data=err
+
+			with self.cond:
+				# discard the data if the file is no longer needed (e.g. after a seek)
+				if fname in self.scheduled:
+					self.ready[fname]=data
+				self.loading=None
+				self.cond.notify_all()
+
+	def schedule(self, fnames):
+		"""
+			Set the list of files to read ahead. Only the first `depth` files are read, and 
+			previously loaded data for files that are not in the list is discarded.
+		"""
+		with self.cond:
+			self.scheduled=list(fnames[:self.depth])
+			for f in self.ready.keys():
+				if f not in self.scheduled:
+					del self.ready[f]
+			self.pending=[ f for f in self.scheduled if f not in self.ready and f!=self.loading ]
+
+			self.cond.notify_all()
+
+	def popdata(self, fname):
+		"""
+			Return and remove the data read from `fname`. If the file is being read, wait until it is 
+			loaded. Return None if the file was not read ahead.
+		"""
+		with self.cond:
+			while fname==self.loading:
+				# Wait with a timeout, which allows a KeyboardInterrupt to be handled.
+				self.cond.wait(0.1)
+
+			data=self.ready.pop(fname, None)
+			if fname in self.pending:
+				self.pending.remove(fname)
+			if fname in self.scheduled:
+				self.scheduled.remove(fname)
+
+			self.cond.notify_all()
+
+		if isinstance(data, BaseException):
+			raise data
+
+		return data
+
+	def stop(self):
+		with self.cond:
+			self.stopFlag=True
+			self.ready.clear()
+			self.cond.notify_all()
+
+		self.join()
+
+	def _readybytes(self):
+		return sum( getattr(d, 'nbytes', 0) for d in self.ready.values() )
+
 class metaTrajIO(object):
 	"""
 			.. warning:: |metaclass|
@@ -81,6 +196,14 @@ class metaTrajIO(object):
 				- `end` : 			Data end point in seconds.
 				- `datafilter` :	Handle to the algorithm to use to filter the data. If no algorithm is specified, datafilter	is None and no filtering is performed.
 				- `dcOffset` :		Subtract a DC offset from the ionic current data.
+				- `prefetchDepth` :	Number of data files to read ahead in a background thread (default: 0, i.e. disabled). Upcoming data files are read and scaled while the current file is analyzed, which hides the time needed to open and decode files (e.g. on network drives).
+				- `prefetchMaxMB` :	Maximum size of the data read ahead in MB (default: 1024). Reading ahead pauses until the prefetched data falls below this limit.
+				- `cacheData` :		Store the scaled data from each data file in a trajectory cache file the first time it is read, and read the cache file in subsequent analyses (default: 0, i.e. disabled). A cache file is recreated if the data file or the settings of the TrajIO object change. See :mod:`~mosaic.utilities.trajcache`.
+				- `cacheDir` :		Directory that holds the trajectory cache files (default: '<data path>/.mosaiccache').
+				- `cacheDataType` :	Data type of the samples in the trajectory cache (default: 'f4').
+				- `tailMode` :		Analyze data while it is being acquired (default: 0, i.e. disabled). When all the available data is read, wait for data to be appended to the last data file or for new data files that match `filter` to appear in the data directory instead of ending the data stream. New data files are read in lexical order. When the data files are specified with `fnames`, only data appended to those files is read. The data format must allow partially written files to be read (e.g. binTrajIO). Binary formats (binTrajIO, chimeraTrajIO) memory map data files, so only the data appended to a file is read from disk. Other formats parse the entire data file each time data is appended to it, which makes the cost of tail mode grow quadratically with the length of a file that is written in small increments.
+				- `tailPollSec` :	Interval in seconds at which the data directory is checked for new data in tail mode (default: 1.0).
+				- `tailTimeoutSec` :	End the data stream if no new data is found for this many seconds in tail mode (default: 60.0).
 		
 
 			:Properties:
@@ -99,6 +222,10 @@ class metaTrajIO(object):
 	"""
 	__metaclass__=ABCMeta
 
+	# Attributes that are set by readdata and are saved in the trajectory cache, which allows them to
+	# be restored when data is read from the cache. Sub-classes extend this list with their own attributes.
+	_cacheattrs=[]
+
 	def __init__(self, **kwargs):
 		"""
 		"""
@@ -117,6 +244,9 @@ class metaTrajIO(object):
 		if not hasattr(self, 'filter'):
 			self.filter='*'
 
+		# The data directory that is checked for new data files in tail mode.
+		self.tailDirname=getattr(self, 'dirname', None)
+
 		if hasattr(self, 'fnames'):
 			# set fnames here.
 			self.dataFiles=self.fnames
@@ -137,6 +267,9 @@ class metaTrajIO(object):
 			except AttributeError, err:
 				raise IncompatibleArgumentsError(err)
 
+		# A copy of the complete list of data files, which allows the trajectory to be repositioned.
+		self.dataFileList=list(self.dataFiles)
+
 		# set additional meta-data
 		self.nFiles = len(self.dataFiles)
 		self.fileFormat='N/A'
@@ -158,6 +291,27 @@ class metaTrajIO(object):
 		else:
 			self.dcOffset=float(self.dcOffset)
 
+		# setup reading data files ahead in a background thread
+		self.prefetchDepth=int(getattr(self, 'prefetchDepth', 0))
+		self.prefetchMaxMB=float(getattr(self, 'prefetchMaxMB', 1024))
+		self.prefetchThread=None
+		self.rawDataScaled=False
+
+		# data type of the data pipe (see mosaic.DataPrecision)
+		self.dataType=np.dtype(mosaic.DataPrecision)
+
+		# setup the trajectory cache
+		self.cacheData=int(getattr(self, 'cacheData', 0))
+		self.cacheDir=getattr(self, 'cacheDir', format_path(self.datPath+'/.mosaiccache'))
+		self.cacheDataType=getattr(self, 'cacheDataType', 'f4')
+		self.cacheSettings=self._cachesettings(kwargs)
+
+		# setup reading data files while they are being written
+		self.tailMode=int(getattr(self, 'tailMode', 0))
+		self.tailPollSec=float(getattr(self, 'tailPollSec', 1.0))
+		self.tailTimeoutSec=float(getattr(self, 'tailTimeoutSec', 60.0))
+		self.tailFilename=None
+
 		# set start to 0 if it doesn't exist
 		if not hasattr(self, 'start'):
 			self.start=0.
@@ -165,13 +319,9 @@ class metaTrajIO(object):
 		# Track current filename
 		self.currentFilename=self.dataFiles[0]
 
-		# initialize an empty data pipeline
-		self.currDataPipe=np.array([])
-		# Track the start point of the queue. This var is used to manage
-		# deletion more effectively, by not deleting elements every time 
-		# popdata is called. Instead, data is actually deleted when the index
-		# exceeds 1 million data points.
-		self.currDataIdx=0
+		# initialize an empty data pipeline. Chunks of data are stored without copying them into 
+		# a single array, and data is only copied when a request spans multiple chunks.
+		self.currDataPipe=chunkqueue.chunkqueue(dtype=self.dataType)
 
 		# a var that determines if the end of the data stream is imminent.
 		self.nearEndOfData=0
@@ -186,12 +336,25 @@ class metaTrajIO(object):
 		# A list that holds the names of processed files.
 		self.processedFilenames=[]
 
+		# The total number of data points added to the pipe and the index of 
+		# the first data point of each file that was read.
+		self.pipeLength=0
+		self.fileStartIndex={}
+
+		# The number of data points in each file, which is calculated as needed.
+		self.fileLength={}
+		self.rawFileLength={}
+
+		# A separate filter object that is used to filter data returned by readWindow.
+		self.windowFilterObj=None
+
 		self.logger=mlog.mosaicLogging().getLogger(name=__name__)
 
 		# Call sub-class init
 		self._init(**kwargs)
 
 	def Stop(self):
+		self._stopprefetch()
 		trajTimer.PrintStatistics()
 		raise EmptyDataPipeError("End of data.")
 
@@ -257,8 +420,8 @@ class metaTrajIO(object):
 		"""
 			.. important:: |property|
 
-			Return the approximate length of data that will be processed. If the data are in multiple files,
-			this property assumes that each file contains an equal amount of data.
+			Return the length of data in seconds that will be processed, i.e. the data between the start and end 
+			points. The length is calculated from the number of data points in each data file (see :func:`fileIndex`).
 		"""
 		if not self.initPipe:
 			self._initPipe()
@@ -268,10 +431,11 @@ class metaTrajIO(object):
 	@trajTimer.FunctionTiming
 	def popdata(self, n):
 		"""
-			Pop data points from self.currDataPipe. This function uses recursion 
-			to automatically read data files when the queue length is shorter
-			than the requested data points. When all data files are read, an
-			EmptyDataPipeError is thrown.
+			Pop data points from self.currDataPipe. This function automatically 
+			reads data files when the queue length is shorter than the requested 
+			data points. When all data files are read, an EmptyDataPipeError is thrown.
+			The returned array may share memory with the data that was read from 
+			a file and should not be modified in place.
 
 			:Parameters:
 
@@ -296,43 +460,26 @@ class metaTrajIO(object):
 			if self.globalDataIndex > self.endIndex:
 				self.Stop()
 
-		try:
-			# Get the elements to return: index to (index+n)
-			t=self.currDataPipe[self.currDataIdx:self.currDataIdx+n]-self.dcOffset
-			
-			if len(t) < n: raise IndexError
+		# Read more data until the pipe holds n points or the end of the data stream is reached.
+		while len(self.currDataPipe) < n and not self.nearEndOfData:
+			self._appenddata()
 
-			# If the required data points were obtained, update the queue and global indices
-			self.currDataIdx+=n
-			self.globalDataIndex+=n
-			
-			# delete them from the pipe if the index exceeds 1 million
-			if self.currDataIdx>1000000:
-				self.currDataPipe=np.delete(self.currDataPipe, np.s_[:self.currDataIdx:], axis=0)
-				# reset the index
-				self.currDataIdx=0
-
-			# return the popped data
-			return t
-		except IndexError, err:
-			if self.nearEndOfData>0:
-				self.currDataIdx+=n
-				self.globalDataIndex+=n
-				
-				self.nearEndOfData+=1
+		t=self.currDataPipe.pop(n)
+		self.globalDataIndex+=n
 
-				return t
-			else:
-				self._appenddata()
-				return self.popdata(n)
+		# Fewer than n points are returned once at the end of the data stream.
+		if len(t) < n:
+			self.nearEndOfData+=1
+
+		return t
 				
 	def previewdata(self, n):
 		"""
 			Preview data points in self.currDataPipe. This function is identical in 
 			behavior to popdata, except it does not remove data point from the queue.
-			Like popdata, it uses recursion to automatically read data files 
-			when the queue length is shorter than the requested data points. When all 
-			data files are read, an	EmptyDataPipeError is thrown.
+			Like popdata, it automatically reads data files when the queue length is 
+			shorter than the requested data points. Unlike popdata, a copy of the data is 
+			returned.
 
 			:Parameters:
 
@@ -349,19 +496,192 @@ class metaTrajIO(object):
 		if not self.initPipe:
 			self._initPipe()
 
+		while len(self.currDataPipe) < n and not self.nearEndOfData:
+			self._appenddata()
+
+		return np.array(self.currDataPipe.peek(n))
+
+
+	def seek(self, index):
+		"""
+			Position the trajectory at a data point. The data file that contains the data point is located using 
+			the length of each data file (see :func:`filelength`), which does not require the data that precedes it
+			to be read. The next call to :func:`popdata` returns data starting at the requested position.
+
+			:Parameters:
+
+				- `index` : 	index of the data point from the start of the first data file. The index is identical to the
+								number of data points that would be returned by :func:`popdata` before reaching this position.
+								If `index` is past the end of the data, the next call to :func:`popdata` raises an `EmptyDataPipeError`.
+		"""
+		startIndex=0
+		for fname in self.dataFileList[:-1]:
+			n=self.filelength(fname)
+			if index < startIndex+n:
+				break
+			startIndex+=n
+		else:
+			fname=self.dataFileList[-1]
+
+		self.seekfile(fname, index-startIndex, startIndex=startIndex)
+
+	def filelength(self, fname, filtered=True):
+		"""
+			Return the number of data points in a data file. When a data filter is used, the number of data 
+			points after decimation is returned.
+
+			:Parameters:
+
+				- `fname` : 		name of the data file.
+				- `filtered` : 		if False, return the number of data points before the data filter is applied (default: True).
+		"""
+		if not filtered:
+			try:
+				return self.rawFileLength[fname]
+			except KeyError:
+				self.rawFileLength[fname]=self._filelength(fname)
+				return self.rawFileLength[fname]
+
 		try:
-			# Get the elements to return
-			t=self.currDataPipe[self.currDataIdx:self.currDataIdx+n]-self.dcOffset
-			if len(t) < n: raise IndexError 
-				
-			return t
-		except IndexError, err:
-			if self.nearEndOfData>0:
-				return t
-			else:
-				self._appenddata()
-				return self.previewdata(n)
+			return self.fileLength[fname]
+		except KeyError:
+			n=self.filelength(fname, filtered=False)
+
+			# Data are filtered and decimated in chunks of CHUNKSIZE points.
+			d=self._decimation()
+			if d > 1:
+				m=self._chunklength()
+				n=(n/self.CHUNKSIZE)*m+int(np.ceil((n%self.CHUNKSIZE)/float(d)))
+
+			self.fileLength[fname]=n
+
+			return n
+
+	def fileIndex(self, filtered=True):
+		"""
+			Return an index of the data files as a list of tuples that hold the name of each data file, the index 
+			of its first data point in the data set and the number of data points in the file (see :func:`filelength`).
+
+			:Parameters:
+
+				- `filtered` : 		if False, the index is calculated from the number of data points before the data filter is applied (default: True).
+		"""
+		idx=[]
+		startIndex=0
+		for fname in self.dataFileList:
+			n=self.filelength(fname, filtered=filtered)
+			idx.append((fname, startIndex, n))
+			startIndex+=n
+
+		return idx
+
+	def readWindow(self, startSec, durationSec, filtered=True):
+		"""
+			Return the data in a time window. Only the data files that overlap the window are read, which are 
+			located with :func:`fileIndex`. The data are read independently of the data pipeline: the position of 
+			the trajectory and the data returned by :func:`popdata` are unchanged. The data are scaled and the DC 
+			offset is subtracted. When a data filter is used, the data are filtered in the same chunks as 
+			:func:`popdata` with a separate filter object.
+
+			:Parameters:
+
+				- `startSec` : 		start of the window in seconds from the start of the first data file.
+				- `durationSec` : 	length of the window in seconds.
+				- `filtered` : 		if False, return data before the data filter is applied. Data are returned at the original sampling frequency (default: True).
+
+			:Returns:
+
+				- Numpy array with the requested data. The array is shorter than the window if the window extends past the end of the data.
+		"""
+		if not self.initPipe:
+			self._initPipe()
+
+		if filtered and self.dataFilter:
+			Fs=self.dataFilterObj.filterFs
+		else:
+			Fs=self.Fs
+
+		return self.readPoints(int(startSec*Fs), int(durationSec*Fs), filtered=filtered)
+
+	def readPoints(self, start, n, filtered=True):
+		"""
+			Return `n` data points starting at the data point `start`. This function is identical to 
+			:func:`readWindow`, except the window is specified with data point indices.
+
+			:Parameters:
+
+				- `start` : 		index of the first data point from the start of the first data file (see :func:`seek`).
+				- `n` : 			number of data points.
+				- `filtered` : 		if False, return data before the data filter is applied (default: True).
+
+			:Returns:
+
+				- Numpy array with the requested data. The array is shorter than `n` if the window extends past the end of the data.
+		"""
+		if not self.initPipe:
+			self._initPipe()
+
+		filtered=filtered and self.dataFilter
+
+		start=max(int(start), 0)
+		end=start+max(int(n), 0)
+
+		dat=[]
+		for (fname, fstart, nf) in self.fileIndex(filtered=filtered):
+			if fstart >= end:
+				break
+			if fstart+nf > start:
+				dat.append(self._readfilewindow(fname, max(start-fstart, 0), min(end-fstart, nf), filtered))
+
+		if not dat:
+			return np.array([], dtype=self.dataType)
+
+		return np.concatenate(dat)
+
+	def seekfile(self, fname, offset, startIndex=0):
+		"""
+			Position the trajectory at a data point within a data file. Data files that precede `fname` 
+			are skipped. Reading `fname` starts at the chunk that contains `offset`, and only the data points 
+			in that chunk that precede `offset` are discarded. The next call to :func:`popdata` returns data 
+			starting at the requested position. The list of processed files is reset to `fname`.
+
+			:Parameters:
+
+				- `fname` : 		name of the data file. `fname` must be one of the files passed to the class at initialization.
+				- `offset` : 		number of data points from the start of `fname`.
+				- `startIndex` : 	index of the first data point of `fname` in the complete data set. This allows the index
+									of data points (e.g. used by the `end` argument) to remain consistent with an analysis 
+									that read all the data files (default: 0).
+
+			:Errors:
+
+				- `FileNotFoundError` : if `fname` is not in the list of data files.
+		"""
+		if fname not in self.dataFileList:
+			raise FileNotFoundError("{0} is not in the list of data files.".format(fname))
+
+		if not self.initPipe:
+			self._initPipe()
+
+		# reset the data pipe
+		self.dataFiles=self.dataFileList[self.dataFileList.index(fname)+1:]
+		self.currDataPipe.clear()
+		self.nearEndOfData=0
+		self.processedFilenames=[]
 
+		# Start reading the file at a chunk boundary, which ensures the data are filtered
+		# identically to a trajectory that was read from the start.
+		m=self._chunklength()
+		nchunks=int(offset/m)
+
+		self.pipeLength=startIndex
+		self._openfile(fname, nchunks*self.CHUNKSIZE)
+
+		self.globalDataIndex=startIndex+nchunks*m
+		self.pipeLength=self.globalDataIndex
+
+		self._appenddata()
+		self.popdata(int(offset%m))
 
 	def formatsettings(self):
 		"""
@@ -398,23 +718,238 @@ class metaTrajIO(object):
 			.. seealso:: See implementations of metaTrajIO for specfic documentation.
 		"""
 		try:			
-			data=self.scaleData(self.dataGenerator.next())
+			(data, pre, post)=self.dataGenerator.next()
+			if not self.rawDataScaled:
+				data=self.scaleData(data)
+			data=np.asarray(data, dtype=self.dataType)
 
 			if self.dataFilter:
-				self.dataFilterObj.filterData(data, self.Fs)
-				self.currDataPipe=np.hstack((self.currDataPipe, self.dataFilterObj.filteredData ))
-			else:
-				self.currDataPipe=np.hstack((self.currDataPipe, data ))
+				self.dataFilterObj.filterChunk(data, self.Fs, pre, post)
+				data=np.asarray(self.dataFilterObj.filteredData, dtype=self.dataType)
+
+			if self.dcOffset:
+				data=data-self.dataType.type(self.dcOffset)
+
+			self.currDataPipe.append(data)
+			self.pipeLength+=len(data)
 
 		except (StopIteration, AttributeError):
+			# In tail mode, continue reading the current data file if more data was written to it.
+			if self.tailMode and self.dataGenerator and self._taildata():
+				self._appenddata()
+				return
+
 			# Read a new data file to get more data
 			fname=self.popfnames()
 
 			if fname:
-				self.processedFilenames.extend([[fname, self.fileFormat, os.path.getmtime(fname)]])
-				self.rawData=self.readdata( fname )
-				self.dataGenerator=self._createGenerator()
+				self._openfile(fname)
 				self._appenddata()
+
+	def _openfile(self, fname, offset=0):
+		"""
+			Read a data file and setup a generator that returns chunks of data starting at 
+			the raw data point `offset`.
+		"""
+		self.processedFilenames.extend([[fname, self.fileFormat, os.path.getmtime(fname)]])
+		self.fileStartIndex[fname]=self.pipeLength
+
+		# Use data that was read and scaled in the background if available.
+		data=None
+		if self.prefetchDepth > 0:
+			if not self.prefetchThread:
+				self.prefetchThread=_filePrefetcher(self._prefetchfile, self.prefetchDepth, int(self.prefetchMaxMB*2**20))
+				self.prefetchThread.start()
+
+			data=self.prefetchThread.popdata(fname)
+
+		if data is None:
+			(self.rawData, self.rawDataScaled)=self._readfile(fname)
+		else:
+			self.rawData=data
+			self.rawDataScaled=True
+
+		if self.dataFilter:
+			self._resetfilter(self.dataFilterObj, self.rawData, self.rawDataScaled, offset)
+
+		self.dataGenerator=self._createGenerator(offset)
+		self.tailFilename=fname
+
+		if self.prefetchThread:
+			self.prefetchThread.schedule(self.dataFiles)
+
+	def _readfile(self, fname):
+		"""
+			Read a data file. Return the data and True if the data is already scaled. When the 
+			trajectory cache is enabled, scaled data is read from the cache file, which is 
+			created the first time a data file is read.
+		"""
+		if not self.cacheData:
+			return (self.readdata( fname ), False)
+
+		cachefname=trajcache.cachefilename(self.cacheDir, fname)
+
+		if not trajcache.validcache(cachefname, fname, self.cacheSettings):
+			data=self.readdata( fname )
+			try:
+				self._writecache(cachefname, fname, data)
+			except (IOError, OSError, trajcache.TrajCacheError), err:
+				self.logger.warning("WARNING: Unable to write the trajectory cache for '{0}': {1}".format(fname, err))
+				return (data, False)
+
+		(data, hdr)=trajcache.readcache(cachefname)
+
+		# The sampling frequency is not set by readdata when data is read from the cache.
+		if not hasattr(self, 'Fs'):
+			self.Fs=hdr["Fs"]
+		elif float(self.Fs)!=float(hdr["Fs"]):
+			raise SamplingRateChangedError("The sampling rate in the data file '{0}' has changed.".format(fname))
+
+		for (k, v) in hdr.get("attrs", {}).iteritems():
+			if k in self._cacheattrs:
+				setattr(self, k, v)
+
+		return (data, True)
+
+	def _writecache(self, cachefname, fname, data):
+		"""
+			Scale the data read from a data file in chunks and write it to a cache file.
+		"""
+		w=trajcache.cachewriter(
+				cachefname, 
+				fname, 
+				self.Fs, 
+				self.cacheSettings, 
+				dtype=self.cacheDataType, 
+				attrs=dict( (k, getattr(self, k)) for k in self._cacheattrs if hasattr(self, k) )
+			)
+		try:
+			for i in xrange(0, len(data), self.CHUNKSIZE):
+				w.write(self.scaleData(data[i:i+self.CHUNKSIZE]))
+		except BaseException:
+			w.abort()
+			raise
+
+		w.close()
+
+	def _cachesettings(self, kwargs):
+		"""
+			Return a string that identifies the settings used to scale the data. Settings that 
+			are applied after the data is scaled do not invalidate the trajectory cache.
+		"""
+		ignore=[ 
+			'dirname', 'fnames', 'nfiles', 'filter', 'start', 'end', 'dcOffset', 'datafilter', 
+			'prefetchDepth', 'prefetchMaxMB', 'cacheData', 'cacheDir', 'cacheDataType',
+			'tailMode', 'tailPollSec', 'tailTimeoutSec'
+		]
+
+		return "{0}: {1}".format(
+				type(self).__name__, 
+				sorted([ (k, str(v)) for (k,v) in kwargs.iteritems() if k not in ignore ])
+			)
+
+	def _readfilewindow(self, fname, start, end, filtered):
+		"""
+			Return data points start to end from a single data file.
+		"""
+		(data, scaled)=self._readfile(fname)
+
+		if not filtered:
+			dat=data[start:end]
+			if not scaled:
+				dat=self.scaleData(dat)
+		else:
+			if not self.windowFilterObj:
+				self.windowFilterObj=self._setupDataFilter()
+
+			# Filter the chunks that contain the requested data
+			m=self._chunklength()
+			c0=start/m
+			c1=int(np.ceil(end/float(m)))
+
+			self._resetfilter(self.windowFilterObj, data, scaled, c0*self.CHUNKSIZE)
+			L=self.windowFilterObj.overlap(self.Fs)
+
+			dat=[]
+			for c in range(c0, c1):
+				(d, pre, post)=self._chunkwithcontext(data, c*self.CHUNKSIZE, L)
+				if not scaled:
+					d=self.scaleData(d)
+
+				self.windowFilterObj.filterChunk(np.asarray(d, dtype=self.dataType), self.Fs, pre, post)
+				dat.append(self.windowFilterObj.filteredData)
+
+			dat=np.concatenate(dat)[start-c0*m:end-c0*m]
+
+		return np.asarray(dat, dtype=self.dataType)-self.dataType.type(self.dcOffset)
+
+	def _prefetchfile(self, fname):
+		"""
+			Read and scale a data file. Called from the prefetch thread. Data that is
+			read lazily (e.g. memory mapped files) is loaded into memory.
+		"""
+		(data, scaled)=self._readfile(fname)
+
+		if scaled:
+			return np.array(data, dtype=self.dataType)
+		else:
+			return np.asarray(self.scaleData(data), dtype=self.dataType)
+
+	def _taildata(self):
+		"""
+			Wait for new data in tail mode. Return True if data was appended to the current data file, 
+			which is then read from the first new data point. Data files that appear in the data directory 
+			are added to the list of data files, and False is returned when data files are available or 
+			when no new data is found within tailTimeoutSec.
+
+			The data file is read again with readdata. Formats that memory map data files (binTrajIO, 
+			chimeraTrajIO) only map the file again, and the data generator reads the data from the first 
+			new data point. Other formats parse the entire file.
+		"""
+		fname=self.tailFilename
+		t0=time.time()
+
+		while(1):
+			n=self._filelength(fname)
+			if n > len(self.rawData):
+				self.logger.debug(_d("Read {0} new data points from {1}", n-len(self.rawData), fname))
+
+				offset=len(self.rawData)
+
+				# The length of the data file has changed.
+				self.rawFileLength.pop(fname, None)
+				self.fileLength.pop(fname, None)
+
+				self.rawData=self.readdata(fname)
+				self.rawDataScaled=False
+				self.dataGenerator=self._createGenerator(offset)
+
+				return True
+
+			if self.dataFiles:
+				return False
+
+			if self.tailDirname:
+				newfiles=sorted(set(self._buildFileList(self.tailDirname, self.filter))-set(self.dataFileList))
+				if newfiles:
+					self.logger.debug(_d("Found new data files {0}", newfiles))
+
+					self.dataFiles.extend(newfiles)
+					self.dataFileList.extend(newfiles)
+					self.nFiles+=len(newfiles)
+
+					return False
+
+			if time.time()-t0 >= self.tailTimeoutSec:
+				self.logger.debug(_d("No new data found in {0} s.", self.tailTimeoutSec))
+				return False
+
+			time.sleep(self.tailPollSec)
+
+	def _stopprefetch(self):
+		if self.prefetchThread:
+			self.prefetchThread.stop()
+			self.prefetchThread=None
 		
 	def scaleData(self, data):
 		"""
@@ -445,6 +980,22 @@ class metaTrajIO(object):
 		"""
 		return data
 
+	def _filelength(self, fname):
+		"""
+			.. important:: |interfacemethod|
+
+			Return the number of raw data points in a single data file.
+
+			:Parameters:
+
+				- `fname` :  fileame to read
+
+			:Default Behavior:
+
+				- If not implemented by a sub-class, the file is read with :func:`~mosaic.metaTrajIO.metaTrajIO.readdata`. Sub-classes should implement this function if the length of a file can be determined more efficiently, for example from the file header or the file size.
+		"""
+		return len(self.readdata(fname))
+
 	@abstractmethod
 	def _formatsettings(self):
 		"""
@@ -520,24 +1071,22 @@ class metaTrajIO(object):
 		
 		self.initPipe=True
 
-		self.datLenSec=(len(self.rawData)/float(self.Fs)*(len(self.dataFiles)+1))
+		dataEndSec=sum([ self.filelength(f, filtered=False) for f in self.dataFileList ])/float(self.Fs)
 
 		# Set the end point
 		if hasattr(self, 'end'):
 			if self.end > 0:			# treat a negative end value the same as not setting end.
 				self.endIndex=int((self.end-1)*self.Fs)
-				self.datLenSec=self.end-self.start
+				dataEndSec=min(self.end, dataEndSec)
+
+		self.datLenSec=max(dataEndSec-self.start, 0)
 			
 			
 		# Drop the first 'n' points specified by the start keyword
 		if hasattr(self, 'start'):
 			self.startIndex=int(self.start*self.Fs)
 			if self.startIndex > 0:
-				nBlks=int((self.startIndex-1)/self.CHUNKSIZE)
-				for i in range(nBlks):
-					self.popdata(self.CHUNKSIZE)
-
-				self.popdata( int((self.startIndex-1)%self.CHUNKSIZE) )
+				self.seek(self.startIndex-1)
 
 	def _setupDataFilter(self):
 		filtsettings=settings.settings( self.datPath ).getSettings(self.datafilter.__name__)
@@ -548,12 +1097,53 @@ class metaTrajIO(object):
 
 		return self.datafilter(**filtsettings)
 
-	def _createGenerator(self):
-		i=0
+	def _decimation(self):
+		if self.dataFilter:
+			return self.dataFilterObj.totalDecimation
+		else:
+			return 1
+
+	def _chunklength(self):
+		# The number of data points in a full chunk after decimation.
+		return int(np.ceil(self.CHUNKSIZE/float(self._decimation())))
+
+	def _createGenerator(self, offset=0):
+		# Each chunk is returned with the neighbouring data points required by the data filter.
+		if self.dataFilter:
+			L=self.dataFilterObj.overlap(self.Fs)
+		else:
+			L=0
+
+		i=offset
 		while i<len(self.rawData):
-			yield self.rawData[i:i+self.CHUNKSIZE]
+			yield self._chunkwithcontext(self.rawData, i, L)
 			i+=self.CHUNKSIZE
 
+	def _chunkwithcontext(self, data, i, L):
+		# Return the chunk of data that starts at i with up to L data points on either side, 
+		# and the number of data points that precede and follow the chunk.
+		j=min(i+self.CHUNKSIZE, len(data))
+		pre=min(L, i)
+		post=min(L, len(data)-j)
+
+		return (data[i-pre:j+post], pre, post)
+
+	def _resetfilter(self, filterObj, data, scaled, offset):
+		# Reset a data filter before filtering data starting at offset. A stateful filter 
+		# is run on the chunk of data that precedes offset to approximate the state of a 
+		# filter that processed the data file from the start.
+		filterObj.reset()
+
+		if filterObj.stateful and offset > 0:
+			d=data[max(offset-self.CHUNKSIZE, 0):offset]
+			if not scaled:
+				d=self.scaleData(d)
+
+			filterObj.filterData(np.asarray(d, dtype=self.dataType), self.Fs)
+
+			# the filtered data is decimated when it is read
+			filterObj.filteredData
+
 	def _buildFileList(self, dirname, filter):
 		flist=set(glob.glob(format_path(dirname+"/"+filter)))
 		for ignorefilter in ignorelist:
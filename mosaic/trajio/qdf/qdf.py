@@ -8,6 +8,8 @@
 	:License:	See LICENSE.TXT
 	:ChangeLog:
 	.. line-block::
+		10/18/26	AB	Added qdfdata, which memory maps the raw samples and converts them to current in chunks.
+		10/18/26	AB	Read node data on first access and added DataLength, which only reads the file header.
 		9/25/16 	AB 	Code cleanup and bug fixes.
 		9/22/16 	AB 	Fixed a QUBTree parsing bug and added data integrity checks.
 		9/22/16		AB 	Update scaling when the time-series is stored as current.
@@ -38,10 +40,26 @@ class qnode(object):
 		self.childOffset=None
 		self.siblingOffset=None
 		self.nameLen=None
-		self.data=None
+		self.dataCode=None
+		self._data=None
 
 		self._parsenode()
 
+	@property
+	def data(self):
+		# Node data are read from the file on first access.
+		if self.dataCount and self._data is None:
+			self.fhnd.seek(self.dataPos)
+			self._data=np.fromfile(self.fhnd, self.dataCode, self.dataCount)
+
+		return self._data
+
+	def memmap(self):
+		"""
+			Return the node data as a read-only memory mapped array.
+		"""
+		return np.memmap(self.fhnd.name, self.dataCode, 'r', offset=self.dataPos, shape=(self.dataCount,))
+
 	def _parsenodeheader(self):
 		self.fhnd.seek(self.offset)
 
@@ -64,14 +82,10 @@ class qnode(object):
 		self.nodeName=self.fhnd.read(self.nameLen)
 
 		if self.dataCount:
-			self.fhnd.seek(self.dataPos)
-
 			try:
-				code=qubDataTypes[self.dataType<<self.dataSize]
+				self.dataCode=qubDataTypes[self.dataType<<self.dataSize]
 			except KeyError:
 				QDFError("The specified data type ({0}) and size ({1}) are incompatible.".format(self.dataType, self.dataSize))
-			
-			self.data=np.fromfile(self.fhnd, code, self.dataCount)
 
 class qdict(dict):
 	def __getitem__(self, key):
@@ -130,6 +144,55 @@ class qtree(dict):
 class QDFError(Exception):
 	pass
 
+class qdfdata(object):
+	"""
+		The current time-series in a QDF file. The raw samples remain memory mapped and are 
+		converted to current only when a slice of the data is read. When the time-series is 
+		stored as a voltage, a slice also reads the sample that precedes it, which keeps the 
+		derivative term identical to a conversion of the complete time-series.
+	"""
+	def __init__(self, raw, scale, iscale, Rfb=None, Cfb=None, dt=None):
+		self.raw=raw
+		self.scale=scale
+		self.iscale=iscale
+
+		self.Rfb=Rfb
+		self.Cfb=Cfb
+		self.dt=dt
+
+		# the current is calculated from a voltage if the amplifier feedback is set.
+		self.voltage=Rfb is not None
+
+	def __len__(self):
+		if self.voltage:
+			return max(len(self.raw)-1, 0)
+		else:
+			return len(self.raw)
+
+	def __getitem__(self, key):
+		if isinstance(key, (int, long, np.integer)):
+			# an integer index returns a single data point
+			i=key+len(self) if key < 0 else key
+			if not 0 <= i < len(self):
+				raise IndexError("index {0} is out of bounds for QDF data with length {1}".format(key, len(self)))
+			return self[i:i+1][0]
+		elif not isinstance(key, slice):
+			raise TypeError("QDF data indices must be integers or slices, not {0}".format(type(key).__name__))
+
+		(start, stop, step)=key.indices(len(self))
+		if step != 1:
+			raise QDFError("Slices of QDF data must be contiguous.")
+		stop=max(start, stop)
+
+		if self.voltage:
+			data=self.raw[start:stop+1]/self.scale
+			return (((-1.0 * data[1:]/self.Rfb) - (self.Cfb * np.diff(data)/self.dt)) * self.iscale)
+		else:
+			return (self.raw[start:stop]/self.scale) * self.iscale
+
+	def __array__(self, dtype=None):
+		return np.asarray(self[:], dtype=dtype)
+
 class QDF(object):
 	def __init__(self, filename, Rfb, Cfb):
 		self.filename=filename
@@ -155,23 +218,43 @@ class QDF(object):
 			raise QDFError("Incorrect magic string found: {0}".format(magic))
 
 
-	def VoltageToCurrent(self, iscale=1e12):
+	def VoltageToCurrent(self, iscale=1e12, lazy=False):
 		"""
-			Convert voltage to current in pA (default iscale=1e12)
+			Convert voltage to current in pA (default iscale=1e12). If lazy is True, return a 
+			qdfdata object that converts the data as it is read.
 		"""
 		qt=self.qdftree
 
+		if lazy:
+			return qdfdata(self.RawData(), qt["DataFile"]["Scaling"], iscale, Rfb=self.Rfb, Cfb=self.Cfb, dt=qt["DataFile"]["Sampling"])
+
 		dt=qt["DataFile"]["Sampling"]
 		scale=qt["DataFile"]["Scaling"]
 		data=qt["DataFile"]["Segments"]["Segment"]["Channels"]/scale
 
 		return (((-1.0 * data[1:]/self.Rfb) - (self.Cfb * np.diff(data)/dt)) * iscale)
 
-	def Current(self, iscale=1):
+	def DataLength(self):
 		"""
-			Return current in pA (default, iscale=1)
+			Return the number of samples in the time-series without reading the data.
+		"""
+		return dict.__getitem__(self.qdftree["DataFile"]["Segments"]["Segment"], "Channels").dataCount
+
+	def RawData(self):
+		"""
+			Return the raw samples of the time-series as a memory mapped array.
+		"""
+		return dict.__getitem__(self.qdftree["DataFile"]["Segments"]["Segment"], "Channels").memmap()
+
+	def Current(self, iscale=1, lazy=False):
+		"""
+			Return current in pA (default, iscale=1). If lazy is True, return a qdfdata
+			object that scales the data as it is read.
 		"""
 		qt=self.qdftree
+
+		if lazy:
+			return qdfdata(self.RawData(), qt["DataFile"]["Scaling"], iscale)
 		
 		scale=qt["DataFile"]["Scaling"]
 		data=qt["DataFile"]["Segments"]["Segment"]["Channels"]
@@ -8,6 +8,8 @@
 	:License:	See LICENSE.TXT
 	:ChangeLog:
 	.. line-block::
+		10/18/26	AB	Memory map the raw data and convert it to current one chunk at a time.
+		10/18/26	AB	Read the length of a data file from the file header.
 		9/13/15 	AB 	Updated logging to use mosaicLogFormat class
 		3/28/15 	AB 	Updated file read code to match new metaTrajIO API.
 		7/18/12		AB	Initial version
@@ -81,7 +83,7 @@ class qdfTrajIO(metaTrajIO.metaTrajIO):
 			
 			:Returns:
 
-				None
+				- A :class:`~mosaic.trajio.qdf.qdf.qdfdata` object that holds memory mapped data from `fname`. Slices of the object return the current in pA.
 			
 			:Errors:
 
@@ -89,9 +91,9 @@ class qdfTrajIO(metaTrajIO.metaTrajIO):
 		"""
 		qdfdat=qdf.QDF(fname, float(self.Rfb), float(self.Cfb))
 		if self.format=='V':
-			q=qdfdat.VoltageToCurrent()
+			q=qdfdat.VoltageToCurrent(lazy=True)
 		else:
-			q=qdfdat.Current()
+			q=qdfdat.Current(lazy=True)
 
 		fs=qdfdat.qdftree["DataFile"]["Sampling"]
 		# set the sampling frequency in Hz.
@@ -103,7 +105,24 @@ class qdfTrajIO(metaTrajIO.metaTrajIO):
 			if self.Fs!=int(1./fs):
 				raise metaTrajIO.SamplingRateChangedError("The sampling rate in the data file '{0}' has changed.".format(fname))
 
-		return np.array(q, dtype=np.float64)
+		return q
+
+	def scaleData(self, data):
+		"""
+			See :func:`mosaic.metaTrajIO.metaTrajIO.scaleData`.
+		"""
+		return np.asarray(data, dtype=np.float64)
+
+	def _filelength(self, fname):
+		"""
+			Return the number of data points in a data file from the file header. When the time-series is
+			stored as a voltage, the current calculated from it has one less point.
+		"""
+		n=qdf.QDF(fname, float(self.Rfb), float(self.Cfb)).DataLength()
+		if self.format=='V':
+			return n-1
+		else:
+			return n
 
 	def _formatsettings(self):
 		"""
@@ -7,6 +7,9 @@
 	:License:	See LICENSE.TXT
 	:ChangeLog:
 	.. line-block::
+		10/18/26	AB	Count lines in blocks of bytes to calculate the length of a data file.
+		10/18/26	AB	Parse files in chunks with the pandas C parser into an array allocated from the length of the data file.
+		10/18/26	AB	Count the lines in a data file to calculate its length without parsing it.
 		11/30/15 	AB 	Assumes ``timeCol`` is specified in seconds.
 		11/30/15 	AB 	Added a new keyword ``scale`` to allow scaling TSV data.
 		3/28/15 	AB 	Updated file read code to match new metaTrajIO API.
@@ -16,9 +19,9 @@
 
 """
 import numpy as np 
+import pandas as pd
 
 import mosaic.trajio.metaTrajIO as metaTrajIO
-import csv
 
 __all__ = ["tsvTrajIO"]
 
@@ -70,6 +73,9 @@ class tsvTrajIO(metaTrajIO.metaTrajIO):
 		# additional meta data
 		self.fileFormat='tsv'
 
+		# number of rows parsed at a time
+		self.tsvChunkRows=100*self.CHUNKSIZE
+
 	def readdata(self, fname):
 		"""
 			Read a single TSV file and return raw (unscaled) data contained within it.
@@ -89,6 +95,34 @@ class tsvTrajIO(metaTrajIO.metaTrajIO):
 		"""
 		return self.__readtsv(fname)
 
+	def _filelength(self, fname):
+		"""
+			Return the number of data points in a data file by counting the non-empty lines in the file. The file 
+			is read in blocks of bytes, which is considerably faster than parsing it.
+		"""
+		n=0
+		prev=10		# treat the start of the file as the end of an empty line
+		with open(fname, 'rb') as f:
+			while(1):
+				b=f.read(2**22)
+				if not b:
+					break
+
+				a=np.frombuffer(b, dtype=np.uint8)
+				a=a[a!=13]		# ignore carriage returns
+				if not len(a):
+					continue
+
+				# a line ends at each newline that does not follow another newline
+				n+=np.count_nonzero( (a==10) & (np.hstack(([prev], a[:-1]))!=10) )
+				prev=a[-1]
+
+		# the last line may not end with a newline
+		if prev!=10:
+			n+=1
+
+		return n-int(self.hasHeaders)
+
 	def _formatsettings(self):
 		"""
 			Log settings strings
@@ -97,37 +131,63 @@ class tsvTrajIO(metaTrajIO.metaTrajIO):
 
 	def __readtsv(self, fname):
 		"""
+			Parse the file in chunks of tsvChunkRows rows with the pandas C parser. Only the 
+			ionic current column of each chunk is retained, which limits the text held in 
+			memory to a single chunk. The chunks are copied into an array allocated from the
+			number of lines in the file (see :func:`_filelength`). Like other TrajIO formats,
+			the array holds the ionic current of the entire file.
 		"""
-		r1=csv.reader(open(fname,'rU'), delimiter=self.separator)
-
-		# remove the file headers
-		if self.hasHeaders: r1.next()
-
 		# If the user explicitly set the sampling frequency,
-		# self.currCol is set to 0 (current in pA). Stuff data 
-		# into a numpy array
+		# self.currCol is set to 0 (current in pA). Otherwise, 
+		# read the time column to calculate the sampling frequency.
 		if self.userSetFs:
-			return np.array( [ float(row[self.currCol]) for row in r1 ], dtype=np.float64)
+			cols=[self.currCol]
 		else:
-			# Calculate the sampling frequency from the first two points
-			p1=r1.next()
-			p2=r1.next()
-
-			dt=float(p2[self.timeCol])-float(p1[self.timeCol])
-
-			if not hasattr(self, 'Fs'):
-				self.Fs=1./dt
-			# else check if it s the same as before
-			else:
-				if self.Fs!=1./dt:
-					raise metaTrajIO.SamplingRateChangedError("The sampling rate in the data file '{0}' has changed.".format(fname))
-				
-			# Store the ionic currents for the first two points
-			dat=[float(p1[self.currCol]), float(p2[self.currCol])]
+			cols=sorted(set([self.timeCol, self.currCol]))
 
-			dat.extend([ float(row[self.currCol]) for row in r1 ])
-			
-			return np.array( dat, dtype=np.float64)
+		try:
+			reader=pd.read_csv(
+					fname, 
+					sep=self.separator,
+					header=None,
+					skiprows=int(self.hasHeaders),
+					usecols=cols,
+					dtype=np.float64,
+					float_precision='high',
+					chunksize=self.tsvChunkRows
+				)
+		except ValueError, err:
+			# the file has fewer columns than expected
+			raise IndexError(str(err))
+
+		dat=np.empty(max(self.filelength(fname, filtered=False), 0), dtype=np.float64)
+		n=0
+		for chunk in reader:
+			if not self.userSetFs and n==0:
+				self.__setFs(fname, chunk[self.timeCol].values)
+
+			c=chunk[self.currCol].values
+			if n+len(c) > len(dat):
+				# the file contains more rows than lines counted by _filelength
+				dat=np.concatenate((dat[:n], np.empty(len(c), dtype=np.float64)))
+
+			dat[n:n+len(c)]=c
+			n+=len(c)
+
+		return dat[:n]
+
+	def __setFs(self, fname, t):
+		"""
+			Calculate the sampling frequency from the first two points
+		"""
+		dt=t[1]-t[0]
+
+		if not hasattr(self, 'Fs'):
+			self.Fs=1./dt
+		# else check if it s the same as before
+		else:
+			if self.Fs!=1./dt:
+				raise metaTrajIO.SamplingRateChangedError("The sampling rate in the data file '{0}' has changed.".format(fname))
 
 	def scaleData(self, data):
 		return self.scale*data
@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+"""
+	A first-in-first-out queue that stores NumPy arrays as a list of chunks.
+
+	:Created:	10/18/2026
+ 	:Author: 	Arvind Balijepalli <arvind.balijepalli@nist.gov>
+	:License:	See LICENSE.TXT
+	:ChangeLog:
+	.. line-block::
+		10/18/26	AB	Added a dtype argument that sets the data type of empty arrays returned by the queue.
+		10/18/26	AB	Initial version
+"""
+import itertools
+from collections import deque
+
+import numpy as np
+
+__all__=["chunkqueue"]
+
+class chunkqueue(object):
+	"""
+		A first-in-first-out queue of samples that holds references to the arrays (chunks) appended
+		to it. Unlike a single contiguous array, appending a chunk does not copy data that is already
+		in the queue. Requests for data that lie within a single chunk return a view of that chunk,
+		and data are only copied (concatenated) when a request spans multiple chunks.
+
+		:Parameters:
+			- `dtype` :	data type of the empty array returned when the queue is empty (default: float64).
+
+		Arrays returned by :func:`peek` and :func:`pop` may share memory with the chunks that were
+		appended to the queue and should be treated as read-only.
+	"""
+	def __init__(self, dtype=np.float64):
+		self._chunks=deque()
+		self._dtype=dtype
+
+		self._head=0	# position of the first unread sample in the first chunk
+		self._len=0		# number of unread samples
+
+	def __len__(self):
+		return self._len
+
+	def append(self, data):
+		"""
+			Append a chunk of data to the end of the queue. The data is not copied.
+
+			:Parameters:
+				- `data` :	an array of samples.
+		"""
+		data=np.asarray(data).ravel()
+
+		if len(data):
+			self._chunks.append(data)
+			self._len+=len(data)
+
+	def peek(self, n):
+		"""
+			Return (up to) n samples from the head of the queue without removing them.
+
+			:Parameters:
+				- `n` :	number of samples to return.
+		"""
+		n=max(min(n, self._len), 0)
+
+		if not n:
+			return np.array([], dtype=self._dtype)
+
+		c=self._chunks[0]
+		if self._head+n <= len(c):
+			return c[self._head:self._head+n]
+
+		dat=[ c[self._head:] ]
+		nread=len(dat[0])
+		for c in itertools.islice(self._chunks, 1, None):
+			dat.append(c[:n-nread])
+			nread+=len(dat[-1])
+
+			if nread==n:
+				break
+
+		return np.concatenate(dat)
+
+	def pop(self, n):
+		"""
+			Remove and return (up to) n samples from the head of the queue.
+
+			:Parameters:
+				- `n` :	number of samples to return.
+		"""
+		if self._chunks and n > 0:
+			# fast path for requests that lie within the first chunk
+			c=self._chunks[0]
+			i=self._head
+			if i+n < len(c):
+				self._head+=n
+				self._len-=n
+
+				return c[i:i+n]
+
+		dat=self.peek(n)
+		self.discard(len(dat))
+
+		return dat
+
+	def discard(self, n):
+		"""
+			Remove (up to) n samples from the head of the queue.
+
+			:Parameters:
+				- `n` :	number of samples to remove.
+		"""
+		n=max(min(n, self._len), 0)
+		self._len-=n
+
+		while n:
+			nc=len(self._chunks[0])-self._head
+			if n < nc:
+				self._head+=n
+				return
+
+			self._chunks.popleft()
+			self._head=0
+			n-=nc
+
+	def clear(self):
+		"""
+			Remove all samples from the queue.
+		"""
+		self._chunks.clear()
+		self._head=0
+		self._len=0
@@ -4,15 +4,19 @@
 	:License:	See LICENSE.TXT	
 	:ChangeLog:
 	.. line-block::
+		10/18/26	AB	Added closed-form estimates of the open channel current statistics (OpenCurrentMoments, OpenCurrentSlope),
+						which OpenCurrentStats uses when method='moments' (default: 'fit').
+		10/18/26	AB	Added OpenCurrentStats to estimate the mean, SD and slope of the open channel current.
                 7/29/16         KB      Added weights to histogram fitting
                 15/12/15        KB      Added error checking and limits to baseline calculations
 		10/30/14	AB	Initial version
 """
 import numpy as np 
 from scipy.optimize import curve_fit
+import scipy.stats
 
 
-__all__=["OpenCurrentDist"]
+__all__=["OpenCurrentDist", "OpenCurrentMoments", "OpenCurrentSlope", "OpenCurrentStats"]
 
 def OpenCurrentDist(dat, limit, minBaseline=-1, maxBaseline=-1):
 	"""
@@ -51,6 +55,106 @@ def OpenCurrentDist(dat, limit, minBaseline=-1, maxBaseline=-1):
         
 	return [popt[2], np.abs(popt[1])]
 
+def OpenCurrentMoments(dat, limit, minBaseline=-1, maxBaseline=-1):
+	"""
+		Estimate the mean and standard deviation of the open channel current without a non-linear fit. The
+		peak of the current histogram and its half width at half maximum provide an initial estimate that
+		is refined from the mean and standard deviation of points within 3 SD of the peak. The arguments 
+		and return values are identical to :func:`OpenCurrentDist`.
+		
+		:Args:
+			- `dat` 	: time-series data
+			- `limit`	: limit the histogram to the top 50% (+0.5) of the range, bottom 50% (-0.5) or the entire range (0). Any other value of `limit` will cause it to be reset to 0 (i.e. full range).
+	"""
+	datsign = np.sign( np.mean(dat) )
+	uDat = datsign*np.asarray(dat)
+	dMin, dMax, dMean = np.floor( np.min(uDat) ), np.ceil( np.max(uDat) ), np.round( np.mean(uDat) )
+
+	if minBaseline == -1.0 or maxBaseline == -1.0:
+		try:
+			hLimit={0.5 : [dMean, dMax], -0.5 : [dMin, dMean], 0 : [dMin, dMax] }[limit]
+		except KeyError:
+			hLimit=[dMin, dMax]
+	else:
+		hLimit = [minBaseline, maxBaseline]
+
+	y,x=np.histogram(uDat, range=hLimit, bins=100)
+	if np.sum(y)==0:
+		return [0,0]
+
+	# Initial estimate from the histogram peak and its half width at half maximum. If the 
+	# peak is truncated by the histogram range, the width is estimated from one side.
+	ipk=np.argmax(y)
+	hm=np.flatnonzero(y < y[ipk]/2.)
+	lo=np.append(-1, hm[hm < ipk])[-1]+1
+	hi=np.append(hm[hm > ipk], len(y))[0]
+
+	mu=(x[ipk]+x[ipk+1])/2.
+	hwhm=[ w for (w, valid) in [ (mu-x[lo], lo > 0), (x[hi]-mu, hi < len(y)) ] if valid ] or [ (x[hi]-x[lo])/2. ]
+	sig=max(np.mean(hwhm)/1.1774, x[1]-x[0])
+
+	# Refine the estimate with points within 3 SD of the mean. The SD of a Gaussian
+	# truncated at 3 SD is 0.9865 times the SD of the full distribution.
+	for i in range(3):
+		sel=uDat[ np.abs(uDat-mu) < 3*sig ]
+		if len(sel) < 2:
+			return [0,0]
+		mu, sig=np.mean(sel), np.std(sel)/0.9865
+
+	if (minBaseline > -1 and maxBaseline > -1) and (mu < minBaseline or mu > maxBaseline):
+		return [0,0]
+
+	return [mu, sig]
+
+def OpenCurrentSlope(dat, FsHz):
+	"""
+		Calculate the slope of a time-series (in units per second) by linear least squares. 
+		The slope is calculated in closed form from sums over the data, which is equivalent
+		to (but faster than) `scipy.stats.linregress`.
+
+		:Args:
+			- `dat` 	: time-series data
+			- `FsHz`	: sampling frequency in Hz
+	"""
+	n=len(dat)
+	if n < 2:
+		return 0.0
+
+	sx=np.sum(dat)
+	six=np.dot(np.arange(n, dtype=np.float64), dat)
+
+	return FsHz*12.*(six-0.5*(n-1)*sx)/(n*(n**2-1.))
+
+def OpenCurrentStats(dat, FsHz, minBaseline=-1, maxBaseline=-1, method='fit'):
+	"""
+		Estimate the mean, standard deviation and slope of the open channel current.
+
+		:Args:
+			- `dat` 	: time-series data
+			- `FsHz`	: sampling frequency in Hz
+			- `minBaseline`	: minimum value for the ionic current baseline (default: -1, no limit)
+			- `maxBaseline`	: maximum value for the ionic current baseline (default: -1, no limit)
+			- `method`	: estimate the mean and SD with a Gaussian fit to the current histogram with :func:`OpenCurrentDist` ('fit', default) or in closed form with :func:`OpenCurrentMoments` ('moments').
+
+		:Returns:
+			- A list of the mean, standard deviation and slope (in pA/s) of the open channel current.
+	"""
+	if method == 'fit':
+		n=len(dat)
+
+		t=1./FsHz
+		tstamp=np.arange(0, n*t, t, dtype=np.float64)[:n]
+
+		# Calculate the mean and standard deviation of the open state
+		mu, sig=OpenCurrentDist(dat, 0.5, minBaseline, maxBaseline)
+
+		# Fit the data to a straight line to calculate the slope
+		slope, intercept, r_value, p_value, std_err=scipy.stats.linregress(tstamp, dat)
+	else:
+		mu, sig=OpenCurrentMoments(dat, 0.5, minBaseline, maxBaseline)
+		slope=OpenCurrentSlope(dat, FsHz)
+
+	return [ mu, sig, slope ]
 
 if __name__ == '__main__':
 	import mosaic.qdfTrajIO as qdf
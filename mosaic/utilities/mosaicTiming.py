@@ -6,6 +6,7 @@
 	:License:	See LICENSE.TXT
 	:ChangeLog:
 	.. line-block::
+		10/18/26	AB	Allow timing objects to be pickled.
 		6/17/16 	AB 	Only profile functions in DeveloperMode. Log timing output.
 		4/10/16		AB	Initial version
 """
@@ -73,6 +74,19 @@ class mosaicTiming:
 		else:
 			self.timingFunc=time.time
 		
+	def __getstate__(self):
+		# Loggers cannot be pickled.
+		state=self.__dict__.copy()
+		state.pop('logger', None)
+
+		return state
+
+	def __setstate__(self, state):
+		self.__dict__.update(state)
+
+		if self.TimingEnabled:
+			self.logger=mlog.mosaicLogging().getLogger(__name__)
+
 	def __enter__(self):
 		return self
 
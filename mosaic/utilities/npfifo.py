@@ -0,0 +1,184 @@
+# -*- coding: utf-8 -*-
+"""
+	A preallocated circular buffer (FIFO) for NumPy arrays.
+
+	:Created:	10/18/2026
+ 	:Author: 	Arvind Balijepalli <arvind.balijepalli@nist.gov>
+	:License:	See LICENSE.TXT
+	:ChangeLog:
+	.. line-block::
+		10/18/26	AB	Initial version
+"""
+import numpy as np
+
+__all__=["npfifo"]
+
+class npfifo(object):
+	"""
+		A first-in-first-out queue of samples backed by a single preallocated NumPy array. Blocks of
+		data are appended with a single copy into the ring, and data at the head of the queue is read
+		without copying whenever it does not straddle the end of the ring. The buffer grows automatically
+		(by doubling its capacity) when a new block does not fit.
+
+		In addition to unread data, the buffer optionally retains a fixed number of the most recently
+		consumed samples. This lookback window can be used to retrieve the data that immediately preceded
+		the head of the queue (for example, to pad an event) without storing a separate copy.
+
+		The class implements the subset of the :py:class:`collections.deque` interface used by the
+		event partition algorithms (`extend`, `popleft`, `clear`, `len` and indexing).
+
+		:Parameters:
+			- `size` :		initial capacity of the buffer in samples (default: 1024).
+			- `lookback` :	number of consumed samples to retain (default: 0).
+			- `dtype` :		data type of the buffer (default: float64).
+	"""
+	def __init__(self, size=1024, lookback=0, dtype=np.float64):
+		self.lookbackSize=int(lookback)
+
+		self._buf=np.zeros(max(int(size), 1)+self.lookbackSize, dtype=dtype)
+		self._cap=len(self._buf)
+
+		self._head=0	# position of the first unread sample in the ring
+		self._len=0		# number of unread samples
+		self._nhist=0	# number of consumed samples available in the lookback window
+
+	def __len__(self):
+		return self._len
+
+	def __getitem__(self, key):
+		if isinstance(key, slice):
+			start, stop, step = key.indices(self._len)
+			if step==1:
+				return self._range(start, max(start, stop))
+			else:
+				return self._range(0, self._len)[key]
+		else:
+			if key < 0:
+				key+=self._len
+			if key < 0 or key >= self._len:
+				raise IndexError("npfifo index out of range")
+
+			return self._buf[(self._head+key)%self._cap]
+
+	@property
+	def capacity(self):
+		"""
+			Total number of samples (unread and lookback) the buffer can hold before it is resized.
+		"""
+		return self._cap
+
+	def extend(self, data):
+		"""
+			Append a block of data to the end of the queue.
+
+			:Parameters:
+				- `data` :	an array or sequence of samples.
+		"""
+		data=np.asarray(data, dtype=self._buf.dtype).ravel()
+		n=len(data)
+
+		if self._nhist+self._len+n > self._cap:
+			self._resize(self._nhist+self._len+n)
+
+		tail=(self._head+self._len)%self._cap
+		nfirst=min(n, self._cap-tail)
+
+		self._buf[tail:tail+nfirst]=data[:nfirst]
+		self._buf[:n-nfirst]=data[nfirst:]
+
+		self._len+=n
+
+	def peek(self, n=None):
+		"""
+			Return (up to) n samples from the head of the queue without removing them. The returned
+			array is a view into the buffer unless the data wraps around the end of the ring, in which
+			case a copy is returned. Views are only valid until the next call to :func:`extend`.
+
+			:Parameters:
+				- `n` :	number of samples to return. By default, return all unread samples.
+		"""
+		if n is None:
+			n=self._len
+		return self._range(0, min(n, self._len))
+
+	def pop(self, n):
+		"""
+			Remove and return (up to) n samples from the head of the queue. The returned array is always a copy.
+
+			:Parameters:
+				- `n` :	number of samples to return.
+		"""
+		dat=np.array(self.peek(n))
+		self.discard(len(dat))
+
+		return dat
+
+	def popleft(self):
+		"""
+			Remove and return the sample at the head of the queue.
+
+			:Errors:
+				- `IndexError` :	when the queue is empty.
+		"""
+		if not self._len:
+			raise IndexError("pop from an empty npfifo")
+
+		t=self._buf[self._head]
+		self.discard(1)
+
+		return t
+
+	def discard(self, n):
+		"""
+			Remove (up to) n samples from the head of the queue. Discarded samples are added
+			to the lookback window.
+
+			:Parameters:
+				- `n` :	number of samples to remove.
+		"""
+		n=min(n, self._len)
+
+		self._head=(self._head+n)%self._cap
+		self._len-=n
+		self._nhist=min(self.lookbackSize, self._nhist+n)
+
+	def lookback(self, n):
+		"""
+			Return (up to) n of the most recently consumed samples in the order they were added.
+			As with :func:`peek`, a view is returned when the data is contiguous in the buffer.
+
+			:Parameters:
+				- `n` :	number of samples to return.
+		"""
+		n=min(n, self._nhist)
+		return self._range(-n, 0)
+
+	def clear(self):
+		"""
+			Remove all unread samples and reset the lookback window.
+		"""
+		self._head=0
+		self._len=0
+		self._nhist=0
+
+	def _range(self, start, stop):
+		# Return samples in the range [start, stop) relative to the head of the queue.
+		# Negative indices address the lookback window.
+		n=stop-start
+		i0=(self._head+start)%self._cap
+
+		if i0+n <= self._cap:
+			return self._buf[i0:i0+n]
+		else:
+			return np.concatenate( (self._buf[i0:], self._buf[:n-(self._cap-i0)]) )
+
+	def _resize(self, nmin):
+		newcap=max(2*self._cap, nmin)
+
+		dat=self._range(-self._nhist, self._len)
+
+		self._buf=np.zeros(newcap, dtype=self._buf.dtype)
+		self._buf[:len(dat)]=dat
+
+		self._cap=newcap
+		self._head=self._nhist
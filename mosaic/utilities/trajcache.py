@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+"""
+	Read and write MOSAIC trajectory cache files. A cache file holds the scaled ionic current
+	from a single data file as a flat array of samples, which can be memory mapped. The samples
+	follow a fixed size header that starts with a magic string, followed by the length of a JSON
+	encoded dictionary and the dictionary itself. The header records the sampling frequency, the
+	data type and number of samples, the name, size and modification time of the source file, and
+	attributes of the TrajIO object that are set when the source file is read (e.g. amplifier settings).
+
+	:Created:	10/18/2026
+ 	:Author: 	Arvind Balijepalli <arvind.balijepalli@nist.gov>
+	:License:	See LICENSE.TXT
+	:ChangeLog:
+	.. line-block::
+		10/18/26	AB	Initial version
+"""
+import os
+import errno
+import tempfile
+import json
+import struct
+
+import numpy as np
+
+__all__=["cachefilename", "sourceinfo", "readheader", "readcache", "validcache", "cachewriter", "TrajCacheError"]
+
+class TrajCacheError(Exception):
+	pass
+
+MAGIC="MOSAICTRAJCACHE1"
+HEADERSIZE=4096
+
+def cachefilename(cachedir, fname):
+	"""
+		Return the name of the cache file for the data file `fname`.
+	"""
+	return os.path.join(cachedir, os.path.basename(fname)+'.mtc')
+
+def sourceinfo(fname):
+	"""
+		Return the attributes of a data file that are used to check if a cache file is current.
+	"""
+	return {
+		"source" 		: os.path.abspath(fname),
+		"sourceSize" 	: os.path.getsize(fname),
+		"sourceMTime" 	: os.path.getmtime(fname)
+	}
+
+def readheader(fname):
+	"""
+		Return the header dictionary of a cache file.
+
+		:Errors:
+			- `TrajCacheError` : if `fname` is not a complete cache file.
+	"""
+	with open(fname, 'rb') as f:
+		hdr=f.read(HEADERSIZE)
+
+	if len(hdr) < HEADERSIZE or hdr[:len(MAGIC)]!=MAGIC:
+		raise TrajCacheError("{0} is not a trajectory cache file.".format(fname))
+
+	n=struct.unpack('<I', hdr[len(MAGIC):len(MAGIC)+4])[0]
+	try:
+		return json.loads(hdr[len(MAGIC)+4:len(MAGIC)+4+n])
+	except ValueError:
+		raise TrajCacheError("The header of {0} is corrupt.".format(fname))
+
+def readcache(fname):
+	"""
+		Return a read-only memory map of the samples in a cache file and the header dictionary.
+	"""
+	hdr=readheader(fname)
+
+	if hdr["length"]==0:
+		return (np.array([], dtype=hdr["dtype"]), hdr)
+
+	return (np.memmap(fname, dtype=hdr["dtype"], mode='r', offset=HEADERSIZE, shape=(hdr["length"],)), hdr)
+
+def validcache(cachefname, fname, settings):
+	"""
+		Return True if the cache file exists and was created from the current version of the data
+		file `fname` with identical settings.
+	"""
+	try:
+		hdr=readheader(cachefname)
+	except (IOError, OSError, TrajCacheError):
+		return False
+
+	src=sourceinfo(fname)
+	for k in src.keys():
+		if hdr.get(k)!=src[k]:
+			return False
+
+	return hdr.get("settings")==settings
+
+class cachewriter(object):
+	"""
+		Write a cache file one block of samples at a time. Data are written to a uniquely named temporary 
+		file in the cache directory, which replaces the cache file when :func:`close` is called. An incomplete 
+		cache file is therefore never read, and processes that cache the same data file at the same time 
+		do not write to the same file.
+
+		:Parameters:
+			- `cachefname` :	name of the cache file.
+			- `fname` :			name of the data file the samples are read from.
+			- `Fs` :			sampling frequency in Hz.
+			- `settings` :		a string that identifies the settings used to scale the data.
+			- `dtype` :			data type of the stored samples (default: float32).
+			- `attrs` :			a dictionary of TrajIO attributes that are restored when the cache is read (default: None).
+	"""
+	def __init__(self, cachefname, fname, Fs, settings, dtype='f4', attrs=None):
+		self.cachefname=cachefname
+		self.dtype=np.dtype(dtype)
+
+		self.header=dict(sourceinfo(fname), Fs=Fs, settings=settings, dtype=self.dtype.str, length=0, attrs=attrs or {})
+
+		(self.fhnd, self.tmpfname)=tempfilehandle(cachefname)
+		self.fhnd.write('\0'*HEADERSIZE)
+
+	def write(self, data):
+		"""
+			Append a block of samples to the cache file.
+		"""
+		np.asarray(data, dtype=self.dtype).tofile(self.fhnd)
+		self.header["length"]+=len(data)
+
+	def close(self):
+		"""
+			Write the header and move the cache file into place.
+		"""
+		hdr=json.dumps(self.header)
+		if len(MAGIC)+4+len(hdr) > HEADERSIZE:
+			self.abort()
+			raise TrajCacheError("The cache header for {0} is too long.".format(self.header["source"]))
+
+		self.fhnd.seek(0)
+		self.fhnd.write(MAGIC+struct.pack('<I', len(hdr))+hdr)
+		self.fhnd.close()
+
+		publish(self.tmpfname, self.cachefname)
+
+	def abort(self):
+		"""
+			Discard a partially written cache file.
+		"""
+		self.fhnd.close()
+		if os.path.exists(self.tmpfname):
+			os.remove(self.tmpfname)
+
+def tempfilehandle(fname):
+	"""
+		Create a uniquely named temporary file in the directory of `fname`, which is created if 
+		necessary. Return an open file object and the name of the temporary file.
+	"""
+	dirname=os.path.dirname(fname) or '.'
+	try:
+		os.makedirs(dirname)
+	except OSError, err:
+		# another process may have created the directory
+		if err.errno!=errno.EEXIST or not os.path.isdir(dirname):
+			raise
+
+	(fd, tmpfname)=tempfile.mkstemp(dir=dirname, prefix=os.path.basename(fname)+'.', suffix='.tmp')
+	os.chmod(tmpfname, 0644)
+
+	return (os.fdopen(fd, 'wb'), tmpfname)
+
+def publish(tmpfname, fname):
+	"""
+		Move a completed temporary file to `fname`, replacing any existing file.
+	"""
+	try:
+		os.rename(tmpfname, fname)
+	except OSError:
+		# os.rename does not replace an existing file on Windows
+		if os.path.exists(fname):
+			os.remove(fname)
+		os.rename(tmpfname, fname)
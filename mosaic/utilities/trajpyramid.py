@@ -0,0 +1,368 @@
+# -*- coding: utf-8 -*-
+"""
+	Multi-resolution envelopes of an ionic current trajectory, which allow a trajectory of any
+	length to be displayed at any zoom level with a fixed number of points. A trajectory pyramid
+	holds the minimum, maximum and mean current in bins of 2^k data points, which are calculated
+	in a single pass over the data read by a TrajIO object. The pyramid is saved to a file next to
+	the data (in the trajectory cache directory) and is memory mapped when it is read.
+
+	A pyramid file starts with a header that holds a magic string, followed by the length of a
+	JSON encoded dictionary and the dictionary itself. The header records the sampling frequency,
+	the number of data points, the bin size of each level and the name, size and modification time
+	of the source data files. The header is padded to a multiple of 4096 bytes and is followed by the
+	minimum, maximum and mean of each level stored as float32 arrays.
+
+	:Created:	10/18/2026
+ 	:Author: 	Arvind Balijepalli <arvind.balijepalli@nist.gov>
+	:License:	See LICENSE.TXT
+	:ChangeLog:
+	.. line-block::
+		10/18/26	AB	Initial version
+"""
+import os
+import json
+import struct
+import hashlib
+
+import numpy as np
+
+import mosaic.utilities.trajcache as trajcache
+
+__all__=["trajpyramid", "envelope", "interleave", "readheader", "TrajPyramidError"]
+
+class TrajPyramidError(Exception):
+	pass
+
+MAGIC="MOSAICTRAJPYR001"
+HEADERSIZE=4096
+BLOCKSIZE=2**22		# number of data points read at a time when a pyramid is built
+
+def envelope(data, nbins):
+	"""
+		Return the minimum, maximum and mean of `data` in `nbins` bins of (almost) equal size. If
+		`data` has fewer than `nbins` points, each data point is returned in a separate bin.
+
+		:Parameters:
+			- `data` :	an array of data points.
+			- `nbins` :	number of bins.
+
+		:Returns:
+			- A tuple with the index of the first data point in each bin, and the minimum, maximum and mean of each bin.
+	"""
+	data=np.asarray(data)
+	edges=_binedges(0, len(data), nbins)
+
+	if len(edges) < 2:
+		return (edges, data[:0], data[:0], np.zeros(0))
+
+	idx=edges[:-1]
+	return (
+			idx,
+			np.minimum.reduceat(data, idx),
+			np.maximum.reduceat(data, idx),
+			np.add.reduceat(data, idx, dtype=np.float64)/np.diff(edges)
+		)
+
+def interleave(x, ymin, ymax):
+	"""
+		Return the envelope of a trajectory as a single line that alternates between the minimum
+		and maximum of each bin, which is suitable for plotting.
+
+		:Parameters:
+			- `x` :		start of each bin.
+			- `ymin` :	minimum of each bin.
+			- `ymax` :	maximum of each bin.
+	"""
+	return (np.repeat(x, 2), np.column_stack((ymin, ymax)).ravel())
+
+def readheader(fname):
+	"""
+		Return the header dictionary of a pyramid file.
+
+		:Errors:
+			- `TrajPyramidError` : if `fname` is not a complete pyramid file.
+	"""
+	return _readheader(fname)[0]
+
+def _readheader(fname):
+	# Return the header dictionary and the offset of the data in a pyramid file.
+	with open(fname, 'rb') as f:
+		hdr=f.read(len(MAGIC)+4)
+		if len(hdr) < len(MAGIC)+4 or hdr[:len(MAGIC)]!=MAGIC:
+			raise TrajPyramidError("{0} is not a trajectory pyramid file.".format(fname))
+
+		n=struct.unpack('<I', hdr[len(MAGIC):])[0]
+		hdr=f.read(n)
+
+	try:
+		return (json.loads(hdr), _headersize(hdr))
+	except ValueError:
+		raise TrajPyramidError("The header of {0} is corrupt.".format(fname))
+
+def _headersize(hdr):
+	# Size of the padded header of a pyramid file
+	n=len(MAGIC)+4+len(hdr)
+	return ((n+HEADERSIZE-1)/HEADERSIZE)*HEADERSIZE
+
+def _binedges(start, end, nbins):
+	# Edges of nbins bins of (almost) equal size between start and end.
+	n=max(end-start, 0)
+	nbins=min(max(int(nbins), 0), n)
+	if not nbins:
+		return np.zeros(0, dtype=np.int64)
+
+	return start+(np.arange(nbins+1, dtype=np.int64)*n)//nbins
+
+class trajpyramid(object):
+	"""
+		Build or read the trajectory pyramid of the data read by a TrajIO object. The pyramid
+		covers all the data points returned by :func:`~mosaic.trajio.metaTrajIO.metaTrajIO.readPoints`
+		(after filtering and removing the DC offset), starting from the first data point of the first
+		data file. It is built the first time it is requested and is rebuilt when the data files or the
+		settings of the TrajIO object change. Building a pyramid does not change the position of the trajectory.
+
+		The finest level of the pyramid holds bins of `minDecimation` data points. Data in windows that
+		are too short to be served from the pyramid are read from the data files with the TrajIO object.
+
+		:Parameters:
+			- `trajDataObj` :	a TrajIO object.
+			- `cacheDir` :		directory that holds the pyramid file (default: the trajectory cache directory of `trajDataObj`).
+			- `minDecimation` :	number of data points in the bins of the finest level, which must be a power of two (default: 64).
+			- `minBins` :		the pyramid is built up to the first level with fewer than `minBins` bins (default: 512).
+			- `build` :			build the pyramid if a valid pyramid file does not exist (default: True).
+
+		:Errors:
+			- `TrajPyramidError` : if `minDecimation` is not a power of two, or if `build` is False and a valid pyramid file does not exist.
+	"""
+	def __init__(self, trajDataObj, cacheDir=None, minDecimation=64, minBins=512, build=True):
+		self.trajDataObj=trajDataObj
+
+		self.minDecimation=int(minDecimation)
+		if self.minDecimation < 1 or self.minDecimation & (self.minDecimation-1):
+			raise TrajPyramidError("minDecimation must be a power of two.")
+		self.minBins=int(minBins)
+
+		self.FsHz=trajDataObj.FsHz
+
+		self.sources=[ trajcache.sourceinfo(f) for f in trajDataObj.dataFileList ]
+		self.settings=self._settings()
+
+		if not cacheDir:
+			cacheDir=trajDataObj.cacheDir
+
+		key=hashlib.md5(json.dumps([self.sources, self.settings], sort_keys=True)).hexdigest()[:16]
+		self.pyramidfname=os.path.join(cacheDir, 'trajpyramid-'+key+'.mtp')
+
+		if not self._validpyramid():
+			if not build:
+				raise TrajPyramidError("A trajectory pyramid of the data does not exist.")
+			self._build()
+
+		self._read()
+
+	def window(self, startSec, durationSec, nbins=2000):
+		"""
+			Return the envelope of the data in a time window in at most `nbins` bins. The envelope is
+			calculated from the coarsest pyramid level with bins that are no larger than the requested
+			bins. Bin boundaries are aligned to the bins of that level.
+
+			:Parameters:
+				- `startSec` : 		start of the window in seconds from the start of the first data file.
+				- `durationSec` : 	length of the window in seconds.
+				- `nbins` : 		number of bins (default: 2000).
+
+			:Returns:
+				- A tuple with the start time of each bin in seconds, and the minimum, maximum and mean current in each bin.
+		"""
+		start=max(int(startSec*self.FsHz), 0)
+		end=min(start+max(int(durationSec*self.FsHz), 0), self.length)
+
+		edges=_binedges(start, end, nbins)
+		if len(edges) < 2:
+			return (np.zeros(0), np.zeros(0), np.zeros(0), np.zeros(0))
+
+		# the coarsest level with bins that are no larger than the smallest requested bin
+		d=np.min(np.diff(edges))
+		lvl=None
+		for l in self.levels:
+			if l["decimation"] <= d:
+				lvl=l
+
+		if lvl is None:
+			dat=self.trajDataObj.readPoints(start, end-start)
+			(idx, ymin, ymax, ymean)=envelope(dat, nbins)
+			idx=idx+start
+		else:
+			dec=lvl["decimation"]
+			(ymin, ymax, ymean)=self._levels[dec]
+
+			b0=edges[0]/dec
+			b1=min((edges[-1]+dec-1)/dec, lvl["length"])
+			bidx=edges[:-1]/dec-b0
+
+			idx=(bidx+b0)*dec
+			ymin=np.minimum.reduceat(ymin[b0:b1], bidx)
+			ymax=np.maximum.reduceat(ymax[b0:b1], bidx)
+
+			# weight the mean of each level bin by the number of data points in the bin (the last bin may be partial)
+			cnt=dec*np.ones(b1-b0)
+			if b1==lvl["length"]:
+				cnt[-1]=self.length-(b1-1)*dec
+			ymean=np.add.reduceat(ymean[b0:b1]*cnt, bidx, dtype=np.float64)/np.add.reduceat(cnt, bidx)
+
+		return (idx/float(self.FsHz), ymin, ymax, ymean)
+
+	def _settings(self):
+		# Settings of the TrajIO object that change the data in the pyramid.
+		t=self.trajDataObj
+		if t.dataFilter:
+			filt="{0}: decimate={1}".format(type(t.dataFilterObj).__name__, t.dataFilterObj.decimate)
+		else:
+			filt="None"
+
+		return "{0}; datafilter={1}; dcOffset={2}; minDecimation={3}; minBins={4}".format(
+				t.cacheSettings, filt, t.dcOffset, self.minDecimation, self.minBins
+			)
+
+	def _validpyramid(self):
+		try:
+			hdr=readheader(self.pyramidfname)
+		except (IOError, OSError, TrajPyramidError):
+			return False
+
+		return hdr.get("sources")==self.sources and hdr.get("settings")==self.settings
+
+	def _read(self):
+		(hdr, dataOffset)=_readheader(self.pyramidfname)
+
+		self.length=hdr["length"]
+		self.levels=hdr["levels"]
+
+		self._levels={}
+		if self.levels:
+			m=np.memmap(self.pyramidfname, dtype='f4', mode='r', offset=dataOffset)
+			for l in self.levels:
+				(o, n)=(l["offset"], l["length"])
+				self._levels[l["decimation"]]=(m[o:o+n], m[o+n:o+2*n], m[o+2*n:o+3*n])
+
+	def _build(self):
+		t=self.trajDataObj
+		index=t.fileIndex()
+		length=int(sum( n for (f, s, n) in index ))
+
+		# decimation, offset and length of each level
+		levels=[]
+		offset=0
+		dec=self.minDecimation
+		while length:
+			n=(length+dec-1)/dec
+			levels.append({ "decimation" : dec, "offset" : offset, "length" : n })
+			offset+=3*n
+
+			if n < self.minBins:
+				break
+			dec*=2
+
+		hdr={
+				"Fs" 		: float(self.FsHz),
+				"length" 	: length,
+				"levels" 	: levels,
+				"sources"	: self.sources,
+				"settings" 	: self.settings
+			}
+		hdr=json.dumps(hdr)
+
+		dataOffset=_headersize(hdr)
+
+		(f, tmpfname)=trajcache.tempfilehandle(self.pyramidfname)
+		try:
+			with f:
+				f.write(MAGIC+struct.pack('<I', len(hdr))+hdr)
+				f.truncate(dataOffset+4*offset)
+
+			if levels:
+				m=np.memmap(tmpfname, dtype='f4', mode='r+', offset=dataOffset, shape=(offset,))
+				b=_pyramidbuilder(m, levels)
+
+				# Data are read in blocks that do not span data files.
+				for (fname, fstart, n) in index:
+					for i in xrange(0, n, BLOCKSIZE):
+						b.append(t.readPoints(fstart+i, min(BLOCKSIZE, n-i)))
+				b.close()
+
+				m.flush()
+				del m
+		except BaseException:
+			if os.path.exists(tmpfname):
+				os.remove(tmpfname)
+			raise
+
+		trajcache.publish(tmpfname, self.pyramidfname)
+
+class _pyramidbuilder(object):
+	"""
+		Calculate the levels of a pyramid from blocks of data. Bins of each level are calculated
+		from pairs of bins of the previous level as soon as they are available.
+	"""
+	def __init__(self, buf, levels):
+		self.buf=buf
+		self.levels=levels
+
+		self.raw=np.zeros(0)
+		self.pos=[0]*len(levels)
+		self.pending=[None]*len(levels)
+
+	def append(self, data):
+		d=self.levels[0]["decimation"]
+
+		data=np.concatenate((self.raw, data))
+		n=len(data)/d
+
+		self.raw=data[n*d:]
+		if n:
+			r=data[:n*d].reshape(n, d)
+			self._push(0, r.min(axis=1), r.max(axis=1), r.sum(axis=1, dtype=np.float64), np.ones(n)*d)
+
+	def close(self):
+		if len(self.raw):
+			r=self.raw
+			self._push(0, np.array([r.min()]), np.array([r.max()]), np.array([r.sum()]), np.array([float(len(r))]))
+			self.raw=np.zeros(0)
+
+		# partial bins at the end of each level
+		for k in range(len(self.levels)-1):
+			if self.pending[k] is not None:
+				p=self.pending[k]
+				self.pending[k]=None
+				self._push(k+1, *p)
+
+	def _push(self, k, ymin, ymax, ysum, cnt):
+		# write bins to level k
+		l=self.levels[k]
+		(o, n, i)=(l["offset"], l["length"], self.pos[k])
+		m=len(ymin)
+
+		self.buf[o+i:o+i+m]=ymin
+		self.buf[o+n+i:o+n+i+m]=ymax
+		self.buf[o+2*n+i:o+2*n+i+m]=ysum/cnt
+		self.pos[k]+=m
+
+		if k+1==len(self.levels):
+			return
+
+		# combine pairs of bins into bins of the next level
+		if self.pending[k] is not None:
+			(ymin, ymax, ysum, cnt)=[ np.concatenate((p, a)) for (p, a) in zip(self.pending[k], (ymin, ymax, ysum, cnt)) ]
+			self.pending[k]=None
+
+		m=len(ymin)/2
+		if len(ymin)%2:
+			self.pending[k]=(ymin[-1:], ymax[-1:], ysum[-1:], cnt[-1:])
+
+		if m:
+			self._push(k+1,
+					np.minimum(ymin[0:2*m:2], ymin[1:2*m:2]),
+					np.maximum(ymax[0:2*m:2], ymax[1:2*m:2]),
+					ysum[0:2*m:2]+ysum[1:2*m:2],
+					cnt[0:2*m:2]+cnt[1:2*m:2]
+				)
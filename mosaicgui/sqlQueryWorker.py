@@ -22,7 +22,7 @@ class sqlQueryWorker(QtCore.QObject):
 		self.queryDatabase=sqlite.sqlite3MDIO()
 		self.queryDatabase.openDB(self.dbFile, timeout=3.0)
 		if filterRealList:
-			self.dbColumnsReady.emit( [ col[0] for col in zip( self.queryDatabase.mdColumnNames, self.queryDatabase.mdColumnTypes ) if col[1] != 'REAL_LIST' ] )
+			self.dbColumnsReady.emit( [ col[0] for col in zip( self.queryDatabase.mdColumnNames, self.queryDatabase.mdColumnTypes ) if not col[1].endswith('_LIST') ] )
 		else:
 			self.dbColumnsReady.emit(self.queryDatabase.mdColumnNames)
 		self.queryDatabase.closeDB()
@@ -15,6 +15,7 @@ import mosaic.trajio.chimeraTrajIO as chimera
 from mosaic.trajio.metaTrajIO import FileNotFoundError, EmptyDataPipeError
 from mosaic.utilities.resource_path import resource_path
 from mosaic.utilities.ionic_current_stats import OpenCurrentDist
+import mosaic.utilities.trajpyramid as trajpyramid
 
 import matplotlib.ticker as ticker
 from matplotlib import pylab as plt
@@ -40,6 +41,9 @@ class TrajectoryWindow(QtGui.QDialog):
 		self.trajData=""
 		self.trajDataDenoise=""
 
+		# number of bins in the min/max envelope of the plotted data
+		self.envelopeBins=5000
+
 
 		# Set a counter for number of updates
 		self.blockSize=0.25
@@ -193,7 +197,7 @@ class TrajectoryWindow(QtGui.QDialog):
 			if self.dataLoaded:
 				datasign=float(np.sign(np.mean(self.trajData)))
 				ydat=datasign*np.array(self.trajData, dtype='float64')
-				xdat=np.arange(float(self.nUpdate)*self.blockSize,float(self.nUpdate+1)*self.blockSize,self.decimate/float(self.IOObject.FsHz))[:len(ydat)]
+				(xenv, yenv)=self._envelopeTrace(self.trajEnvelope, datasign)
 	
 				self._calculateThreshold(ydat)
 
@@ -211,10 +215,11 @@ class TrajectoryWindow(QtGui.QDialog):
 					self.mpl_hist.canvas.ax.cla()
 					self.mpl_hist.canvas.ax.hold(True)
 
-					self.mpl_hist.canvas.ax.plot( xdat, ydat, color=c, markersize='1.')
+					self.mpl_hist.canvas.ax.plot( xenv, yenv, color=c, markersize='1.')
 
 					ydatd=np.abs(self.trajDataDenoise)
-					self.mpl_hist.canvas.ax.plot( xdat, ydatd,  markersize='1.')
+					(xenvd, yenvd)=self._envelopeTrace(self.trajEnvelopeDenoise, 1.0)
+					self.mpl_hist.canvas.ax.plot( xenvd, np.abs(yenvd),  markersize='1.')
 
 					self.mpl_hist.canvas.ax2.cla()
 					self.mpl_hist.canvas.ax2.hold(True)
@@ -239,7 +244,7 @@ class TrajectoryWindow(QtGui.QDialog):
 				else:					
 					c='#%02x%02x%02x' % (72,91,144)
 					self.mpl_hist.canvas.ax.cla()
-					self.mpl_hist.canvas.ax.plot( xdat, ydat, markersize='1.')
+					self.mpl_hist.canvas.ax.plot( xenv, yenv, markersize='1.')
 
 					self.mpl_hist.canvas.ax2.cla()
 					
@@ -341,9 +346,23 @@ class TrajectoryWindow(QtGui.QDialog):
 		
 		self.trajData=tdat[::self.decimate]
 
+		# The min/max envelope of the data is plotted, which shows short events without plotting every data point.
+		self.trajEnvelope=trajpyramid.envelope(tdat, self.envelopeBins)
+
 		if self.DenoiseIOObj:
 			tdatdenoise=self.DenoiseIOObj.popdata(self.nPoints)
 			self.trajDataDenoise=tdatdenoise[::self.decimate]
+			self.trajEnvelopeDenoise=trajpyramid.envelope(tdatdenoise, self.envelopeBins)
+
+	def _envelopeTrace(self, env, datasign):
+		(idx, ymin, ymax, ymean)=env
+		xdat=float(self.nUpdate)*self.blockSize+idx/float(self.IOObject.FsHz)
+
+		# flip the min/max when the sign of the data is inverted
+		if datasign < 0:
+			(ymin, ymax)=(-ymax, -ymin)
+
+		return trajpyramid.interleave(xdat, ymin, ymax)
 
 	def _windowtitle(self):
 		try:
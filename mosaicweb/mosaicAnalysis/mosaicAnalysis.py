@@ -6,6 +6,10 @@
 	:License:	See LICENSE.TXT
 	:ChangeLog:
 	.. line-block::
+		10/18/26	AB	Plot the min/max envelope of the preview block instead of decimated data. The envelope is read from
+						the trajectory pyramid of the data when it exists, and the pyramid is built in a background thread.
+		10/18/26	AB	Read the preview block with readWindow, which only reads the data files that overlap it.
+		10/18/26	AB	Seek the trajectory to the start time instead of reading and discarding data.
 		3/19/17		AB 	Initial version
 """
 from mosaicgui import EBSStateFileDict
@@ -27,10 +31,12 @@ import mosaic.process.adept2State as a2s
 import mosaic.process.cusumPlus as cusum
 
 from mosaic.utilities.ionic_current_stats import OpenCurrentDist
+import mosaic.utilities.trajpyramid as trajpyramid
 from mosaicweb.plotlyUtils import plotlyWrapper
 
 import datetime
 import time
+import threading
 import glob
 import json
 import numpy as np
@@ -69,13 +75,14 @@ class mosaicAnalysis:
 
 		self.analysisRunning=False
 
+		self.pyramidThread=None
+
 	def setupAnalysis(self):
 		try:
 			if self.defaultSettings:
 				self._pruneDefaultSettings()
 
 			self._configTrajIOObject()
-			self._fastForwardToStart()
 			self._finishSetup()
 
 			# Attach the updated settings string to the return message.
@@ -190,30 +197,22 @@ class mosaicAnalysis:
 		except:
 			raise
 
-	def _fastForwardToStart(self):
-		try:
-			FsHz=self.trajIOObject.FsHz
-
-			for n in range(0, int( float(self.start)/self.blockSize )):
-				self.trajIOObject.popdata(int(self.blockSize*FsHz))
-			self.trajIOObject.popdata(int( float(self.start)%float(self.blockSize)*FsHz ))
-		except:
-			raise
-
 	def _finishSetup(self):
 		try:
 			FsHz=self.trajIOObject.FsHz
 			
-			tdat = self.trajIOObject.popdata(int(self.blockSize*FsHz))
+			tdat = self.trajIOObject.readWindow(self.start, self.blockSize)
 			decimate=self._calculateDecimation(len(tdat))
 			
-			dt=(1/float(FsHz))*decimate
 			dataPolarity=float(np.sign(np.mean(tdat)))
 
-			ydat=((dataPolarity*tdat) - self.dcOffset)[::decimate]
-			xdat=np.arange(self.start, self.start+self.blockSize, dt)
+			ydat=((dataPolarity*tdat) - self.dcOffset)
+
+			# Open channel statistics are estimated from decimated data and the min/max envelope 
+			# of the data is plotted, which shows short events with a fixed number of points.
+			self._openChanStats(ydat[::decimate])
 
-			self._openChanStats(ydat)
+			(xdat, ydat)=self._previewEnvelope(ydat, dataPolarity)
 
 			if float(self.analysisSettingsDict["eventSegment"]["meanOpenCurr"])==-1. or float(self.analysisSettingsDict["eventSegment"]["sdOpenCurr"])==-1.:
 				mu=self.returnMessageJSON["currMeanAuto"]
@@ -253,6 +252,45 @@ class mosaicAnalysis:
 		except:
 			raise
 
+	def _previewEnvelope(self, ydat, dataPolarity):
+		"""
+			Return the min/max envelope of the preview block. The envelope is read from the trajectory
+			pyramid of the data when a valid pyramid file exists. Otherwise, the envelope is calculated 
+			from the preview block and the pyramid is built in a background thread (see :func:`_buildPyramid`).
+		"""
+		try:
+			pyr=trajpyramid.trajpyramid(self.trajIOObject, build=False)
+			(x, ymin, ymax, ymean)=pyr.window(self.start, self.blockSize, mosaicAnalysis.previewBins)
+
+			if dataPolarity < 0:
+				(ymin, ymax)=(-ymax, -ymin)
+			(ymin, ymax)=(ymin-self.dcOffset, ymax-self.dcOffset)
+		except (IOError, OSError, trajpyramid.TrajPyramidError):
+			(idx, ymin, ymax, ymean)=trajpyramid.envelope(ydat, mosaicAnalysis.previewBins)
+			x=self.start+idx/float(self.trajIOObject.FsHz)
+
+			self._buildPyramid()
+
+		return trajpyramid.interleave(x, ymin, ymax)
+
+	def _buildPyramid(self):
+		# Build the trajectory pyramid of the data set outside the request with a separate TrajIO object.
+		if self.pyramidThread and self.pyramidThread.is_alive():
+			return
+
+		def _build(trajIOHandle, dataPath, trajIOSettings):
+			try:
+				trajpyramid.trajpyramid(trajIOHandle(dirname=dataPath, **trajIOSettings))
+			except (IOError, OSError, trajpyramid.TrajPyramidError):
+				pass
+
+		self.pyramidThread=threading.Thread(
+				target=_build, 
+				args=(self.trajIOHandle, self.dataPath, dict(self.analysisSettingsDict[self.trajIO]))
+			)
+		self.pyramidThread.daemon=True
+		self.pyramidThread.start()
+
 	def _calculateDecimation(self, dataLen):
 		d=(self.trajIOObject.FsHz)/10
 
@@ -315,6 +353,9 @@ class mosaicAnalysis:
 		else:		#default
 			return "binTrajIO"
 
+	# number of bins in the min/max envelope of the ionic current preview
+	previewBins=5000
+
 	trajIOHandleLookup={
 		"qdfTrajIO":	qdf.qdfTrajIO,
 		"abfTrajIO":	abf.abfTrajIO,